@@ -17,6 +17,7 @@ from langgraph.graph import StateGraph, START, END
 
 from deep_research_from_scratch.utils import get_today_str
 from deep_research_from_scratch.prompts import final_report_generation_prompt
+from deep_research_from_scratch.citation_index import format_source_catalog, prepare_findings
 from deep_research_from_scratch.state_scope import AgentState, AgentInputState
 from deep_research_from_scratch.research_agent_scope import clarify_with_user, write_research_brief
 from deep_research_from_scratch.multi_agent_supervisor import supervisor_agent
@@ -37,9 +38,10 @@ async def final_report_generation(state: AgentState):
     Synthesizes all research findings into a comprehensive final report
     """
 
-    notes = state.get("notes", [])
+    # The writer cites sources by ID; numbering and the Sources section come from the citation index
+    notes, citation_index = prepare_findings(state.get("notes", []))
 
-    findings = "\n".join(notes)
+    findings = "\n".join(notes) + format_source_catalog(citation_index)
 
     final_report_prompt = final_report_generation_prompt.format(
         research_brief=state.get("research_brief", ""),
@@ -48,10 +50,11 @@ async def final_report_generation(state: AgentState):
     )
 
     final_report = await writer_model.ainvoke([HumanMessage(content=final_report_prompt)])
+    final_report_text = citation_index.render_report(final_report.text)
 
     return {
-        "final_report": final_report.content, 
-        "messages": ["Here is the final report: " + final_report.content],
+        "final_report": final_report_text, 
+        "messages": ["Here is the final report: " + final_report_text],
     }
 
 # ===== GRAPH CONSTRUCTION =====
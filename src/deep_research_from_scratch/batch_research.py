@@ -0,0 +1,296 @@
+"""Batch Research Over Many Briefs.
+
+Runs the full deep researcher over a JSONL file of briefs, one JSON object
+per line:
+
+    {"brief_id": "coffee-sf", "brief": "Which coffee shops in SF ...", "tags": ["coffee"]}
+
+brief_id and tags are optional; briefs without an id are named by the hash
+of their text. All briefs run in this process under one global concurrency
+cap, as runs of a single scheduler tenant, so they share the process-wide
+model and search slots and every cache: the search and page summary cache
+(which only batch runs use by default), and the cross-run research cache.
+Clarification is skipped, since nobody is there to answer.
+
+Progress is durable. Every finished brief appends a line with its status and
+metrics to results.jsonl in the output directory and its report is written
+to <brief_id>.md. Each brief runs as a checkpointed thread named after the
+batch. Running the batch again therefore skips finished briefs, resumes
+interrupted ones from their last checkpoint, and retries failed ones.
+
+Budgets are not checkpointed: a resumed or retried brief starts with a fresh
+RunBudget, so across attempts a brief can spend up to its limits again.
+
+    python -m deep_research_from_scratch.batch_research briefs.jsonl --output-dir batch_out --concurrency 4
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import time
+from pathlib import Path
+from typing_extensions import Any, List, NotRequired, Optional, TypedDict
+
+from langchain_core.messages import HumanMessage
+
+from deep_research_from_scratch.budget import BudgetReport, RunBudget
+from deep_research_from_scratch.checkpointing import compile_with_checkpointer
+from deep_research_from_scratch.fair_scheduler import fair_scheduler, max_runs_per_tenant
+from deep_research_from_scratch.report_store import write_atomic
+from deep_research_from_scratch.search_cache import SearchCacheStats, search_cache
+
+logger = logging.getLogger(__name__)
+
+# ===== CONFIGURATION =====
+
+# Briefs researched at the same time (override with --concurrency)
+max_concurrent_briefs = 4
+
+# Scheduler tenant the batch's runs belong to, so interactive runs keep their share
+batch_tenant = "batch"
+
+# Priority of batch runs within the scheduler
+batch_priority = "low"
+
+# File in the output directory recording the outcome of every finished brief
+RESULTS_FILENAME = "results.jsonl"
+
+_FILENAME_RE = re.compile(r"[^A-Za-z0-9_.-]")
+
+# ===== SCHEMAS =====
+
+class BatchBrief(TypedDict):
+    """A brief to research, as read from the batch file."""
+    brief_id: str
+    brief: str
+    tags: NotRequired[List[str]]
+
+class BriefResult(TypedDict):
+    """Outcome and metrics of one brief, as recorded in results.jsonl."""
+    brief_id: str
+    status: str  # "completed", "needs_clarification" or "failed"
+    thread_id: str
+    report_id: Optional[str]
+    output_path: Optional[str]
+    elapsed_seconds: float
+    budget: Optional[BudgetReport]
+    cache: SearchCacheStats
+    error: Optional[str]
+    finished_at: float
+
+class BatchSummary(TypedDict):
+    """Totals over a batch run."""
+    briefs: int
+    completed: int
+    failed: int
+    skipped: int
+    elapsed_seconds: float
+    input_tokens: int
+    output_tokens: int
+    dollars: float
+    cache: SearchCacheStats
+
+# ===== INPUT AND PROGRESS =====
+
+def read_briefs(path: Path) -> List[BatchBrief]:
+    """Read briefs from a JSONL file, naming briefs that have no id.
+
+    Raises:
+        ValueError: If a line has no brief or two briefs share an id
+    """
+    briefs, seen = [], set()
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            text = str(record.get("brief", "")).strip()
+            if not text:
+                raise ValueError(f"{path}:{line_number}: missing brief")
+            brief_id = str(record.get("brief_id") or hashlib.sha256(text.encode("utf-8")).hexdigest()[:12])
+            if brief_id in seen:
+                raise ValueError(f"{path}:{line_number}: duplicate brief_id {brief_id!r}")
+            seen.add(brief_id)
+            brief = BatchBrief(brief_id=brief_id, brief=text)
+            if record.get("tags"):
+                brief["tags"] = [str(tag) for tag in record["tags"]]
+            briefs.append(brief)
+    return briefs
+
+def read_results(output_dir: Path) -> dict[str, BriefResult]:
+    """Read the latest recorded outcome of every brief in a batch's output directory."""
+    results = {}
+    path = Path(output_dir) / RESULTS_FILENAME
+    if path.exists():
+        for line in path.read_text(encoding="utf-8").splitlines():
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # a line cut short by a crash
+            results[result["brief_id"]] = result
+    return results
+
+def _append_result(output_dir: Path, result: BriefResult) -> None:
+    with open(Path(output_dir) / RESULTS_FILENAME, "a", encoding="utf-8") as f:
+        f.write(json.dumps(result) + "\n")
+
+# ===== RUNNING =====
+
+async def run_brief(brief: BatchBrief, batch_id: str, output_dir: Path, graph: Any, budget_limits: Optional[dict] = None) -> BriefResult:
+    """Research one brief, resuming its thread if an earlier attempt was interrupted.
+
+    Args:
+        brief: Brief to research
+        batch_id: Batch the brief belongs to, used to name its thread
+        output_dir: Directory the report is written to
+        graph: Compiled deep researcher
+        budget_limits: Keyword arguments for each brief's RunBudget
+
+    Returns:
+        The brief's outcome and metrics (failures are recorded, not raised)
+    """
+    thread_id = f"{batch_id}:{brief['brief_id']}"
+    budget = RunBudget(**(budget_limits or {}))
+    config = budget.attach({
+        "configurable": {
+            "thread_id": thread_id,
+            "tenant_id": batch_tenant,
+            "priority": batch_priority,
+            "allow_clarification": False,
+            "use_search_cache": True,
+            "report_tags": [f"batch:{batch_id}", *brief.get("tags", [])],
+        }
+    })
+
+    started = time.monotonic()
+    report_id, output_path, error = None, None, None
+    try:
+        inputs, values = {"messages": [HumanMessage(content=brief["brief"])]}, None
+        if graph.checkpointer is not None:
+            state = await graph.aget_state(config)
+            if state.next:
+                inputs = None  # interrupted: continue from the last checkpoint
+            elif state.values.get("report_id"):
+                values = state.values  # finished before its result was recorded
+        if values is None:
+            values = await graph.ainvoke(inputs, config)
+
+        report = values.get("final_report")
+        report_id = values.get("report_id")
+        if report:
+            path = Path(output_dir) / f"{_FILENAME_RE.sub('_', brief['brief_id'])}.md"
+            await asyncio.to_thread(write_atomic, path, report.encode("utf-8"))
+            output_path = str(path)
+            status = "completed"
+        else:
+            status = "needs_clarification"
+    except Exception as e:
+        status, error = "failed", f"{type(e).__name__}: {e}"
+    finally:
+        fair_scheduler.finish_run(batch_tenant, thread_id)
+
+    return BriefResult(
+        brief_id=brief["brief_id"],
+        status=status,
+        thread_id=thread_id,
+        report_id=report_id,
+        output_path=output_path,
+        elapsed_seconds=time.monotonic() - started,
+        budget=budget.report(),
+        cache=search_cache.pop_run_stats(thread_id),
+        error=error,
+        finished_at=time.time(),
+    )
+
+async def run_batch(
+    briefs_path: Path,
+    output_dir: Path,
+    max_concurrency: int = max_concurrent_briefs,
+    batch_id: Optional[str] = None,
+    budget_limits: Optional[dict] = None,
+    graph: Any = None,
+) -> BatchSummary:
+    """Research every brief in a JSONL file that has not been completed yet.
+
+    Args:
+        briefs_path: JSONL file of briefs
+        output_dir: Directory for reports and results.jsonl (reused to resume)
+        max_concurrency: Briefs researched at the same time
+        batch_id: Name of the batch's threads; defaults to the output directory's name
+        budget_limits: Keyword arguments for each brief's RunBudget (e.g. max_dollars)
+        graph: Compiled deep researcher; defaults to deep_researcher compiled
+            with the default checkpointer, so an interrupted batch resumes
+
+    Returns:
+        Totals over the briefs run this time (skipped briefs were completed earlier)
+
+    Raises:
+        ValueError: If max_concurrency exceeds the scheduler's runs per tenant
+    """
+    if not 1 <= max_concurrency <= max_runs_per_tenant:
+        raise ValueError(f"max_concurrency must be between 1 and max_runs_per_tenant ({max_runs_per_tenant})")
+    if graph is None:
+        # Imported here so reading briefs and results does not load the models
+        from deep_research_from_scratch.deep_research_agent import deep_researcher_builder
+
+        graph = compile_with_checkpointer(deep_researcher_builder)
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    batch_id = batch_id or output_dir.resolve().name
+    briefs = read_briefs(briefs_path)
+    done = {brief_id for brief_id, result in read_results(output_dir).items() if result["status"] == "completed"}
+    pending = [brief for brief in briefs if brief["brief_id"] not in done]
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    write_lock = asyncio.Lock()
+    started = time.monotonic()
+
+    async def run(brief: BatchBrief) -> BriefResult:
+        async with semaphore:
+            result = await run_brief(brief, batch_id, output_dir, graph, budget_limits)
+        async with write_lock:
+            await asyncio.to_thread(_append_result, output_dir, result)
+        logger.info("[%s] %s (%.0fs)", result["status"], result["brief_id"], result["elapsed_seconds"])
+        return result
+
+    results = await asyncio.gather(*(run(brief) for brief in pending))
+
+    budgets = [result["budget"] for result in results if result["budget"]]
+    return BatchSummary(
+        briefs=len(briefs),
+        completed=sum(result["status"] == "completed" for result in results),
+        failed=sum(result["status"] != "completed" for result in results),
+        skipped=len(briefs) - len(pending),
+        elapsed_seconds=time.monotonic() - started,
+        input_tokens=sum(budget["input_tokens"] for budget in budgets),
+        output_tokens=sum(budget["output_tokens"] for budget in budgets),
+        dollars=round(sum(budget["dollars"] for budget in budgets), 6),
+        cache=SearchCacheStats(**{
+            field: sum(result["cache"][field] for result in results) for field in SearchCacheStats.__annotations__
+        }),
+    )
+
+# ===== CLI =====
+
+def main() -> None:
+    """Run a batch of briefs and print its totals."""
+    parser = argparse.ArgumentParser(description="Research a JSONL file of briefs with shared caches and resumable progress.")
+    parser.add_argument("briefs", type=Path, help="JSONL file with one {\"brief\": ...} object per line")
+    parser.add_argument("--output-dir", type=Path, required=True, help="Directory for reports and results.jsonl")
+    parser.add_argument("--concurrency", type=int, default=max_concurrent_briefs, help="Briefs researched at the same time")
+    parser.add_argument("--batch-id", default=None, help="Name of the batch's threads (defaults to the output directory name)")
+    parser.add_argument("--max-dollars", type=float, default=None, help="Dollar budget of each brief")
+    parser.add_argument("--max-searches", type=int, default=None, help="Search budget of each brief")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    budget_limits = {"max_dollars": args.max_dollars, "max_searches": args.max_searches}
+    summary = asyncio.run(run_batch(args.briefs, args.output_dir, args.concurrency, args.batch_id, budget_limits))
+    print(json.dumps(summary, indent=2))  # noqa: T201
+
+if __name__ == "__main__":
+    main()
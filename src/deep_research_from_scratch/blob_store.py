@@ -0,0 +1,210 @@
+"""Content-Addressed Blob Store for Raw Research Notes.
+
+Raw research notes can hold megabytes of joined tool output. Instead of
+carrying that text through every graph transition and checkpoint, notes are
+written once to disk under their SHA-256 digest and only a short reference
+string is kept in state.
+
+Layout under the blob directory:
+- objects/<first 2 hex chars>/<sha256>: the note text, UTF-8 encoded
+- runs/<run_id>.refs: one reference per line for every blob a run wrote
+
+A run's blobs are released once it has saved its report. Writers and
+garbage collection hold a store-wide lock, shared across processes, so a
+blob that another run has just referenced is never deleted.
+"""
+
+import codecs
+import hashlib
+import os
+import re
+import sqlite3
+import tempfile
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing_extensions import Iterable, Iterator, List, Optional
+
+from langchain_core.runnables import RunnableConfig
+
+# ===== CONFIGURATION =====
+
+# Root directory of the blob store (kept next to the generated reports)
+blob_dir = Path(__file__).resolve().parent / "files" / ".blobs"
+
+# Prefix identifying a blob reference stored in place of note text
+BLOB_REF_PREFIX = "blob:sha256:"
+
+# Run id used when the graph is invoked without a thread id
+DEFAULT_RUN_ID = "default"
+
+_RUN_ID_RE = re.compile(r"[^A-Za-z0-9_.-]")
+
+# ===== REFERENCES =====
+
+def is_blob_ref(value: str) -> bool:
+    """Check whether a raw note is a blob reference rather than inline text."""
+    return isinstance(value, str) and value.startswith(BLOB_REF_PREFIX)
+
+def _digest_from_ref(ref: str) -> str:
+    if not is_blob_ref(ref):
+        raise ValueError(f"Not a blob reference: {ref[:80]!r}")
+    return ref[len(BLOB_REF_PREFIX):]
+
+def _object_path(digest: str) -> Path:
+    return blob_dir / "objects" / digest[:2] / digest
+
+def _run_manifest_path(run_id: str) -> Path:
+    return blob_dir / "runs" / f"{_RUN_ID_RE.sub('_', run_id)}.refs"
+
+@contextmanager
+def _store_lock() -> Iterator[None]:
+    """Hold the store-wide lock, waiting for other threads and processes."""
+    blob_dir.mkdir(parents=True, exist_ok=True)
+    # An IMMEDIATE transaction on a lock database is a cross-process mutex
+    conn = sqlite3.connect(blob_dir / "lock.sqlite", timeout=60, isolation_level=None)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        yield
+    finally:
+        conn.close()
+
+def get_run_id(config: Optional[RunnableConfig]) -> str:
+    """Get the run id blobs are attributed to for garbage collection.
+
+    Uses the thread id from the run configuration, falling back to a shared
+    default run when the graph is invoked without one.
+    """
+    configurable = (config or {}).get("configurable", {})
+    return str(configurable.get("thread_id") or DEFAULT_RUN_ID)
+
+# ===== WRITE =====
+
+def put_blob(text: str, run_id: str = DEFAULT_RUN_ID) -> str:
+    """Store text in the blob store and return its reference.
+
+    Identical text is stored once; writing it again only records the
+    reference for the given run.
+
+    Args:
+        text: Text to store
+        run_id: Run the blob belongs to, used for garbage collection
+
+    Returns:
+        Blob reference string to keep in state
+    """
+    data = text.encode("utf-8")
+    digest = hashlib.sha256(data).hexdigest()
+    path = _object_path(digest)
+    ref = BLOB_REF_PREFIX + digest
+    manifest = _run_manifest_path(run_id)
+
+    with _store_lock():
+        # Reference first, so garbage collection keeps the object from here on
+        manifest.parent.mkdir(parents=True, exist_ok=True)
+        with open(manifest, "a", encoding="utf-8") as f:
+            f.write(ref + "\n")
+
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file and rename so readers never see partial blobs
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+
+    return ref
+
+# ===== READ =====
+
+def iter_blob(ref: str, chunk_size: int = 64 * 1024) -> Iterator[str]:
+    """Stream the text of a blob in chunks without loading it all at once.
+
+    Args:
+        ref: Blob reference returned by put_blob
+        chunk_size: Number of bytes read per chunk
+
+    Yields:
+        Decoded text chunks
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    with open(_object_path(_digest_from_ref(ref)), "rb") as f:
+        while chunk := f.read(chunk_size):
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+def read_blob(ref: str) -> str:
+    """Read the full text of a blob."""
+    return "".join(iter_blob(ref))
+
+def iter_raw_notes(raw_notes: Iterable[str]) -> Iterator[str]:
+    """Lazily resolve raw notes, reading blob references from disk one at a time.
+
+    Notes that are plain text (e.g. from older checkpoints) are passed through.
+
+    Args:
+        raw_notes: Raw notes from state, as blob references or inline text
+
+    Yields:
+        The text of each note
+    """
+    for note in raw_notes:
+        yield read_blob(note) if is_blob_ref(note) else note
+
+# ===== GARBAGE COLLECTION =====
+
+def _read_manifest(path: Path) -> List[str]:
+    if not path.exists():
+        return []
+    return [line.strip() for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+def gc_run(run_id: str, refs: Optional[Iterable[str]] = None) -> int:
+    """Release the blobs written by a run.
+
+    Blobs still referenced by other runs are kept. Runs invoked without a
+    thread id all share the default run id, so they release only the
+    references they hold in state, one reference each, and leave the blobs
+    of concurrent runs alone.
+
+    Args:
+        run_id: Run whose blobs should be released
+        refs: References to release; defaults to every blob the run wrote
+
+    Returns:
+        Number of blob objects deleted from disk
+    """
+    manifest = _run_manifest_path(run_id)
+    with _store_lock():
+        written = Counter(_read_manifest(manifest))
+        released = written if refs is None else written & Counter(ref for ref in refs if is_blob_ref(ref))
+        remaining = written - released
+        if remaining:
+            manifest.write_text("".join(f"{ref}\n" for ref in remaining.elements()), encoding="utf-8")
+        elif manifest.exists():
+            manifest.unlink()
+
+        still_referenced = set()
+        for other in (blob_dir / "runs").glob("*.refs"):
+            still_referenced.update(_read_manifest(other))
+
+        deleted = 0
+        for ref in set(released) - still_referenced:
+            path = _object_path(_digest_from_ref(ref))
+            if path.exists():
+                path.unlink()
+                deleted += 1
+
+    return deleted
+
+def list_runs() -> List[str]:
+    """List the runs that currently hold blobs in the store."""
+    return sorted(path.stem for path in (blob_dir / "runs").glob("*.refs"))
@@ -0,0 +1,262 @@
+"""Run-Level Budgets for Research Runs.
+
+This module provides a budget shared by every part of a research run. Model
+calls draw tokens (and dollars) from it through a callback handler, web
+searches and researcher launches draw from it directly, and wall time is
+measured from the moment the budget is created.
+
+A budget is threaded through the run configuration:
+
+    budget = RunBudget(max_tokens=400_000, max_searches=40, max_dollars=1.0, max_seconds=600)
+    result = await deep_researcher.ainvoke(inputs, config=budget.attach({"configurable": {"thread_id": "1"}}))
+    result["budget_report"]
+
+As the budget runs low the run degrades gracefully: the supervisor launches
+fewer researchers, researchers take fewer search turns, and finally research
+stops early so the remaining budget goes to writing the report.
+
+Researchers running on an out-of-process executor still count as launches,
+but their tokens and searches are not tracked. A budget lives in memory only:
+it is not part of a run's checkpoints, so a run resumed from a checkpoint
+must be given a new budget and its earlier spending is not counted.
+"""
+
+import threading
+import time
+from typing_extensions import Any, List, Literal, Optional, TypedDict
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_core.runnables import RunnableConfig
+from langgraph.config import get_config
+
+# ===== CONFIGURATION =====
+
+# Prices used to turn usage into dollars (USD)
+input_token_price_per_million = 0.30
+output_token_price_per_million = 2.50
+search_price = 0.008
+
+# Remaining fraction of the tightest limit at which the run degrades:
+# below reduced_budget_fraction fewer researchers and shorter loops, below
+# minimal_budget_fraction a single short researcher at a time, and below
+# finalize_budget_fraction research stops (the rest is kept for the report)
+reduced_budget_fraction = 0.5
+minimal_budget_fraction = 0.2
+finalize_budget_fraction = 0.05
+
+BudgetLevel = Literal["normal", "reduced", "minimal", "exhausted"]
+
+# ===== SCHEMAS =====
+
+class BudgetLevelChange(TypedDict):
+    """The point in a run where its budget level changed."""
+    level: BudgetLevel
+    elapsed_seconds: float
+    remaining_fraction: float
+
+class BudgetReport(TypedDict):
+    """Usage of a run's budget, attached to the final state."""
+    limits: dict[str, Optional[float]]
+    input_tokens: int
+    output_tokens: int
+    model_calls: int
+    searches: int
+    researchers: int
+    dollars: float
+    elapsed_seconds: float
+    remaining_fraction: float
+    level: BudgetLevel
+    level_changes: List[BudgetLevelChange]
+
+# ===== BUDGET =====
+
+class RunBudget:
+    """Token, search, dollar and wall-time limits for one research run.
+
+    Any limit left as None is not enforced. The budget is thread-safe, since
+    searches and summaries run on thread pools.
+    """
+
+    def __init__(
+        self,
+        max_tokens: Optional[int] = None,
+        max_searches: Optional[int] = None,
+        max_dollars: Optional[float] = None,
+        max_seconds: Optional[float] = None,
+    ):
+        """Create a budget with the given limits, starting the wall clock now."""
+        self.max_tokens = max_tokens
+        self.max_searches = max_searches
+        self.max_dollars = max_dollars
+        self.max_seconds = max_seconds
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.model_calls = 0
+        self.searches = 0
+        self.researchers = 0
+        self._started_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._level: BudgetLevel = "normal"
+        self._level_changes: List[BudgetLevelChange] = []
+
+    def attach(self, config: Optional[RunnableConfig] = None) -> RunnableConfig:
+        """Add this budget and its token-tracking callback to a run configuration.
+
+        Args:
+            config: Run configuration to extend
+
+        Returns:
+            New configuration with configurable.run_budget and the callback set
+        """
+        config = dict(config or {})
+        config["configurable"] = {**config.get("configurable", {}), "run_budget": self}
+        config["callbacks"] = list(config.get("callbacks") or []) + [BudgetCallbackHandler(self)]
+        return config
+
+    # ----- Drawing from the budget -----
+
+    def record_usage(self, input_tokens: int, output_tokens: int) -> None:
+        """Charge the tokens used by one model call."""
+        with self._lock:
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+            self.model_calls += 1
+
+    def reserve_searches(self, requested: int) -> int:
+        """Charge up to `requested` searches and return how many may run."""
+        with self._lock:
+            allowed = requested
+            if self.max_searches is not None:
+                allowed = max(0, min(requested, self.max_searches - self.searches))
+            if self.max_dollars is not None and search_price > 0:
+                allowed = max(0, min(allowed, int((self.max_dollars - self._dollars()) / search_price)))
+            self.searches += allowed
+            return allowed
+
+    def record_researcher(self) -> None:
+        """Charge the launch of one researcher."""
+        with self._lock:
+            self.researchers += 1
+
+    # ----- Remaining budget -----
+
+    def _dollars(self) -> float:
+        return (
+            self.input_tokens * input_token_price_per_million / 1_000_000
+            + self.output_tokens * output_token_price_per_million / 1_000_000
+            + self.searches * search_price
+        )
+
+    @property
+    def dollars(self) -> float:
+        """Estimated spend so far."""
+        with self._lock:
+            return self._dollars()
+
+    @property
+    def elapsed_seconds(self) -> float:
+        """Wall time since the budget was created."""
+        return time.monotonic() - self._started_at
+
+    def remaining_fraction(self) -> float:
+        """Fraction left of the tightest limit (1.0 when no limit is set)."""
+        with self._lock:
+            used_and_limits = [
+                (self.input_tokens + self.output_tokens, self.max_tokens),
+                (self.searches, self.max_searches),
+                (self._dollars(), self.max_dollars),
+                (self.elapsed_seconds, self.max_seconds),
+            ]
+        fractions = [max(0.0, 1 - used / limit) for used, limit in used_and_limits if limit]
+        return min(fractions, default=1.0)
+
+    def level(self) -> BudgetLevel:
+        """Get how far the run should degrade, recording every change of level."""
+        remaining = self.remaining_fraction()
+        if remaining <= finalize_budget_fraction:
+            level = "exhausted"
+        elif remaining <= minimal_budget_fraction:
+            level = "minimal"
+        elif remaining <= reduced_budget_fraction:
+            level = "reduced"
+        else:
+            level = "normal"
+
+        with self._lock:
+            if level != self._level:
+                self._level = level
+                self._level_changes.append(BudgetLevelChange(
+                    level=level,
+                    elapsed_seconds=self.elapsed_seconds,
+                    remaining_fraction=remaining
+                ))
+        return level
+
+    def max_researchers(self, requested: int) -> int:
+        """Scale the number of researchers to launch at once to the remaining budget."""
+        return {
+            "normal": requested,
+            "reduced": max(1, requested // 2),
+            "minimal": 1,
+            "exhausted": 0,
+        }[self.level()]
+
+    def report(self) -> BudgetReport:
+        """Summarize the budget's limits and usage."""
+        level = self.level()
+        remaining = self.remaining_fraction()
+        with self._lock:
+            return BudgetReport(
+                limits={
+                    "max_tokens": self.max_tokens,
+                    "max_searches": self.max_searches,
+                    "max_dollars": self.max_dollars,
+                    "max_seconds": self.max_seconds,
+                },
+                input_tokens=self.input_tokens,
+                output_tokens=self.output_tokens,
+                model_calls=self.model_calls,
+                searches=self.searches,
+                researchers=self.researchers,
+                dollars=round(self._dollars(), 6),
+                elapsed_seconds=self.elapsed_seconds,
+                remaining_fraction=remaining,
+                level=level,
+                level_changes=list(self._level_changes),
+            )
+
+class BudgetCallbackHandler(BaseCallbackHandler):
+    """Charge the token usage of every model call in a run to its budget."""
+
+    # Record usage as soon as a call ends, even for async runs
+    run_inline = True
+
+    def __init__(self, budget: RunBudget):
+        """Charge model calls to the given budget."""
+        self.budget = budget
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        """Record the token usage of a finished model call."""
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    self.budget.record_usage(usage.get("input_tokens", 0), usage.get("output_tokens", 0))
+
+def get_run_budget(config: Optional[RunnableConfig] = None) -> Optional[RunBudget]:
+    """Get the budget of the current run, if it has one.
+
+    Args:
+        config: Run configuration; defaults to the configuration of the graph
+            run this is called from
+
+    Returns:
+        The run's budget, or None for unbudgeted runs
+    """
+    if config is None:
+        try:
+            config = get_config()
+        except RuntimeError:
+            return None
+    return config.get("configurable", {}).get("run_budget")
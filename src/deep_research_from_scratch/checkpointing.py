@@ -0,0 +1,459 @@
+"""Durable Checkpointing of Research Runs.
+
+The module-level graphs are compiled without a checkpointer, so they can be
+invoked without a thread_id and served by a LangGraph server that manages
+its own persistence. Callers that want durable runs opt in by compiling a
+graph builder with a persistent checkpointer; a run that crashes or is
+stopped can then be resumed from its last completed super-step by invoking
+the graph again with the same thread_id and None as input:
+
+    deep_researcher = compile_with_checkpointer(deep_researcher_builder)
+    config = {"configurable": {"thread_id": "run-1"}}
+    await deep_researcher.ainvoke(None, config)
+
+Checkpointers are pluggable backends, selected by name like research
+executors:
+- "sqlite": a SQLite database in the files directory (default)
+- "memory": LangGraph's in-process InMemorySaver, for tests and notebooks
+- "none": no checkpointing
+Other backends (e.g. Postgres) are registered with register_checkpointer.
+
+The SQLite backend is langgraph-checkpoint-sqlite's SqliteSaver; its
+checkpoints are kept compact by serializing them with CompressedSerializer,
+which compresses values above a size threshold.
+
+Researchers run inside a single supervisor step, so LangGraph alone would
+rerun all of a step's researchers on resume. Each completed researcher is
+therefore also recorded in a research journal keyed by thread and topic;
+on resume, researchers already in the journal return their recorded
+result immediately and only the incomplete ones run again. The journal is
+scoped to one run: it is cleared when a thread starts on new input.
+
+Write overhead is measured per super-step (the checkpoint and the task
+writes that produced it) and reported by checkpoint_write_stats().
+"""
+
+import argparse
+import asyncio
+import json
+import copy
+import sqlite3
+import threading
+import time
+import zlib
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing_extensions import Any, AsyncIterator, Iterator, List, Optional, Sequence, TypedDict
+
+import numpy as np
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.constants import CONFIG_KEY_CHECKPOINTER
+from langgraph.graph import StateGraph
+from langgraph.graph.state import CompiledStateGraph
+
+from deep_research_from_scratch.state_multi_agent_supervisor import topic_key
+
+# ===== CONFIGURATION =====
+
+# Checkpointer compile_with_checkpointer uses ("sqlite", "memory", "none" or a
+# registered backend)
+default_checkpointer = "sqlite"
+
+# SQLite database holding checkpoints and the research journal
+checkpoint_db_path = Path(__file__).resolve().parent / "files" / ".checkpoints.sqlite"
+
+# Serialized values at least this large are compressed
+compress_min_bytes = 1024
+
+# zlib compression level for checkpoint values
+compression_level = 6
+
+# Number of recent super-steps whose write overhead is kept for statistics
+write_latency_samples = 1000
+
+# ===== SERIALIZATION =====
+
+_COMPRESSED_SUFFIX = "+zlib"
+
+class CompressedSerializer(SerializerProtocol):
+    """Serializer that zlib-compresses large values produced by another serializer.
+
+    Compressed values are tagged by appending "+zlib" to the inner type, so
+    small values stay uncompressed and databases written without
+    compression remain readable.
+    """
+
+    def __init__(self, serde: Optional[SerializerProtocol] = None, min_bytes: int = compress_min_bytes, level: int = compression_level):
+        """Wrap serde (JsonPlusSerializer by default), compressing values of at least min_bytes."""
+        self.serde = serde or JsonPlusSerializer()
+        self.min_bytes = min_bytes
+        self.level = level
+
+    def dumps_typed(self, obj: Any) -> tuple[str, bytes]:
+        """Serialize obj with the inner serializer, compressing it if large."""
+        type_, data = self.serde.dumps_typed(obj)
+        if len(data) >= self.min_bytes:
+            compressed = zlib.compress(data, self.level)
+            if len(compressed) < len(data):
+                return type_ + _COMPRESSED_SUFFIX, compressed
+        return type_, data
+
+    def loads_typed(self, data: tuple[str, bytes]) -> Any:
+        """Deserialize a value, decompressing it first if it was compressed."""
+        type_, payload = data
+        if type_.endswith(_COMPRESSED_SUFFIX):
+            return self.serde.loads_typed((type_[:-len(_COMPRESSED_SUFFIX)], zlib.decompress(payload)))
+        return self.serde.loads_typed((type_, payload))
+
+# ===== SCHEMAS =====
+
+class CheckpointWriteStats(TypedDict):
+    """Checkpoint write overhead measured in this process."""
+    super_steps: int
+    task_writes: int
+    mean_step_ms: float
+    p95_step_ms: float
+    max_step_ms: float
+
+# ===== RESEARCH JOURNAL =====
+
+class ResearchJournal:
+    """Completed researcher results of checkpointed runs, keyed by thread and topic."""
+
+    def __init__(self, path: Path = checkpoint_db_path):
+        """Keep the journal in the SQLite database at path."""
+        self.path = Path(path)
+        self._schema_ready = False
+
+    @contextmanager
+    def connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection to the journal, creating its table if needed."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            if not self._schema_ready:
+                conn.execute(
+                    """CREATE TABLE IF NOT EXISTS research_journal (
+                        thread_id TEXT NOT NULL,
+                        topic_key TEXT NOT NULL,
+                        compressed_research TEXT NOT NULL,
+                        raw_notes TEXT NOT NULL,
+                        completed_at REAL NOT NULL,
+                        PRIMARY KEY (thread_id, topic_key)
+                    )"""
+                )
+                self._schema_ready = True
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def record(self, thread_id: str, research_topic: str, result: dict) -> None:
+        """Record a researcher's result for a topic in a run."""
+        with self.connect() as conn:
+            conn.execute(
+                """INSERT OR REPLACE INTO research_journal
+                (thread_id, topic_key, compressed_research, raw_notes, completed_at) VALUES (?, ?, ?, ?, ?)""",
+                (
+                    thread_id, topic_key(research_topic), result.get("compressed_research", ""),
+                    json.dumps(list(result.get("raw_notes", []))), time.time()
+                )
+            )
+
+    def lookup(self, thread_id: str, research_topic: str) -> Optional[dict]:
+        """Get the recorded result of a topic in a run, or None if it has not completed."""
+        with self.connect() as conn:
+            row = conn.execute(
+                "SELECT compressed_research, raw_notes FROM research_journal WHERE thread_id = ? AND topic_key = ?",
+                (thread_id, topic_key(research_topic))
+            ).fetchone()
+        if row is None:
+            return None
+        return {"compressed_research": row[0], "raw_notes": json.loads(row[1])}
+
+    def delete_thread(self, thread_id: str) -> None:
+        """Forget the results recorded for a run."""
+        with self.connect() as conn:
+            conn.execute("DELETE FROM research_journal WHERE thread_id = ?", (thread_id,))
+
+def get_research_journal(config: RunnableConfig) -> Optional[tuple[ResearchJournal, str]]:
+    """Get the research journal of a checkpointed run and the run's thread id.
+
+    Returns None when the run has no thread id or its checkpointer keeps no
+    journal (e.g. the in-memory backend).
+    """
+    configurable = config.get("configurable", {})
+    thread_id = configurable.get("thread_id")
+    journal = getattr(configurable.get(CONFIG_KEY_CHECKPOINTER), "research_journal", None)
+    if thread_id is None or journal is None:
+        return None
+    return journal, str(thread_id)
+
+def reset_research_journal(config: RunnableConfig) -> None:
+    """Forget the results recorded for a run's thread, when it starts on new input."""
+    journal = get_research_journal(config)
+    if journal is not None:
+        research_journal, thread_id = journal
+        research_journal.delete_thread(thread_id)
+
+# ===== SQLITE SAVER =====
+
+class SqliteCheckpointSaver(SqliteSaver):
+    """langgraph-checkpoint-sqlite's SqliteSaver with compression, a research journal and write timing.
+
+    Checkpoints use the maintained saver's schema; values are serialized by
+    a CompressedSerializer. The saver's connection is shared across threads
+    behind its lock, so the async methods run the sync ones off the event
+    loop, which keeps a single instance usable from any event loop.
+    """
+
+    def __init__(self, path: Path = checkpoint_db_path, *, serde: Optional[SerializerProtocol] = None):
+        """Open the checkpoint database at path, creating its directory if needed."""
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        super().__init__(sqlite3.connect(self.path, timeout=30, check_same_thread=False), serde=serde or CompressedSerializer())
+        self.research_journal = ResearchJournal(self.path)
+        self._stats_lock = threading.Lock()
+        self._pending_write_ms: dict[tuple[str, str, str], float] = defaultdict(float)
+        self._step_ms: deque[float] = deque(maxlen=write_latency_samples)
+        self._super_steps = 0
+        self._task_writes = 0
+
+    def with_allowlist(self, extra_allowlist) -> "SqliteCheckpointSaver":
+        """Return a clone whose inner msgpack serializer has a derived allowlist."""
+        if not isinstance(self.serde, CompressedSerializer) or not isinstance(self.serde.serde, JsonPlusSerializer):
+            return super().with_allowlist(extra_allowlist)
+        inner = self.serde.serde.with_msgpack_allowlist(extra_allowlist)
+        if inner is self.serde.serde:
+            return self
+        clone = copy.copy(self)
+        clone.serde = CompressedSerializer(inner, self.serde.min_bytes, self.serde.level)
+        return clone
+
+    # ----- Writing -----
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """Save a checkpoint, recording the write overhead of the super-step it ends."""
+        started = time.perf_counter()
+        saved = super().put(config, checkpoint, metadata, new_versions)
+
+        # A super-step's overhead is this checkpoint plus the task writes saved against its parent
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        parent = (str(config["configurable"]["thread_id"]), config["configurable"].get("checkpoint_ns", ""), config["configurable"].get("checkpoint_id") or "")
+        with self._stats_lock:
+            self._step_ms.append(elapsed_ms + self._pending_write_ms.pop(parent, 0.0))
+            self._super_steps += 1
+        return saved
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        """Save the writes a task produced against a checkpoint, recording their write overhead."""
+        started = time.perf_counter()
+        super().put_writes(config, writes, task_id, task_path)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        checkpoint = (str(config["configurable"]["thread_id"]), config["configurable"].get("checkpoint_ns", ""), config["configurable"]["checkpoint_id"])
+        with self._stats_lock:
+            self._pending_write_ms[checkpoint] += elapsed_ms
+            self._task_writes += 1
+
+    def delete_thread(self, thread_id: str) -> None:
+        """Delete a thread's checkpoints, writes and research journal."""
+        super().delete_thread(thread_id)
+        self.research_journal.delete_thread(str(thread_id))
+
+    # ----- Async -----
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """Get the checkpoint named by config, or the thread's latest one, off the event loop."""
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        """List checkpoints, newest first, reading them off the event loop."""
+        tuples = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for checkpoint_tuple in tuples:
+            yield checkpoint_tuple
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """Save a checkpoint off the event loop."""
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        """Save a task's writes off the event loop."""
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        """Delete a thread's checkpoints, writes and research journal off the event loop."""
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    # ----- Inspection -----
+
+    def threads(self) -> List[tuple[str, int, str]]:
+        """Get the checkpointed threads as (thread id, checkpoints, last checkpoint time), newest first."""
+        with self.cursor(transaction=False) as cur:
+            rows = cur.execute(
+                """SELECT thread_id, COUNT(*) FROM checkpoints
+                WHERE checkpoint_ns = '' GROUP BY thread_id ORDER BY MAX(checkpoint_id) DESC"""
+            ).fetchall()
+        threads = []
+        for thread_id, checkpoints in rows:
+            latest = self.get_tuple({"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}})
+            threads.append((thread_id, checkpoints, latest.checkpoint["ts"] if latest else ""))
+        return threads
+
+    def write_stats(self) -> CheckpointWriteStats:
+        """Get the write overhead per super-step measured in this process."""
+        with self._stats_lock:
+            samples = np.array(self._step_ms, dtype=np.float64)
+            return CheckpointWriteStats(
+                super_steps=self._super_steps,
+                task_writes=self._task_writes,
+                mean_step_ms=float(samples.mean()) if samples.size else 0.0,
+                p95_step_ms=float(np.percentile(samples, 95)) if samples.size else 0.0,
+                max_step_ms=float(samples.max()) if samples.size else 0.0,
+            )
+
+# ===== REGISTRY =====
+
+_checkpointers: dict[str, Optional[BaseCheckpointSaver]] = {}
+
+_checkpointer_factories = {
+    "sqlite": SqliteCheckpointSaver,
+    "memory": InMemorySaver,
+    "none": lambda: None,
+}
+
+def register_checkpointer(name: str, checkpointer: BaseCheckpointSaver) -> None:
+    """Make a custom checkpointer (e.g. a Postgres saver) selectable by name."""
+    _checkpointers[name] = checkpointer
+
+def get_checkpointer(name: Optional[str] = None) -> Optional[BaseCheckpointSaver]:
+    """Get the shared checkpointer instance for a backend name.
+
+    Args:
+        name: Backend name; defaults to default_checkpointer
+
+    Returns:
+        Checkpointer instance, created on first use (None for "none")
+    """
+    name = name or default_checkpointer
+    if name not in _checkpointers:
+        if name not in _checkpointer_factories:
+            raise ValueError(f"Unknown checkpointer {name!r}; expected one of {sorted(_checkpointer_factories)}")
+        _checkpointers[name] = _checkpointer_factories[name]()
+    return _checkpointers[name]
+
+def compile_with_checkpointer(builder: StateGraph, name: Optional[str] = None) -> CompiledStateGraph:
+    """Compile a graph builder with a persistent checkpointer, for resumable runs.
+
+    State accumulates per thread (notes and raw_notes are appended to), so
+    each new request should run on a new thread_id.
+
+    Args:
+        builder: Graph builder, e.g. deep_researcher_builder
+        name: Backend name; defaults to default_checkpointer
+
+    Returns:
+        Compiled graph checkpointing every super-step
+    """
+    return builder.compile(checkpointer=get_checkpointer(name))
+
+async def load_thread_values(thread_id: str, config: Optional[RunnableConfig] = None) -> Optional[dict[str, Any]]:
+    """Get the state values of a checkpointed run's latest checkpoint, whatever graph ran it.
+
+    Args:
+        thread_id: Thread of the run
+        config: Configuration of the calling run, whose checkpointer is used;
+            defaults to the default checkpointer
+
+    Returns:
+        The run's channel values, or None if the thread has no checkpoint
+    """
+    checkpointer = (config or {}).get("configurable", {}).get(CONFIG_KEY_CHECKPOINTER) or get_checkpointer()
+    if checkpointer is None:
+        return None
+    checkpoint_tuple = await checkpointer.aget_tuple({"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}})
+    return checkpoint_tuple.checkpoint["channel_values"] if checkpoint_tuple else None
+
+def checkpoint_write_stats(name: Optional[str] = None) -> Optional[CheckpointWriteStats]:
+    """Get the per-super-step write overhead of a checkpointer, if it measures it."""
+    checkpointer = get_checkpointer(name)
+    return checkpointer.write_stats() if isinstance(checkpointer, SqliteCheckpointSaver) else None
+
+# ===== CLI =====
+
+def main() -> None:
+    """List, resume or delete checkpointed deep research runs."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("threads", help="list checkpointed runs")
+    resume_parser = subparsers.add_parser("resume", help="resume a run from its last checkpoint")
+    resume_parser.add_argument("thread_id")
+    delete_parser = subparsers.add_parser("delete", help="delete a run's checkpoints")
+    delete_parser.add_argument("thread_id")
+    args = parser.parse_args()
+
+    saver = SqliteCheckpointSaver()
+    if args.command == "threads":
+        for thread_id, checkpoints, last_at in saver.threads():
+            print(f"{thread_id}\t{checkpoints} checkpoints\t{last_at}")  # noqa: T201
+    elif args.command == "delete":
+        saver.delete_thread(args.thread_id)
+    else:
+        # Imported here so listing and deleting runs does not load the models
+        from deep_research_from_scratch.deep_research_agent import deep_researcher_builder
+
+        deep_researcher = compile_with_checkpointer(deep_researcher_builder, "sqlite")
+        config = {"configurable": {"thread_id": args.thread_id}}
+        state = deep_researcher.get_state(config)
+        if not state.next:
+            print(f"Run {args.thread_id} has nothing left to do")  # noqa: T201
+            return
+        result = asyncio.run(deep_researcher.ainvoke(None, config))
+        print(result.get("final_report", ""))  # noqa: T201
+        print(json.dumps(checkpoint_write_stats(), indent=2))  # noqa: T201
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""Global Citation Index for Research Reports.
+
+Every source gets a stable ID derived from its normalized URL, so the same
+page has the same ID in every researcher's notes, in any process, without
+coordination. IDs are assigned when search results are formatted for the
+researcher; the researcher cites by ID, and its notes end with a
+machine-readable source index block listing the sources it cites.
+
+When the report is written, the index blocks of all notes are merged into
+one CitationIndex and stripped from the findings, so the writer sees only
+IDs and titles. After generation, IDs are renumbered in order of first
+citation and the Sources section is rendered on the CPU, instead of the
+model deduplicating and numbering sources itself.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+from urllib.parse import urlsplit, urlunsplit
+
+from typing_extensions import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# ===== CONFIGURATION =====
+
+# Hex digits of the URL hash used in source IDs (48 bits keep collisions
+# negligible across every source a deployment will ever index)
+source_id_chars = 12
+
+# Hex digits of source IDs in notes written before IDs were widened; they are
+# still resolved by prefix, so cached research keeps its citations
+legacy_source_id_chars = 6
+
+# Heading of the source index block appended to research notes
+SOURCE_INDEX_HEADING = "### Source Index"
+
+_SOURCE_ID_PATTERN = rf"S[0-9a-f]{{{legacy_source_id_chars}}}(?:[0-9a-f]{{{source_id_chars - legacy_source_id_chars}}})?"
+_CITATION_RE = re.compile(rf"\[({_SOURCE_ID_PATTERN})\]")
+_SPACED_CITATION_RE = re.compile(rf"([ \t]*)\[({_SOURCE_ID_PATTERN})\]")
+_REPEATED_NUMBER_RE = re.compile(r"\[(\d+)\](?:\[\1\])+")
+_SEARCH_SOURCE_RE = re.compile(rf"--- SOURCE \[({_SOURCE_ID_PATTERN})\]: (.*?) ---\nURL: (\S+)")
+_INDEX_ENTRY_RE = re.compile(rf"^\[({_SOURCE_ID_PATTERN})\] (.*): (\S+)$", re.MULTILINE)
+_INDEX_BLOCK_RE = re.compile(rf"\n*{re.escape(SOURCE_INDEX_HEADING)}\n.*\Z", re.DOTALL)
+_RENDERED_SOURCES_RE = re.compile(r"\n*### Sources\n+((?:\[\d+\] .*: \S+\n?)+)\s*\Z")
+_RENDERED_ENTRY_RE = re.compile(r"^\[(\d+)\] (.*): (\S+)$", re.MULTILINE)
+_NUMBER_CITATION_RE = re.compile(r"\[(\d+)\]")
+_SOURCES_SECTION_RE = re.compile(r"(?:\A|\n)[ \t]*(?:#{1,6}[ \t]*)?\**Sources:?\**[ \t]*\n.*\Z", re.DOTALL | re.IGNORECASE)
+
+# ===== SOURCE IDS =====
+
+def normalize_url(url: str) -> str:
+    """Normalize a URL so trivially different spellings of a page share an ID."""
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ""))
+
+def source_id(url: str) -> str:
+    """Get the stable source ID of a URL, e.g. S3f9a2c81d07e."""
+    return "S" + hashlib.sha1(normalize_url(url).encode("utf-8")).hexdigest()[:source_id_chars]
+
+def cited_source_ids(text: str) -> list[str]:
+    """Get the source IDs cited in a text, in order of first citation."""
+    return list(dict.fromkeys(_CITATION_RE.findall(text)))
+
+# ===== INDEX =====
+
+class CitationIndex:
+    """Sources by stable ID, merged from search results and research notes.
+
+    The index is thread-safe, since search results are processed on thread pools.
+    """
+
+    def __init__(self):
+        """Create an empty index."""
+        self._sources: dict[str, tuple[str, str]] = {}
+        self._legacy_ids: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def add(self, url: str, title: str) -> str:
+        """Register a source and return its ID (the first title seen for a URL is kept)."""
+        sid = source_id(url)
+        with self._lock:
+            existing = self._sources.setdefault(sid, (title.strip() or url, url))
+            self._legacy_ids.setdefault(sid[:legacy_source_id_chars + 1], sid)
+        if normalize_url(existing[1]) != normalize_url(url):
+            logger.warning("Source ID collision: %s is %s, not %s", sid, existing[1], url)
+        return sid
+
+    def resolve(self, sid: str) -> Optional[str]:
+        """Get the indexed ID of a cited source ID, mapping legacy short IDs by prefix."""
+        if sid in self._sources:
+            return sid
+        return self._legacy_ids.get(sid)
+
+    def get(self, sid: str) -> Optional[tuple[str, str]]:
+        """Get the (title, URL) of a source ID."""
+        resolved = self.resolve(sid)
+        return self._sources[resolved] if resolved else None
+
+    def __contains__(self, sid: str) -> bool:
+        """Check whether a cited source ID resolves to an indexed source."""
+        return self.resolve(sid) is not None
+
+    def __len__(self) -> int:
+        """Count the indexed sources."""
+        return len(self._sources)
+
+    @classmethod
+    def from_texts(cls, texts: Iterable[str]) -> "CitationIndex":
+        """Build an index from formatted search results and source index blocks."""
+        index = cls()
+        for text in texts:
+            for _, title, url in _SEARCH_SOURCE_RE.findall(text) + _INDEX_ENTRY_RE.findall(text):
+                index.add(url, title)
+        return index
+
+    def update(self, other: "CitationIndex") -> None:
+        """Add every source of another index."""
+        sources = dict(other._sources)
+        with self._lock:
+            for sid, source in sources.items():
+                self._sources.setdefault(sid, source)
+                self._legacy_ids.setdefault(sid[:legacy_source_id_chars + 1], sid)
+
+    def render_index_block(self, sids: Iterable[str]) -> str:
+        """Render the source index block appended to research notes."""
+        lines = [f"[{sid}] {self.get(sid)[0]}: {self.get(sid)[1]}" for sid in sids if sid in self]
+        return f"{SOURCE_INDEX_HEADING}\n" + "\n".join(lines) if lines else ""
+
+    def render_catalog(self) -> str:
+        """Render the IDs and titles of all sources, for the report writer's prompt."""
+        return "\n".join(f"[{sid}] {title}" for sid, (title, _) in self._sources.items())
+
+    def render_report(self, report: str) -> str:
+        """Number a report's citations and append its Sources section.
+
+        Source IDs are numbered in order of first citation; IDs not in the
+        index are dropped, and any Sources section the model wrote is
+        replaced. A report without ID citations is returned unchanged.
+
+        Args:
+            report: Report text citing sources by ID
+
+        Returns:
+            Report with numbered citations and a deterministic Sources section
+        """
+        cited = list(dict.fromkeys(filter(None, map(self.resolve, cited_source_ids(report)))))
+        if not cited and not _CITATION_RE.search(report):
+            return report
+        numbers = {sid: number for number, sid in enumerate(cited, 1)}
+
+        def number_citation(match: re.Match) -> str:
+            space, sid = match.groups()
+            sid = self.resolve(sid)
+            return f"{space}[{numbers[sid]}]" if sid in numbers else ""
+
+        body = _REPEATED_NUMBER_RE.sub(r"[\1]", _SPACED_CITATION_RE.sub(number_citation, report))
+        body = _SOURCES_SECTION_RE.sub("", body).rstrip()
+        if not cited:
+            return body + "\n"
+        sources = "\n".join(f"[{numbers[sid]}] {self._sources[sid][0]}: {self._sources[sid][1]}" for sid in cited)
+        return f"{body}\n\n### Sources\n\n{sources}\n"
+
+def unrender_report(report: str) -> tuple[str, CitationIndex]:
+    """Turn a rendered report back into text citing sources by ID.
+
+    The inverse of CitationIndex.render_report, used to revise a saved
+    report: its Sources section is parsed into an index and removed, and
+    numbered citations are replaced by the IDs of the sources they number.
+
+    Returns:
+        The report without its Sources section, citing by ID, and the index of its sources
+    """
+    index = CitationIndex()
+    match = _RENDERED_SOURCES_RE.search(report)
+    if match is None:
+        return report, index
+    numbers = {number: index.add(url, title) for number, title, url in _RENDERED_ENTRY_RE.findall(match.group(1))}
+    body = _NUMBER_CITATION_RE.sub(
+        lambda citation: f"[{numbers[citation.group(1)]}]" if citation.group(1) in numbers else citation.group(0),
+        report[:match.start()]
+    )
+    return body.rstrip() + "\n", index
+
+# ===== NOTES =====
+
+def strip_source_index(note: str) -> str:
+    """Remove the source index block from the end of a research note."""
+    return _INDEX_BLOCK_RE.sub("", note)
+
+def prepare_findings(notes: list[str]) -> tuple[list[str], CitationIndex]:
+    """Merge the source indexes of research notes and strip them from the notes.
+
+    Returns:
+        The notes without their index blocks, and the merged citation index
+    """
+    return [strip_source_index(note) for note in notes], CitationIndex.from_texts(notes)
+
+def format_source_catalog(index: CitationIndex) -> str:
+    """Format the sources the writer may cite, to append to the findings."""
+    if not len(index):
+        return ""
+    return f"\n\n<Source Catalog>\n{index.render_catalog()}\n</Source Catalog>"
@@ -9,16 +9,25 @@ This module integrates all components of the research system:
 - Final report generation
 
 The system orchestrates the complete research workflow from initial user
-input through final report delivery.
+input through final report delivery. deep_researcher is compiled without a
+checkpointer; for runs that resume from their last completed step after an
+interruption, compile deep_researcher_builder with
+checkpointing.compile_with_checkpointer.
 """
 
-import os
-import uuid
-from langchain_core.messages import HumanMessage
+import asyncio
+from pathlib import Path
+
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, START, END
 
-from deep_research_from_scratch.utils import get_today_str
-from deep_research_from_scratch.prompts import final_report_generation_prompt
+from deep_research_from_scratch.blob_store import gc_run, get_run_id
+from deep_research_from_scratch.budget import get_run_budget
+from deep_research_from_scratch.fair_scheduler import fair_scheduler, release_on_finish
+from deep_research_from_scratch.report_archive import apply_retention, retention_on_save
+from deep_research_from_scratch.report_catalog import report_catalog
+from deep_research_from_scratch.report_store import ReportDraft, report_path, save_report
+from deep_research_from_scratch.report_writer import write_report
 from deep_research_from_scratch.state_scope import AgentState, AgentInputState
 from deep_research_from_scratch.research_agent_scope import clarify_with_user, write_research_brief
 from deep_research_from_scratch.multi_agent_supervisor import supervisor_agent
@@ -32,58 +41,78 @@ writer_model = init_chat_model("google_genai:models/gemini-flash-latest") # mode
 
 from deep_research_from_scratch.state_scope import AgentState
 
-async def final_report_generation(state: AgentState):
+async def final_report_generation(state: AgentState, config: RunnableConfig):
     """
     Final report generation node.
 
-    Synthesizes all research findings into a comprehensive final report
+    Synthesizes all research findings into a comprehensive final report.
+    Long reports are written outline-first with their sections in parallel;
+    shorter ones in one call streamed token by token (visible to callers with
+    stream_mode="messages"). The report is appended to a draft file as it is
+    generated. Attaches the budget report when the run was given a budget,
+    and the queue-time metrics of the run's scheduler tenant
     """
 
     notes = state.get("notes", [])
 
-    findings = "\n".join(notes)
-
-    final_report_prompt = final_report_generation_prompt.format(
-        research_brief=state.get("research_brief", ""),
-        findings=findings,
-        date=get_today_str()
-    )
+    # Write the report into the draft file as it is generated
+    draft = await ReportDraft.create()
+    try:
+        final_report_text, report_usage = await write_report(
+            notes, state.get("research_brief", ""), writer_model, config, on_text=draft.append
+        )
+        await draft.flush()
+    except BaseException:
+        await draft.discard()
+        raise
 
-    final_report = await writer_model.ainvoke([HumanMessage(content=final_report_prompt)])
+    budget = get_run_budget(config)
 
     return {
-        "final_report": final_report.content, 
-        "messages": ["Here is the final report: " + final_report.content],
+        "final_report": final_report_text, 
+        "messages": ["Here is the final report: " + final_report_text],
+        "budget_report": budget.report() if budget is not None else None,
+        "scheduler_report": fair_scheduler.tenant_metrics(config),
+        "report_draft_path": str(draft.path),
+        "report_usage": report_usage,
     }
 
 # ===== SAVE REPORT TO FILE =====
 
-async def save_report_to_file(state: AgentState):
+async def save_report_to_file(state: AgentState, config: RunnableConfig):
     """
     Save the final report to a file in the 'files' directory.
     
-    Uses UUID to generate a unique filename for each report.
+    The report is named by the hash of its content, so an identical report is
+    only stored once, and is written atomically off the event loop (the draft
+    streamed during report generation is renamed into place). A metadata
+    sidecar records the brief, timestamps, size and token usage, and the
+    report catalog is updated (with any configurable.report_tags). If
+    retention_on_save is enabled, cold reports are then compressed or deleted
+    according to the retention policy. Finally the run's raw note blobs are
+    released.
     """
-    final_report = state.get("final_report", "")
-    
-    # Get the directory where this module is located
-    module_dir = os.path.dirname(os.path.abspath(__file__))
-    files_dir = os.path.join(module_dir, "files")
-    
-    # Create the files directory if it doesn't exist
-    os.makedirs(files_dir, exist_ok=True)
-    
-    # Generate a unique filename using UUID
-    report_id = str(uuid.uuid4())
-    filename = f"report_{report_id}.md"
-    filepath = os.path.join(files_dir, filename)
-    
-    # Save the report
-    with open(filepath, "w", encoding="utf-8") as f:
-        f.write(final_report)
+    metadata = await save_report(
+        state.get("final_report", ""),
+        research_brief=state.get("research_brief") or "",
+        draft_path=state.get("report_draft_path"),
+        usage=state.get("report_usage")
+    )
+    filepath = str(report_path(metadata["report_id"]))
+
+    # Keep the catalog in step so lookups never need to scan the files directory
+    tags = config.get("configurable", {}).get("report_tags", [])
+    superseded = await asyncio.to_thread(report_catalog.record, metadata, state.get("final_report", ""), filepath, tags)
+    if superseded:
+        # Saved again after being archived: the fresh copy replaces the compressed one
+        await asyncio.to_thread(Path(superseded).unlink, True)
+    if retention_on_save:
+        await asyncio.to_thread(apply_retention)
+    await asyncio.to_thread(gc_run, get_run_id(config), state.get("raw_notes", []))
     
     return {
         "messages": [f"Report saved to: {filepath}"],
+        "report_id": metadata["report_id"],
     }
 
 # ===== GRAPH CONSTRUCTION =====
@@ -104,5 +133,5 @@ deep_researcher_builder.add_edge("supervisor_subgraph", "final_report_generation
 deep_researcher_builder.add_edge("final_report_generation", "save_report_to_file")
 deep_researcher_builder.add_edge("save_report_to_file", END)
 
-# Compile the full workflow
-deep_researcher = deep_researcher_builder.compile()
+# Compile the full workflow (uncheckpointed; see checkpointing.compile_with_checkpointer)
+deep_researcher = release_on_finish(deep_researcher_builder.compile())
@@ -0,0 +1,431 @@
+"""Process-Wide Fair-Share Scheduling Across Research Runs.
+
+Every model call, web search and researcher launch in this process takes a
+slot from a shared scheduler before it runs. Each kind of task has a fixed
+capacity, and when tasks have to wait, free slots are handed out fairly:
+- Between tenants by weighted fair queuing, so a tenant's share is
+  proportional to the weight of its priority
+- Between the runs of a tenant by round robin, so one big fan-out cannot
+  starve the tenant's other runs
+- In arrival order within a run
+
+Tenants are also capped at a number of concurrent tasks of each kind, and
+admission control turns away new runs when a tenant already has too many
+active runs or the scheduler's queues are full. A run stops counting as
+active when its graph finishes or fails (graphs are wrapped with
+release_on_finish), or else once it has been idle for run_idle_seconds.
+Queue times are recorded per
+tenant: every wait is published as a slot_queued progress event, and a run's
+final state carries its tenant's metrics in scheduler_report.
+
+Runs identify themselves through their configuration:
+
+    config = {"configurable": {"thread_id": "run-1", "tenant_id": "acme", "priority": "high"}}
+
+Nested slots are safe: a researcher holding a "researcher" slot only waits
+for "model" and "search" slots, which are never held while waiting.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing_extensions import Any, AsyncIterator, Iterator, Literal, Optional, TypedDict
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.runnables import RunnableConfig
+from langgraph.config import get_config
+
+from deep_research_from_scratch.progress import SlotQueued, emit_progress
+
+# ===== CONFIGURATION =====
+
+TaskKind = Literal["model", "search", "researcher"]
+
+# Whether model, search and researcher tasks go through the shared scheduler
+fair_scheduling = True
+
+# Process-wide number of concurrent tasks of each kind
+scheduler_capacity: dict[str, int] = {"model": 32, "search": 32, "researcher": 16}
+
+# Concurrent tasks of each kind a single tenant may run; override per tenant
+# with FairShareScheduler.set_tenant_limits
+default_tenant_limits: dict[str, int] = {"model": 16, "search": 16, "researcher": 8}
+
+# Share of free slots by priority (set with configurable.priority)
+priority_weights = {"low": 1.0, "normal": 2.0, "high": 4.0}
+
+# Admission control: runs a tenant may have active at once, and waiting tasks
+# the scheduler holds before turning away new runs
+max_runs_per_tenant = 8
+max_waiting_tasks = 1000
+
+# A run counts as active until it has not requested a slot for this long
+run_idle_seconds = 600
+
+DEFAULT_TENANT = "default"
+
+# ===== SCHEMAS =====
+
+class AdmissionRejected(RuntimeError):
+    """Raised when the scheduler turns away a new run."""
+
+class TenantMetrics(TypedDict):
+    """Scheduling metrics for one tenant."""
+    granted: int
+    rejected_runs: int
+    waiting: int
+    running: int
+    active_runs: int
+    total_queue_seconds: float
+    max_queue_seconds: float
+
+def empty_tenant_metrics() -> TenantMetrics:
+    """Create metrics for a tenant that has not been scheduled yet."""
+    return TenantMetrics(
+        granted=0,
+        rejected_runs=0,
+        waiting=0,
+        running=0,
+        active_runs=0,
+        total_queue_seconds=0.0,
+        max_queue_seconds=0.0,
+    )
+
+# ===== SCHEDULER =====
+
+class _Waiter:
+    """A task waiting for a slot, woken by a thread event or an asyncio future."""
+
+    def __init__(self, kind: str, tenant: str, run_id: str, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.kind = kind
+        self.tenant = tenant
+        self.run_id = run_id
+        self.enqueued_at = time.monotonic()
+        self.granted = False
+        self.loop = loop
+        self.future = loop.create_future() if loop is not None else None
+        self.event = threading.Event() if loop is None else None
+
+    def wake(self) -> None:
+        if self.future is not None:
+            self.loop.call_soon_threadsafe(lambda: self.future.done() or self.future.set_result(None))
+        else:
+            self.event.set()
+
+class FairShareScheduler:
+    """Shared slots for model, search and researcher tasks, handed out fairly across tenants and runs.
+
+    Thread-safe, and usable from both threads (slot) and coroutines (aslot).
+    """
+
+    def __init__(
+        self,
+        capacity: Optional[dict[str, int]] = None,
+        tenant_limits: Optional[dict[str, int]] = None,
+    ):
+        """Create a scheduler with the given capacity and default per-tenant limits."""
+        self.capacity = dict(capacity or scheduler_capacity)
+        self.default_tenant_limits = dict(tenant_limits or default_tenant_limits)
+        self._tenant_limits: dict[str, dict[str, int]] = {}
+        self._lock = threading.Lock()
+        self._running = {kind: 0 for kind in self.capacity}
+        self._tenant_running: dict[tuple[str, str], int] = {}
+        # kind -> tenant -> run id -> waiting tasks in arrival order
+        self._waiting: dict[str, dict[str, dict[str, deque[_Waiter]]]] = {kind: {} for kind in self.capacity}
+        self._waiting_count = 0
+        # Virtual time of each tenant and run; the smallest is served next
+        self._tenant_vtime: dict[str, float] = {}
+        self._run_vtime: dict[tuple[str, str], float] = {}
+        self._tenant_weight: dict[str, float] = {}
+        # tenant -> run id -> last time the run requested a slot
+        self._active_runs: dict[str, dict[str, float]] = {}
+        self._metrics: dict[str, TenantMetrics] = {}
+
+    def set_tenant_limits(self, tenant: str, limits: dict[str, int]) -> None:
+        """Override how many concurrent tasks of each kind a tenant may run."""
+        with self._lock:
+            self._tenant_limits[tenant] = {**self.default_tenant_limits, **limits}
+
+    # ----- Acquiring slots -----
+
+    @contextmanager
+    def slot(self, kind: TaskKind, config: Optional[RunnableConfig] = None) -> Iterator[None]:
+        """Hold a slot of the given kind while the block runs (blocking the thread while waiting)."""
+        tenant, run_id, weight = self._owner(config)
+        waiter = self._request(kind, tenant, run_id, weight)
+        if waiter is not None:
+            waiter.event.wait()
+            self._report_wait(waiter)
+        try:
+            yield
+        finally:
+            self._release(kind, tenant, run_id)
+
+    @asynccontextmanager
+    async def aslot(self, kind: TaskKind, config: Optional[RunnableConfig] = None) -> AsyncIterator[None]:
+        """Hold a slot of the given kind while the block runs (awaiting while waiting)."""
+        tenant, run_id, weight = self._owner(config)
+        waiter = self._request(kind, tenant, run_id, weight, loop=asyncio.get_running_loop())
+        if waiter is not None:
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                with self._lock:
+                    granted = waiter.granted
+                    if not granted:
+                        self._remove_waiter(waiter)
+                if granted:
+                    self._release(kind, tenant, run_id)
+                raise
+            self._report_wait(waiter)
+        try:
+            yield
+        finally:
+            self._release(kind, tenant, run_id)
+
+    def _report_wait(self, waiter: _Waiter) -> None:
+        emit_progress(SlotQueued(
+            event="slot_queued",
+            kind=waiter.kind,
+            tenant=waiter.tenant,
+            queue_seconds=time.monotonic() - waiter.enqueued_at
+        ))
+
+    def _owner(self, config: Optional[RunnableConfig]) -> tuple[str, str, float]:
+        """Get the (tenant, run id, weight) of the run a task belongs to."""
+        if config is None:
+            try:
+                config = get_config()
+            except RuntimeError:
+                config = {}
+        configurable = config.get("configurable", {})
+        tenant = str(configurable.get("tenant_id") or DEFAULT_TENANT)
+        run_id = str(configurable.get("thread_id") or "default")
+        weight = priority_weights.get(configurable.get("priority", "normal"), priority_weights["normal"])
+        return tenant, run_id, weight
+
+    def _request(
+        self,
+        kind: str,
+        tenant: str,
+        run_id: str,
+        weight: float,
+        loop: Optional[asyncio.AbstractEventLoop] = None
+    ) -> Optional[_Waiter]:
+        """Take a free slot, or queue a waiter for one.
+
+        Returns:
+            None if the slot was granted immediately, otherwise the queued
+            waiter (which may already have been woken)
+
+        Raises:
+            AdmissionRejected: If the task belongs to a new run that cannot be admitted
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._admit(tenant, run_id, now)
+            self._tenant_weight[tenant] = weight
+
+            if self._can_run(kind, tenant) and not self._has_waiters(kind):
+                self._start(kind, tenant, run_id, 0.0)
+                return None
+
+            # A tenant that was idle joins at the current virtual time instead of
+            # catching up on the share it did not use
+            if not self._tenant_busy(tenant):
+                active = [self._tenant_vtime[t] for t in self._tenant_vtime if self._tenant_busy(t)]
+                self._tenant_vtime[tenant] = max(self._tenant_vtime.get(tenant, 0.0), min(active, default=0.0))
+
+            waiter = _Waiter(kind, tenant, run_id, loop)
+            self._waiting[kind].setdefault(tenant, {}).setdefault(run_id, deque()).append(waiter)
+            self._waiting_count += 1
+            self._metrics.setdefault(tenant, empty_tenant_metrics())["waiting"] += 1
+
+            # Other waiters may be held back only by their tenant's limit
+            self._dispatch(kind)
+            return waiter
+
+    def _admit(self, tenant: str, run_id: str, now: float) -> None:
+        """Register activity of a run, turning away new runs when over capacity."""
+        runs = self._active_runs.setdefault(tenant, {})
+        for idle_run in [run for run, last_seen in runs.items() if now - last_seen > run_idle_seconds]:
+            del runs[idle_run]
+        if run_id not in runs:
+            reason = None
+            if len(runs) >= max_runs_per_tenant:
+                reason = f"tenant {tenant!r} already has {len(runs)} active runs"
+            elif self._waiting_count >= max_waiting_tasks:
+                reason = f"{self._waiting_count} tasks are already waiting"
+            if reason:
+                self._metrics.setdefault(tenant, empty_tenant_metrics())["rejected_runs"] += 1
+                raise AdmissionRejected(f"Research run {run_id!r} was not admitted: {reason}")
+        runs[run_id] = now
+
+    # ----- Releasing and handing out slots -----
+
+    def _release(self, kind: str, tenant: str, run_id: str) -> None:
+        with self._lock:
+            self._running[kind] -= 1
+            self._tenant_running[(kind, tenant)] -= 1
+            self._metrics[tenant]["running"] -= 1
+            self._dispatch(kind)
+
+    def _dispatch(self, kind: str) -> None:
+        """Hand free slots to waiters: lowest tenant virtual time first, then lowest run virtual time."""
+        while self._running[kind] < self.capacity[kind]:
+            eligible = [
+                tenant for tenant, runs in self._waiting[kind].items()
+                if runs and self._can_run(kind, tenant)
+            ]
+            if not eligible:
+                return
+            tenant = min(eligible, key=lambda t: self._tenant_vtime.get(t, 0.0))
+            runs = self._waiting[kind][tenant]
+            run_id = min(runs, key=lambda r: self._run_vtime.get((tenant, r), 0.0))
+            waiter = runs[run_id].popleft()
+            if not runs[run_id]:
+                del runs[run_id]
+            if not runs:
+                del self._waiting[kind][tenant]
+            self._waiting_count -= 1
+            self._metrics[tenant]["waiting"] -= 1
+
+            waiter.granted = True
+            self._start(kind, tenant, run_id, time.monotonic() - waiter.enqueued_at)
+            waiter.wake()
+
+    def _start(self, kind: str, tenant: str, run_id: str, queue_seconds: float) -> None:
+        """Account for a task taking a slot."""
+        self._running[kind] += 1
+        self._tenant_running[(kind, tenant)] = self._tenant_running.get((kind, tenant), 0) + 1
+        self._tenant_vtime[tenant] = self._tenant_vtime.get(tenant, 0.0) + 1.0 / self._tenant_weight.get(tenant, 1.0)
+        self._run_vtime[(tenant, run_id)] = self._run_vtime.get((tenant, run_id), 0.0) + 1.0
+
+        metrics = self._metrics.setdefault(tenant, empty_tenant_metrics())
+        metrics["granted"] += 1
+        metrics["running"] += 1
+        metrics["total_queue_seconds"] += queue_seconds
+        metrics["max_queue_seconds"] = max(metrics["max_queue_seconds"], queue_seconds)
+
+    def _remove_waiter(self, waiter: _Waiter) -> None:
+        """Drop a waiter whose task was cancelled before it got a slot."""
+        runs = self._waiting[waiter.kind].get(waiter.tenant, {})
+        queue = runs.get(waiter.run_id)
+        if queue is None or waiter not in queue:
+            return
+        queue.remove(waiter)
+        if not queue:
+            del runs[waiter.run_id]
+        if not runs:
+            self._waiting[waiter.kind].pop(waiter.tenant, None)
+        self._waiting_count -= 1
+        self._metrics[waiter.tenant]["waiting"] -= 1
+
+    def _can_run(self, kind: str, tenant: str) -> bool:
+        limit = self._tenant_limits.get(tenant, self.default_tenant_limits).get(kind, self.capacity[kind])
+        return (
+            self._running[kind] < self.capacity[kind]
+            and self._tenant_running.get((kind, tenant), 0) < limit
+        )
+
+    def _has_waiters(self, kind: str) -> bool:
+        return bool(self._waiting[kind])
+
+    def _tenant_busy(self, tenant: str) -> bool:
+        return any(self._tenant_running.get((kind, tenant), 0) for kind in self.capacity) or any(
+            tenant in waiting for waiting in self._waiting.values()
+        )
+
+    def finish_run(self, tenant: str, run_id: str) -> None:
+        """Stop counting a finished run as active, freeing its place under the tenant's admission limit."""
+        with self._lock:
+            self._active_runs.get(tenant, {}).pop(run_id, None)
+            self._run_vtime.pop((tenant, run_id), None)
+
+    def finish_thread(self, run_id: str) -> None:
+        """Stop counting a finished run as active under whichever tenant admitted it."""
+        with self._lock:
+            for tenant, runs in self._active_runs.items():
+                if runs.pop(run_id, None) is not None:
+                    self._run_vtime.pop((tenant, run_id), None)
+
+    # ----- Metrics -----
+
+    def metrics(self) -> dict[str, TenantMetrics]:
+        """Get a snapshot of the scheduling metrics of every tenant."""
+        now = time.monotonic()
+        with self._lock:
+            snapshot = {}
+            for tenant, metrics in self._metrics.items():
+                runs = self._active_runs.get(tenant, {})
+                active_runs = sum(1 for last_seen in runs.values() if now - last_seen <= run_idle_seconds)
+                snapshot[tenant] = TenantMetrics(**{**metrics, "active_runs": active_runs})
+            return snapshot
+
+    def tenant_metrics(self, config: Optional[RunnableConfig] = None) -> TenantMetrics:
+        """Get a snapshot of the scheduling metrics of the tenant a run belongs to."""
+        tenant, _, _ = self._owner(config)
+        return self.metrics().get(tenant, empty_tenant_metrics())
+
+# Scheduler shared by every run in this process
+fair_scheduler = FairShareScheduler()
+
+class RunFinishedCallbackHandler(BaseCallbackHandler):
+    """Free a graph run's place under its tenant's admission limit when the run ends or fails.
+
+    Only root runs count: a graph invoked as a node of another graph is part
+    of the outer run. Runs are identified by thread_id, as in slot requests.
+    """
+
+    run_inline = True
+
+    def __init__(self, scheduler: FairShareScheduler):
+        """Report finished runs to the given scheduler."""
+        self.scheduler = scheduler
+        self._threads: dict[UUID, str] = {}
+
+    def on_chain_start(
+        self, serialized: Any, inputs: Any, *, run_id: UUID, parent_run_id: Optional[UUID] = None,
+        metadata: Optional[dict[str, Any]] = None, **kwargs: Any
+    ) -> None:
+        """Remember the thread of a root run."""
+        if parent_run_id is None:
+            self._threads[run_id] = str((metadata or {}).get("thread_id") or "default")
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, parent_run_id: Optional[UUID] = None, **kwargs: Any) -> None:
+        """Release a root run that finished."""
+        self._finish(run_id, parent_run_id)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, parent_run_id: Optional[UUID] = None, **kwargs: Any) -> None:
+        """Release a root run that failed or was cancelled."""
+        self._finish(run_id, parent_run_id)
+
+    def _finish(self, run_id: UUID, parent_run_id: Optional[UUID]) -> None:
+        thread_id = self._threads.pop(run_id, None) if parent_run_id is None else None
+        if thread_id is not None:
+            self.scheduler.finish_thread(thread_id)
+
+def release_on_finish(graph: Any) -> Any:
+    """Make a compiled graph free its runs' admission places in the shared scheduler when they end."""
+    return graph.with_config(callbacks=[RunFinishedCallbackHandler(fair_scheduler)])
+
+@contextmanager
+def task_slot(kind: TaskKind, config: Optional[RunnableConfig] = None) -> Iterator[None]:
+    """Run a blocking task in a slot of the shared scheduler (if fair scheduling is on)."""
+    if not fair_scheduling:
+        yield
+        return
+    with fair_scheduler.slot(kind, config):
+        yield
+
+@asynccontextmanager
+async def atask_slot(kind: TaskKind, config: Optional[RunnableConfig] = None) -> AsyncIterator[None]:
+    """Run an async task in a slot of the shared scheduler (if fair scheduling is on)."""
+    if not fair_scheduling:
+        yield
+        return
+    async with fair_scheduler.aslot(kind, config):
+        yield
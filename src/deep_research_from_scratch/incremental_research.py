@@ -0,0 +1,342 @@
+"""Incremental Re-Research of Refined Briefs.
+
+When a user refines a request that was already researched, rerunning the
+whole pipeline repeats research that is still valid. This graph starts from
+a previous checkpointed run instead (compiled with
+checkpointing.compile_with_checkpointer), reusing its brief, notes and sources:
+1. The refined request is turned into an updated brief, which is diffed
+   against the previous one requirement by requirement (on the CPU)
+2. Only the changed requirements go to a planning call, which lists the
+   gap topics the existing notes do not cover, and only those are researched
+3. The previous report is revised section by section: sections touched by
+   new findings or changed requirements are rewritten, new topics get new
+   sections, and every other section is kept verbatim
+
+Invoke it with the thread of the previous run and the refinement:
+
+    incremental_researcher = compile_with_checkpointer(incremental_builder)
+    config = {"configurable": {"thread_id": "run-2"}}
+    await incremental_researcher.ainvoke(
+        {"messages": [HumanMessage(content="Also cover pricing")], "prior_thread_id": "run-1"},
+        config
+    )
+
+The result can itself be refined again, by passing its thread as prior_thread_id.
+"""
+
+import asyncio
+import re
+
+import numpy as np
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.constants import TAG_NOSTREAM
+from langgraph.graph import MessagesState, StateGraph, START, END
+from langgraph.types import Overwrite
+from typing_extensions import NamedTuple, NotRequired, Optional
+
+from deep_research_from_scratch.budget import get_run_budget
+from deep_research_from_scratch.checkpointing import load_thread_values, reset_research_journal
+from deep_research_from_scratch.citation_index import prepare_findings, unrender_report
+from deep_research_from_scratch.deep_research_agent import save_report_to_file, writer_model
+from deep_research_from_scratch.fair_scheduler import atask_slot, fair_scheduler, release_on_finish
+from deep_research_from_scratch.multi_agent_supervisor import conduct_research, get_max_concurrent_researchers
+from deep_research_from_scratch.progress import emit_progress, ResearcherFailed
+from deep_research_from_scratch.prompts import report_section_prompt, report_section_update_prompt, research_gap_prompt
+from deep_research_from_scratch.report_synthesis import max_section_writers
+from deep_research_from_scratch.report_writer import strip_sources_list, usage_of, write_report
+from deep_research_from_scratch.research_agent_scope import model as scope_model, write_research_brief
+from deep_research_from_scratch.similarity import cosine_similarities, embed_text, tokenize
+from deep_research_from_scratch.state_scope import AgentState, GapTopic, ResearchGaps
+from deep_research_from_scratch.utils import get_today_str
+
+# ===== CONFIGURATION =====
+
+# Cosine similarity at or above which a requirement of the updated brief
+# counts as unchanged from a requirement of the previous brief
+requirement_match_threshold = 0.8
+
+# Requirements shorter than this many words are ignored when diffing briefs
+min_requirement_words = 3
+
+# Maximum number of gap topics researched per refinement
+max_gap_topics = 4
+
+# New findings less similar than this to every existing section get a section of their own
+new_section_threshold = 0.25
+
+# Characters of each existing note shown to the gap planning call
+existing_note_digest_chars = 300
+
+_REQUIREMENT_SPLIT_RE = re.compile(r"(?<=[.!?;])\s+|\n+")
+_LIST_MARKER_RE = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s*")
+_SECTION_HEADING_RE = re.compile(r"^## (.+)$", re.MULTILINE)
+
+# ===== STATE =====
+
+class IncrementalInputState(MessagesState):
+    """Input of an incremental run: the refinement messages and the previous run's thread.
+
+    research_brief may be given directly to skip writing the updated brief.
+    """
+    prior_thread_id: str
+    research_brief: NotRequired[str]
+
+class IncrementalState(AgentState):
+    """State of an incremental run."""
+    prior_thread_id: str
+    previous_research_brief: Optional[str]
+    # Requirements added to or dropped from the previous brief
+    changed_requirements: list[str]
+    # Researched gap topics (GapTopic fields) and their notes, in the same order
+    gap_topics: list[dict]
+    gap_notes: list[str]
+
+# ===== BRIEF DIFFING =====
+
+class BriefDiff(NamedTuple):
+    """Requirements added to and dropped from a research brief."""
+    added: list[str]
+    removed: list[str]
+
+def split_requirements(brief: str) -> list[str]:
+    """Split a research brief into its sentences and list items."""
+    requirements = []
+    for part in _REQUIREMENT_SPLIT_RE.split(brief):
+        part = _LIST_MARKER_RE.sub("", part).strip()
+        if len(tokenize(part)) >= min_requirement_words:
+            requirements.append(part)
+    return requirements
+
+def diff_briefs(previous_brief: str, research_brief: str, threshold: float = requirement_match_threshold) -> BriefDiff:
+    """Find the requirements that differ between two versions of a brief.
+
+    A requirement is unchanged when the other brief has a requirement at
+    least threshold-similar to it, so rewording and reordering are not
+    mistaken for changes.
+    """
+    old, new = split_requirements(previous_brief), split_requirements(research_brief)
+    if not old or not new:
+        return BriefDiff(added=new, removed=old)
+    similarities = np.stack([embed_text(text) for text in new]) @ np.stack([embed_text(text) for text in old]).T
+    return BriefDiff(
+        added=[text for text, best in zip(new, similarities.max(axis=1)) if best < threshold],
+        removed=[text for text, best in zip(old, similarities.max(axis=0)) if best < threshold],
+    )
+
+# ===== REPORT SECTIONS =====
+
+class ReportSection(NamedTuple):
+    """A "## " section of a report; the text before the first section has an empty title."""
+    title: str
+    body: str
+
+def split_report(report: str) -> list[ReportSection]:
+    """Split a report into its preamble (title and introduction) and its sections."""
+    headings = list(_SECTION_HEADING_RE.finditer(report))
+    if not headings:
+        return [ReportSection("", report.strip())]
+    sections = [ReportSection("", report[:headings[0].start()].strip())]
+    for heading, following in zip(headings, headings[1:] + [None]):
+        end = following.start() if following else len(report)
+        sections.append(ReportSection(heading.group(1).strip(), report[heading.end():end].strip()))
+    return sections
+
+def join_report(sections: list[ReportSection]) -> str:
+    """Join report sections back into a report."""
+    parts = [section.body if not section.title else f"## {section.title}\n\n{section.body}" for section in sections]
+    return "\n\n".join(part for part in parts if part) + "\n"
+
+# ===== WORKFLOW NODES =====
+
+async def load_prior_run(state: IncrementalState, config: RunnableConfig):
+    """
+    Load the previous run's brief, notes and report, and write the updated brief.
+
+    The updated brief is written from the user's messages in the previous
+    run followed by the refinement, unless research_brief was given.
+    """
+    await asyncio.to_thread(reset_research_journal, config)
+    prior = await load_thread_values(state["prior_thread_id"], config)
+    if not prior or not prior.get("final_report"):
+        raise ValueError(f"Run {state['prior_thread_id']!r} has no checkpointed report to build on")
+
+    research_brief = state.get("research_brief")
+    if not research_brief:
+        requests = [message for message in prior.get("messages", []) if message.type == "human"]
+        conversation = requests + list(state.get("messages", []))
+        research_brief = (await asyncio.to_thread(write_research_brief, {"messages": conversation}))["research_brief"]
+
+    # Replace rather than append, so invoking the thread again does not double the notes.
+    # The previous run's raw_notes are blob references released when its report was
+    # saved, so they are not carried over; this run's raw_notes are its gap research.
+    return {
+        "research_brief": research_brief,
+        "previous_research_brief": prior.get("research_brief") or "",
+        "notes": Overwrite(list(prior.get("notes", []))),
+        "raw_notes": Overwrite([]),
+        "final_report": prior["final_report"],
+    }
+
+async def research_gaps(state: IncrementalState, config: RunnableConfig):
+    """
+    Research only what the updated brief adds to the previous one.
+
+    Changed requirements are found by diffing the briefs; a planning call
+    then turns the ones the existing notes do not cover into gap topics,
+    which are researched concurrently (through the research cache and the
+    run's research journal, like any researcher).
+    """
+    diff = diff_briefs(state.get("previous_research_brief") or "", state["research_brief"])
+    changed_requirements = diff.added + diff.removed
+    if not diff.added:
+        return {"changed_requirements": changed_requirements, "gap_topics": [], "gap_notes": []}
+
+    existing_notes, _ = prepare_findings(state.get("notes", []))
+    prompt = research_gap_prompt.format(
+        previous_research_brief=state.get("previous_research_brief") or "",
+        research_brief=state["research_brief"],
+        changed_requirements="\n".join(f"- {text}" for text in diff.added),
+        existing_research="\n\n".join(
+            f"[{number}] {note[:existing_note_digest_chars]}" for number, note in enumerate(existing_notes, 1)
+        ),
+        max_topics=max_gap_topics,
+        date=get_today_str()
+    )
+    async with atask_slot("model", config):
+        gaps = await scope_model.with_structured_output(ResearchGaps).ainvoke([HumanMessage(content=prompt)])
+    topics = gaps.topics[:max_gap_topics]
+
+    semaphore = asyncio.Semaphore(get_max_concurrent_researchers(config))
+
+    async def research(topic: GapTopic) -> dict:
+        async with semaphore:
+            return await conduct_research(topic.research_topic, config)
+
+    outcomes = await asyncio.gather(*(research(topic) for topic in topics), return_exceptions=True)
+
+    gap_topics, gap_notes, raw_notes = [], [], []
+    for topic, outcome in zip(topics, outcomes):
+        if isinstance(outcome, BaseException) or not outcome.get("compressed_research"):
+            error = f"{type(outcome).__name__}: {outcome}" if isinstance(outcome, BaseException) else "no findings"
+            emit_progress(ResearcherFailed(event="researcher_failed", research_topic=topic.research_topic, error=error))
+            continue
+        gap_topics.append(topic.model_dump())
+        gap_notes.append(outcome["compressed_research"])
+        raw_notes.extend(outcome.get("raw_notes", []))
+
+    return {
+        "changed_requirements": changed_requirements,
+        "gap_topics": gap_topics,
+        "gap_notes": gap_notes,
+        "notes": gap_notes,
+        "raw_notes": raw_notes,
+    }
+
+async def update_report(state: IncrementalState, config: RunnableConfig):
+    """
+    Revise the previous report for the updated brief.
+
+    Each new finding and changed requirement is matched to the most similar
+    section, and only the matched sections are rewritten (concurrently, up
+    to max_section_writers at a time), from their current text and the new findings. Findings unlike every
+    section become new sections. When the previous report has no sections to
+    revise, the report is written again from all the notes.
+    """
+    previous_report, citation_index = unrender_report(state["final_report"])
+    gap_notes, gap_index = prepare_findings(state.get("gap_notes", []))
+    changed_requirements = state.get("changed_requirements", [])
+    sections = split_report(previous_report)
+    # Only the preamble's title and introduction are kept as they are
+    revisable = [index for index, section in enumerate(sections) if section.title]
+
+    if not gap_notes and not changed_requirements:
+        return {"messages": [AIMessage(content="The existing report already covers the updated brief.")]}
+    if not revisable:
+        report, usage = await write_report(state.get("notes", []), state["research_brief"], writer_model, config)
+        return {"final_report": report, "report_usage": usage, "messages": ["Here is the updated report: " + report]}
+
+    section_embeddings = np.stack([embed_text(f"{sections[i].title}\n{sections[i].body}") for i in revisable])
+    findings_by_section: dict[int, list[str]] = {i: [] for i in revisable}
+    affected = set()
+    new_sections: list[tuple[dict, str]] = []
+    for topic, note in zip(state.get("gap_topics", []), gap_notes):
+        scores = cosine_similarities(embed_text(note), section_embeddings)
+        if scores.max() < new_section_threshold:
+            new_sections.append((topic, note))
+        else:
+            findings_by_section[revisable[int(np.argmax(scores))]].append(note)
+            affected.add(revisable[int(np.argmax(scores))])
+    for requirement in changed_requirements:
+        affected.add(revisable[int(np.argmax(cosine_similarities(embed_text(requirement), section_embeddings)))])
+
+    titles = [sections[i].title for i in revisable] + [topic["title"] for topic, _ in new_sections]
+    outline = "\n".join(f"{number}. {title}" for number, title in enumerate(titles, 1))
+    date = get_today_str()
+    prompts = {
+        i: report_section_update_prompt.format(
+            research_brief=state["research_brief"],
+            outline=outline,
+            section_title=sections[i].title,
+            current_section=sections[i].body,
+            findings="\n\n".join(findings_by_section[i]) or "(none; only the brief changed)",
+            date=date
+        )
+        for i in sorted(affected)
+    }
+    for number, (topic, note) in enumerate(new_sections):
+        prompts[len(sections) + number] = report_section_prompt.format(
+            research_brief=state["research_brief"],
+            outline=outline,
+            section_title=topic["title"],
+            section_description=topic["research_topic"],
+            findings=note,
+            date=date
+        )
+
+    # Section drafts are intermediate output, so they stay out of the messages stream
+    semaphore = asyncio.Semaphore(max_section_writers)
+    section_model = writer_model.with_config(tags=[TAG_NOSTREAM])
+
+    async def write_section(prompt: str) -> AIMessage:
+        async with semaphore, atask_slot("model", config):
+            return await section_model.ainvoke([HumanMessage(content=prompt)])
+
+    responses = dict(zip(prompts, await asyncio.gather(*(write_section(prompt) for prompt in prompts.values()))))
+
+    revised = [
+        ReportSection(section.title, strip_sources_list(responses[i].text).strip()) if i in responses else section
+        for i, section in enumerate(sections)
+    ]
+    revised += [
+        ReportSection(topic["title"], strip_sources_list(responses[len(sections) + number].text).strip())
+        for number, (topic, _) in enumerate(new_sections)
+    ]
+
+    # Kept sections cite the previous report's sources; rewritten ones may also cite new ones
+    citation_index.update(gap_index)
+    report = citation_index.render_report(join_report(revised))
+
+    budget = get_run_budget(config)
+    return {
+        "final_report": report,
+        "report_usage": usage_of(list(responses.values()), list(prompts.values())),
+        "messages": ["Here is the updated report: " + report],
+        "budget_report": budget.report() if budget is not None else None,
+        "scheduler_report": fair_scheduler.tenant_metrics(config),
+    }
+
+# ===== GRAPH CONSTRUCTION =====
+
+incremental_builder = StateGraph(IncrementalState, input_schema=IncrementalInputState)
+incremental_builder.add_node("load_prior_run", load_prior_run)
+incremental_builder.add_node("research_gaps", research_gaps)
+incremental_builder.add_node("update_report", update_report)
+incremental_builder.add_node("save_report_to_file", save_report_to_file)
+incremental_builder.add_edge(START, "load_prior_run")
+incremental_builder.add_edge("load_prior_run", "research_gaps")
+incremental_builder.add_edge("research_gaps", "update_report")
+incremental_builder.add_edge("update_report", "save_report_to_file")
+incremental_builder.add_edge("save_report_to_file", END)
+
+incremental_researcher = release_on_finish(incremental_builder.compile())
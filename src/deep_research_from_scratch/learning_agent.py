@@ -17,7 +17,10 @@ from langgraph.types import interrupt, Command
 from pydantic import BaseModel, Field
 from langchain.chat_models import init_chat_model
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, get_buffer_string
+from langchain_core.runnables import RunnableConfig
 
+from deep_research_from_scratch.report_archive import read_report
+from deep_research_from_scratch.report_catalog import report_catalog
 from deep_research_from_scratch.prompts import clarify_with_user_instructions, transform_messages_into_research_topic_prompt
 from deep_research_from_scratch.state_scope import ClarifyWithUser, ResearchQuestion
 
@@ -106,29 +109,31 @@ simplified_gen = model.with_structured_output(SimplifiedContent)
 
 # --- 5. DEFINE NODES ---
 
-def load_report(state: State):
-    """Node 0: Loads the latest markdown file from the files directory."""
-    print("--- Loading Report from Files Directory ---")
+def load_report(state: State, config: RunnableConfig):
+    """Node 0: Loads the latest report (or configurable.report_id) from the report catalog."""
+    print("--- Loading Report from Report Catalog ---")
     
     # Get the files directory path (relative to this module)
     files_dir = Path(__file__).parent / "files"
     
-    if not files_dir.exists():
-        raise FileNotFoundError(f"Files directory not found: {files_dir}")
-    
-    # Find all markdown files
-    md_files = list(files_dir.glob("*.md"))
-    
-    if not md_files:
-        raise FileNotFoundError(f"No markdown files found in: {files_dir}")
-    
-    # Get the latest file by modification time
-    latest_file = max(md_files, key=lambda f: f.stat().st_mtime)
-    
-    print(f"Loading file: {latest_file.name}")
-    
-    # Read the file content
-    report_content = latest_file.read_text(encoding="utf-8")
+    report_id = config.get("configurable", {}).get("report_id")
+    if report_id:
+        entry = report_catalog.get(report_id)
+        if entry is None:
+            raise FileNotFoundError(f"No report with id {report_id!r} in the report catalog")
+    else:
+        entry = report_catalog.latest()
+        if entry is None:
+            # Empty catalog: index reports saved before the catalog existed
+            report_catalog.rebuild(files_dir)
+            entry = report_catalog.latest()
+        if entry is None:
+            raise FileNotFoundError(f"No markdown files found in: {files_dir}")
+    
+    print(f"Loading file: {Path(entry['path']).name}")
+    
+    # Read the file content (decompressing archived reports)
+    report_content = read_report(entry["path"])
     
     return {"report": report_content}
 
@@ -7,33 +7,66 @@ This module implements a supervisor pattern where:
 3. Results are aggregated and compressed for final reporting
 
 The supervisor uses parallel research execution to improve efficiency while
-maintaining isolated context windows for each research topic.
+maintaining isolated context windows for each research topic. In the default
+"barrier" mode it waits for a whole batch of researchers; in "as_completed"
+mode it is re-entered as each researcher finishes.
 """
 
 import asyncio
+import logging
+import re
+import uuid
+from datetime import datetime
 
 from typing_extensions import Literal
 
 from langchain.chat_models import init_chat_model
 from langchain_core.messages import (
+    AIMessage,
     HumanMessage, 
     BaseMessage, 
     SystemMessage, 
-    ToolMessage,
-    filter_messages
+    ToolMessage
 )
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, START, END
 from langgraph.types import Command
 
-from deep_research_from_scratch.prompts import lead_researcher_prompt
-from deep_research_from_scratch.research_agent import researcher_agent
+from deep_research_from_scratch.progress import (
+    emit_progress,
+    ResearcherStarted,
+    ResearcherDone,
+    ResearcherFailed,
+    ResearchDeduplicated
+)
+from deep_research_from_scratch.prompts import (
+    lead_researcher_prompt,
+    prior_research_prompt,
+    prerequisite_research_prompt,
+    research_coverage_prompt,
+    research_plan_prompt
+)
+from deep_research_from_scratch.blob_store import get_run_id
+from deep_research_from_scratch.budget import get_run_budget
+from deep_research_from_scratch.checkpointing import get_research_journal, reset_research_journal
+from deep_research_from_scratch.fair_scheduler import atask_slot
+from deep_research_from_scratch.research_cache import is_reusable, research_cache
+from deep_research_from_scratch.research_executor import get_research_executor
+from deep_research_from_scratch.research_scheduler import ResearchScheduler
+from deep_research_from_scratch.similarity import near_duplicate, word_overlap
 from deep_research_from_scratch.state_multi_agent_supervisor import (
     SupervisorState, 
     ConductResearch, 
-    ResearchComplete
+    ConductResearchPlan,
+    PlannedResearch,
+    ResearchComplete,
+    DeduplicatedTopic,
+    topic_key
 )
 from deep_research_from_scratch.utils import get_today_str, think_tool
 
+logger = logging.getLogger(__name__)
+
 def get_notes_from_tool_calls(messages: list[BaseMessage]) -> list[str]:
     """Extract research notes from ToolMessage objects in supervisor message history.
 
@@ -43,13 +76,29 @@ def get_notes_from_tool_calls(messages: list[BaseMessage]) -> list[str]:
     compressed findings as the content of a ToolMessage. This function
     extracts all such ToolMessage content to compile the final research notes.
 
+    The supervisor itself accumulates notes incrementally in notes_by_topic;
+    this function is kept for inspecting a finished message history.
+    think_tool reflections are not research content and are skipped.
+
     Args:
         messages: List of messages from supervisor's conversation history
 
     Returns:
         List of research note strings extracted from ToolMessage objects
     """
-    return [tool_msg.content for tool_msg in filter_messages(messages, include_types="tool")]
+    notes = []
+    for message in messages:
+        if isinstance(message, ToolMessage):
+            # Skip reflections, research plan summaries, failed research, placeholders for
+            # background researchers and duplicate topics answered from findings already included
+            artifact = message.artifact or {}
+            if message.name in ("think_tool", "ConductResearchPlan") or message.status == "error" or artifact.get("pending") or artifact.get("duplicate_of"):
+                continue
+            notes.append(message.content)
+        elif isinstance(message, HumanMessage) and message.name == RESEARCH_RESULT_NAME:
+            # Findings delivered as researchers complete in as-completed mode
+            notes.append(message.content)
+    return notes
 
 # Ensure async compatibility for Jupyter environments
 try:
@@ -70,6 +119,7 @@ except ImportError:
 supervisor_tools = [ConductResearch, ResearchComplete, think_tool]
 supervisor_model = init_chat_model("google_genai:models/gemini-flash-latest")
 supervisor_model_with_tools = supervisor_model.bind_tools(supervisor_tools)
+supervisor_model_with_plan_tools = supervisor_model.bind_tools(supervisor_tools + [ConductResearchPlan])
 
 # System constants
 # Maximum number of tool call iterations for individual researcher agents
@@ -77,12 +127,632 @@ supervisor_model_with_tools = supervisor_model.bind_tools(supervisor_tools)
 max_researcher_iterations = 6 # Calls to think_tool + ConductResearch
 
 # Maximum number of concurrent research agents the supervisor can launch
-# This is passed to the lead_researcher_prompt to limit parallel research tasks
+# This is passed to the lead_researcher_prompt and enforced by the research scheduler:
+# extra ConductResearch calls wait in a queue. Override per run with
+# configurable.max_concurrent_researchers
 max_concurrent_researchers = 3
 
+# Fault isolation for individual researchers: each attempt is cancelled after
+# researcher_timeout_seconds and failed attempts are retried up to
+# max_researcher_retries times. Override per run with the configurable keys
+# of the same name
+researcher_timeout_seconds = 900
+max_researcher_retries = 1
+
+# Supervision mode: "barrier" waits for every researcher launched in a turn
+# before the supervisor thinks again; "as_completed" re-enters the supervisor
+# as soon as any researcher finishes while the others keep running.
+# Override per run with configurable.supervision_mode
+supervision_mode = "barrier"
+
+# Supervisor message compaction: findings delivered before the supervisor's
+# latest turn are shown to it as digests of at most research_digest_chars
+# characters plus coverage metadata, while the full text stays in
+# notes_by_topic for the report writer. Disable per run with
+# configurable.compact_supervisor_messages
+compact_supervisor_messages_enabled = True
+research_digest_chars = 600
+
+# Research plans: when enabled, the supervisor can also call ConductResearchPlan
+# with up to max_plan_tasks topics and dependencies between them; each topic
+# starts as soon as its prerequisites finish and receives digests of their
+# findings of at most plan_prerequisite_digest_chars characters each.
+# Enable per run with configurable.research_plans
+research_plans = False
+max_plan_tasks = 8
+plan_prerequisite_digest_chars = 1500
+
+# Content-word overlap (Jaccard) at or above which a ConductResearch topic
+# counts as a paraphrase of one already researched (or being researched) in
+# this run and is answered from that research instead. Topics naming an
+# entity or number the other does not mention are never merged, so per-entity
+# topics ("X vs. Y vs. Z" split into one topic each) stay separate. Override
+# per run with configurable.topic_dedup_threshold; a value above 1 disables
+# deduplication
+topic_dedup_threshold = 0.6
+
+# Message names for research findings delivered in as-completed mode
+RESEARCH_RESULT_NAME = "research_result"
+RESEARCH_FAILED_NAME = "research_failed"
+
+def get_max_concurrent_researchers(config: RunnableConfig) -> int:
+    """Get the researcher concurrency limit for a run."""
+    return int(config.get("configurable", {}).get("max_concurrent_researchers", max_concurrent_researchers))
+
+def get_researchers_per_turn(config: RunnableConfig) -> int:
+    """Get how many researchers the supervisor may launch in one turn, given the run's budget."""
+    budget = get_run_budget(config)
+    requested = get_max_concurrent_researchers(config)
+    return requested if budget is None else budget.max_researchers(requested)
+
+def get_research_scheduler(config: RunnableConfig) -> ResearchScheduler:
+    """Create the research scheduler for a run from its configuration."""
+    configurable = config.get("configurable", {})
+    return ResearchScheduler(
+        get_max_concurrent_researchers(config),
+        timeout_seconds=configurable.get("researcher_timeout_seconds", researcher_timeout_seconds),
+        max_retries=int(configurable.get("max_researcher_retries", max_researcher_retries)),
+    )
+
+# ===== RESEARCH EXECUTION =====
+
+async def conduct_research(research_topic: str, config: RunnableConfig, prerequisite_findings: str | None = None) -> dict:
+    """Research a single topic, reusing or building on cached research when possible.
+
+    Looks up earlier research on a similar topic first:
+    - A topic this run already researched before it was interrupted (in
+      checkpointed runs) returns the recorded result
+    - A near-identical topic (same content words) is answered directly from the cache
+    - A related topic seeds the researcher with the prior findings
+    - Otherwise a researcher starts from scratch, on the research executor
+      named by configurable.research_executor (in-process by default)
+
+    Fresh results are added to the cache for future runs, and to the run's
+    research journal so a resumed run does not research them again.
+
+    Args:
+        research_topic: Detailed description of the topic to research
+        config: Run configuration; configurable.use_research_cache controls
+            the research cache and configurable.research_executor the backend
+        prerequisite_findings: Digests of the findings of research plan tasks
+            this topic depends on, passed on to the researcher
+
+    Returns:
+        Researcher output with compressed_research and raw_notes
+    """
+    configurable = config.get("configurable", {})
+    use_cache = configurable.get("use_research_cache", True)
+    executor = get_research_executor(configurable.get("research_executor"))
+
+    emit_progress(ResearcherStarted(event="researcher_started", research_topic=research_topic))
+
+    journal = get_research_journal(config)
+    if journal is not None:
+        research_journal, thread_id = journal
+        recorded = await asyncio.to_thread(research_journal.lookup, thread_id, research_topic)
+        if recorded is not None:
+            emit_progress(ResearcherDone(event="researcher_done", research_topic=research_topic, cached=True))
+            return recorded
+
+    cached = await asyncio.to_thread(research_cache.match, research_topic) if use_cache else None
+
+    if cached and is_reusable(cached, research_topic):
+        emit_progress(ResearcherDone(event="researcher_done", research_topic=research_topic, cached=True))
+        return {"compressed_research": cached["compressed_research"], "raw_notes": []}
+
+    researcher_input = research_topic
+    if cached:
+        researcher_input = prior_research_prompt.format(
+            research_topic=research_topic,
+            date=datetime.fromtimestamp(cached["created_at"]).strftime("%Y-%m-%d"),
+            prior_findings=cached["compressed_research"]
+        )
+    if prerequisite_findings:
+        researcher_input = prerequisite_research_prompt.format(
+            research_topic=researcher_input,
+            prerequisite_findings=prerequisite_findings
+        )
+
+    budget = get_run_budget(config)
+    if budget is not None:
+        budget.record_researcher()
+
+    async with atask_slot("researcher", config):
+        result = await executor.submit(research_topic, researcher_input, run_id=get_run_id(config))
+
+    if use_cache and result.get("compressed_research"):
+        await asyncio.to_thread(research_cache.store, research_topic, result["compressed_research"])
+    if journal is not None and result.get("compressed_research"):
+        await asyncio.to_thread(research_journal.record, thread_id, research_topic, result)
+
+    emit_progress(ResearcherDone(event="researcher_done", research_topic=research_topic, cached=False))
+
+    return result
+
+def format_research_outcome(outcome: dict | BaseException, tool_call: dict) -> tuple[str, bool]:
+    """Turn a researcher's result or exception into message content.
+
+    Failures are logged and reported as a researcher_failed progress event.
+
+    Args:
+        outcome: Researcher output, or the exception it raised
+        tool_call: The ConductResearch tool call that launched the researcher
+
+    Returns:
+        Tuple of (message content, whether the research failed)
+    """
+    if isinstance(outcome, BaseException):
+        error = f"{type(outcome).__name__}: {outcome}"
+        logger.warning("Research failed for topic %r: %s", tool_call["args"]["research_topic"][:80], error)
+        emit_progress(ResearcherFailed(
+            event="researcher_failed",
+            research_topic=tool_call["args"]["research_topic"],
+            error=error
+        ))
+        return f"Research on this topic failed and returned no findings ({error}).", True
+    return outcome.get("compressed_research", "Error synthesizing research report"), False
+
+# ===== TOPIC DEDUPLICATION =====
+
+def deduplicate_research_calls(
+    tool_calls: list[dict],
+    known_topics: list[str],
+    threshold: float = topic_dedup_threshold
+) -> tuple[list[dict], list[tuple[dict, str, float]]]:
+    """Separate ConductResearch calls that repeat topics researched earlier in the run.
+
+    Topics are compared by the overlap of their content words, against the
+    known topics and against earlier calls in the same batch. A call never
+    repeats a topic when either names an entity or number the other does not
+    mention, since topics about different entities share most of their words.
+
+    Args:
+        tool_calls: ConductResearch tool calls from the supervisor's latest turn
+        known_topics: Topic keys already researched or being researched in this run
+        threshold: Minimum content-word overlap for a call to count as a duplicate
+
+    Returns:
+        Tuple of (calls to research, [(duplicate call, topic key it repeats, similarity)])
+    """
+    # Topic keys are lowercase; calls of this batch keep their original text,
+    # so the names they mention can be told apart in both directions
+    known = [(topic, topic) for topic in known_topics]
+    unique, duplicates = [], []
+
+    for tool_call in tool_calls:
+        text = tool_call["args"]["research_topic"]
+        matches = sorted(
+            ((word_overlap(text, known_text), key) for key, known_text in known if near_duplicate(text, known_text, threshold)),
+            key=lambda match: -match[0]
+        )
+        if matches:
+            duplicates.append((tool_call, matches[0][1], matches[0][0]))
+            continue
+        unique.append(tool_call)
+        known.append((topic_key(text), text))
+
+    return unique, duplicates
+
+def answer_duplicate_research(
+    tool_call: dict,
+    duplicate_of: str,
+    similarity: float,
+    notes_by_topic: dict[str, str],
+    pending: bool = False
+) -> ToolMessage:
+    """Answer a near-duplicate ConductResearch call from the research it repeats.
+
+    Args:
+        tool_call: The duplicate ConductResearch call
+        duplicate_of: Topic key of the research it repeats
+        similarity: Similarity between the two topics
+        notes_by_topic: Findings researched so far, keyed by topic
+        pending: Whether the repeated research is still running in the background
+
+    Returns:
+        Tool message with the existing findings, or a note on where they will come from
+    """
+    emit_progress(ResearchDeduplicated(
+        event="research_deduplicated",
+        research_topic=tool_call["args"]["research_topic"],
+        duplicate_of=duplicate_of,
+        similarity=similarity
+    ))
+
+    artifact = {"duplicate_of": duplicate_of, "similarity": similarity}
+    findings = notes_by_topic.get(duplicate_of)
+    if findings is not None:
+        content = f"This topic closely matches research already done in this run on: {duplicate_of}\nIt was answered from those findings instead of being researched again.\n\n{findings}"
+        status = "success"
+    elif pending:
+        content = f"This topic closely matches research already running on: {duplicate_of}\nIts findings will be delivered when that researcher finishes, so it was not researched again."
+        artifact["pending"] = True
+        status = "success"
+    else:
+        content = f"This topic closely matches research on {duplicate_of!r}, which failed, so it was not researched again. Rephrase the topic or narrow it if it is still needed."
+        status = "error"
+
+    return ToolMessage(
+        content=content,
+        name=tool_call["name"],
+        tool_call_id=tool_call["id"],
+        status=status,
+        artifact=artifact
+    )
+
+# ===== RESEARCH PLANS =====
+
+def order_research_plan(tasks: list[PlannedResearch]) -> list[PlannedResearch]:
+    """Check a research plan and put its tasks in dependency order.
+
+    Args:
+        tasks: Tasks of a ConductResearchPlan call
+
+    Returns:
+        The tasks, each after all of its prerequisites
+
+    Raises:
+        ValueError: If task ids repeat, a dependency is unknown, or dependencies form a cycle
+    """
+    by_id = {task.id: task for task in tasks}
+    if len(by_id) != len(tasks):
+        raise ValueError("Task ids in a research plan must be unique")
+    for task in tasks:
+        unknown = [dependency for dependency in task.depends_on if dependency not in by_id]
+        if unknown:
+            raise ValueError(f"Task {task.id!r} depends on unknown tasks {unknown}")
+
+    ordered, done = [], set()
+    remaining = list(tasks)
+    while remaining:
+        ready = [task for task in remaining if set(task.depends_on) <= done]
+        if not ready:
+            raise ValueError(f"Research plan dependencies form a cycle among {[task.id for task in remaining]}")
+        ordered.extend(ready)
+        done.update(task.id for task in ready)
+        remaining = [task for task in remaining if task.id not in done]
+    return ordered
+
+def prepare_research_plan(tool_call: dict) -> list[PlannedResearch]:
+    """Validate a ConductResearchPlan call and put its tasks in dependency order.
+
+    Raises:
+        ValueError: If the plan has too many tasks or its tasks are invalid
+    """
+    tasks = [PlannedResearch.model_validate(task) for task in tool_call["args"].get("tasks", [])]
+    if len(tasks) > max_plan_tasks:
+        raise ValueError(f"A research plan can have at most {max_plan_tasks} tasks, got {len(tasks)}")
+    return order_research_plan(tasks)
+
+def plan_task_call(tool_call: dict, task: PlannedResearch) -> dict:
+    """Describe a research plan task as a ConductResearch call.
+
+    Plan tasks go through the same deduplication, budget limits and
+    background supervision as ConductResearch calls.
+    """
+    return {
+        "name": "ConductResearch",
+        "args": {"research_topic": task.research_topic},
+        "id": f"{tool_call['id']}:{task.id}",
+        "type": "tool_call"
+    }
+
+def start_research_plan(
+    tasks: list[PlannedResearch],
+    scheduler: ResearchScheduler,
+    config: RunnableConfig,
+    research_sources: dict[str, str | asyncio.Task],
+    duplicate_of: dict[str, str] | None = None
+) -> dict[str, asyncio.Task]:
+    """Start every task of a plan, each as soon as its prerequisites are done.
+
+    Tasks wait for their prerequisites before taking a scheduler slot, so
+    waiting tasks never block running ones. A task whose prerequisite failed
+    or was not started still runs, with the findings that are available.
+    Tasks that repeat research done or running elsewhere in the run are not
+    researched again; their dependents get that research's findings.
+
+    Args:
+        tasks: Tasks to start, in dependency order (see order_research_plan)
+        scheduler: Scheduler bounding how many researchers run at once
+        config: Run configuration
+        research_sources: Findings, or running research, by topic key; the
+            plan's own research is added to it as it starts
+        duplicate_of: Topic key each repeating task duplicates, by task id
+
+    Returns:
+        Running research by task id (repeating tasks are not included)
+    """
+    by_id = {task.id: task for task in tasks}
+    duplicate_of = duplicate_of or {}
+    running: dict[str, asyncio.Task] = {}
+    prerequisites: dict[str, str | asyncio.Task] = {}
+
+    async def outcome_of(source: str | asyncio.Task) -> dict:
+        if isinstance(source, str):
+            return {"compressed_research": source, "raw_notes": []}
+        # Shielded, so a cancelled dependent does not cancel research others wait for
+        return await asyncio.shield(source)
+
+    async def run_task(task: PlannedResearch) -> dict:
+        dependencies = [dependency for dependency in task.depends_on if dependency in prerequisites]
+        outcomes = await asyncio.gather(
+            *(outcome_of(prerequisites[dependency]) for dependency in dependencies), return_exceptions=True
+        )
+        prerequisite_findings = "\n\n".join(
+            f"Findings on: {by_id[dependency].research_topic}\n"
+            f"{digest_research(outcome.get('compressed_research', ''), plan_prerequisite_digest_chars)}"
+            for dependency, outcome in zip(dependencies, outcomes)
+            if not isinstance(outcome, BaseException)
+        )
+        return await scheduler.run(
+            lambda: conduct_research(task.research_topic, config, prerequisite_findings or None),
+            label=task.research_topic
+        )
+
+    # Prerequisites come first, so every task finds its prerequisites already started
+    for task in tasks:
+        source = research_sources.get(duplicate_of[task.id]) if task.id in duplicate_of else None
+        if source is not None:
+            prerequisites[task.id] = source
+            continue
+        running[task.id] = prerequisites[task.id] = asyncio.create_task(run_task(task))
+        research_sources[topic_key(task.research_topic)] = running[task.id]
+    return running
+
+async def execute_research_plan(
+    tool_call: dict,
+    tasks: list[PlannedResearch],
+    running: dict[str, asyncio.Task],
+    skipped: list[PlannedResearch] | None = None
+) -> tuple[ToolMessage, list[BaseMessage], list[str], dict[str, str]]:
+    """Wait for a started research plan and deliver its findings.
+
+    Args:
+        tool_call: The ConductResearchPlan tool call
+        tasks: The plan's tasks in dependency order
+        running: Running research by task id (see start_research_plan)
+        skipped: Tasks not researched because the run's budget is running low
+
+    Returns:
+        Tuple of (tool message for the call, messages delivering each task's
+        findings, raw note references, notes keyed by topic)
+    """
+    try:
+        outcomes = dict(zip(running, await asyncio.gather(*running.values(), return_exceptions=True)))
+    except asyncio.CancelledError:
+        for task in running.values():
+            task.cancel()
+        raise
+
+    skipped_ids = {task.id for task in skipped or []}
+    messages, raw_notes, notes_by_topic, failures = [], [], {}, 0
+    for task in tasks:
+        if task.id not in outcomes:
+            continue
+        outcome = outcomes[task.id]
+        content, failed = format_research_outcome(outcome, {"args": {"research_topic": task.research_topic}})
+        failures += failed
+        if not failed:
+            raw_notes.extend(outcome.get("raw_notes", []))
+            notes_by_topic[topic_key(task.research_topic)] = content
+        messages.append(HumanMessage(
+            content=f"Research topic: {task.research_topic}\n\n{content}",
+            name=RESEARCH_FAILED_NAME if failed else RESEARCH_RESULT_NAME
+        ))
+
+    summary = f"Research plan finished: {len(outcomes) - failures} of {len(outcomes)} researched tasks returned findings, delivered in the following messages."
+    repeated = len(tasks) - len(outcomes) - len(skipped_ids)
+    if repeated:
+        summary += f" {repeated} tasks repeated research from elsewhere in this run and were answered from it."
+    if skipped_ids:
+        summary += f" {len(skipped_ids)} tasks were not researched because the research budget is running low."
+    return ToolMessage(
+        content=summary,
+        name=tool_call["name"],
+        tool_call_id=tool_call["id"],
+        status="error" if outcomes and failures == len(outcomes) else "success"
+    ), messages, raw_notes, notes_by_topic
+
+# ===== AS-COMPLETED SUPERVISION =====
+
+class InflightResearch:
+    """Researchers still running in the background for one as-completed supervision loop.
+
+    asyncio tasks cannot be kept in graph state, so they are tracked here keyed
+    by the loop's supervision_id, while their tool calls are kept in the
+    pending_research state channel so a resumed run can launch them again.
+    They share one scheduler so the concurrency limit holds across supervisor
+    turns.
+    """
+
+    def __init__(self, scheduler: ResearchScheduler):
+        self.scheduler = scheduler
+        # tool_call_id -> (ConductResearch tool call, running task)
+        self.tasks: dict[str, tuple[dict, asyncio.Task]] = {}
+
+    def launch(self, tool_call: dict, config: RunnableConfig) -> None:
+        """Start researching a ConductResearch call in the background."""
+        topic = tool_call["args"]["research_topic"]
+        self.track(tool_call, asyncio.create_task(self.scheduler.run(
+            lambda: conduct_research(topic, config),
+            label=topic
+        )))
+
+    def track(self, tool_call: dict, task: asyncio.Task) -> None:
+        """Deliver research already started for a call (such as a research plan task) when it finishes."""
+        self.tasks[tool_call["id"]] = (tool_call, task)
+
+    async def collect(self, wait_for_all: bool = False) -> tuple[list[BaseMessage], list[str], dict[str, str]]:
+        """Wait for running researchers and deliver every finished one.
+
+        Args:
+            wait_for_all: Wait for all researchers instead of the first to finish
+
+        Returns:
+            Tuple of (messages delivering findings to the supervisor, raw note
+            references, notes keyed by topic)
+        """
+        if not self.tasks:
+            return [], [], {}
+
+        await asyncio.wait(
+            [task for _, task in self.tasks.values()],
+            return_when=asyncio.ALL_COMPLETED if wait_for_all else asyncio.FIRST_COMPLETED
+        )
+
+        messages, raw_notes, notes_by_topic = [], [], {}
+        for tool_call_id, (tool_call, task) in list(self.tasks.items()):
+            if not task.done():
+                continue
+            del self.tasks[tool_call_id]
+            if task.cancelled():
+                continue
+            outcome = task.exception() or task.result()
+            content, failed = format_research_outcome(outcome, tool_call)
+            if not failed:
+                raw_notes.extend(outcome.get("raw_notes", []))
+                notes_by_topic[topic_key(tool_call["args"]["research_topic"])] = content
+            messages.append(HumanMessage(
+                content=f"Research topic: {tool_call['args']['research_topic']}\n\n{content}",
+                name=RESEARCH_FAILED_NAME if failed else RESEARCH_RESULT_NAME
+            ))
+
+        if self.tasks:
+            still_running = "\n".join(f"- {tool_call['args']['research_topic']}" for tool_call, _ in self.tasks.values())
+            messages.append(HumanMessage(content=(
+                f"These researchers are still running and will report back when finished:\n{still_running}\n\n"
+                "You can launch follow-up research now, or call ResearchComplete to stop them and finish."
+            )))
+
+        return messages, raw_notes, notes_by_topic
+
+    def cancel(self) -> None:
+        """Cancel every researcher that is still running."""
+        for _, task in self.tasks.values():
+            task.cancel()
+        self.tasks.clear()
+
+    def pending_calls(self) -> list[dict]:
+        """Get the ConductResearch calls whose researchers are still running."""
+        return [tool_call for tool_call, _ in self.tasks.values()]
+
+# Background researchers by supervision_id
+_inflight_research: dict[str, InflightResearch] = {}
+
+def release_inflight_research(supervision_id: str | None) -> None:
+    """Cancel and forget a supervision loop's background researchers, if it has any."""
+    inflight = _inflight_research.pop(supervision_id, None) if supervision_id else None
+    if inflight is not None:
+        inflight.cancel()
+
+# Result for ConductResearch calls dropped because the run's budget is running low
+BUDGET_LIMITED_MESSAGE = "Not researched: the research budget for this run is running low, so fewer researchers can be launched. Prioritize the most important topics or call ResearchComplete."
+
+# Placeholder result for ConductResearch calls whose researcher runs in the background
+PENDING_RESEARCH_MESSAGE = "Research launched in the background. Its findings will be delivered in a later message as soon as the researcher finishes."
+
+# Placeholder result for research plans whose tasks run in the background
+PENDING_PLAN_MESSAGE = "Research plan launched in the background: {launched} tasks are being researched and each task's findings will be delivered in a later message as soon as it finishes."
+
+# ===== MESSAGE COMPACTION =====
+
+# Whole-line markdown headings ("### Sources") or bold labels ("**Fully Comprehensive Findings**")
+SECTION_HEADING_PATTERN = re.compile(r"^\s*(?:#{1,6}\s+(.+?)|\*\*([^*]+)\*\*)\s*:?\s*$")
+URL_PATTERN = re.compile(r"https?://[^\s)\]>\"']+")
+
+def digest_research(content: str, max_chars: int = research_digest_chars) -> str:
+    """Shorten compressed research to a digest of its findings.
+
+    Skips the list of queries and the sources sections that compressed
+    research starts and ends with, and keeps the opening findings up to
+    max_chars characters.
+
+    Args:
+        content: Compressed research findings
+        max_chars: Maximum digest length
+
+    Returns:
+        Digest of the findings
+    """
+    section = None
+    lines = []
+    for line in content.splitlines():
+        heading = SECTION_HEADING_PATTERN.match(line)
+        if heading:
+            title = (heading.group(1) or heading.group(2)).lower()
+            if "source" in title:
+                section = "sources"
+            elif "quer" in title or "tool call" in title:
+                section = "queries"
+            else:
+                section = "findings"
+            continue
+        if section in (None, "findings") and line.strip():
+            lines.append(line.strip())
+
+    digest = " ".join(lines) or content.strip()
+    if len(digest) <= max_chars:
+        return digest
+    return digest[:max_chars].rsplit(" ", 1)[0] + " ..."
+
+def compact_supervisor_messages(
+    messages: list[BaseMessage],
+    max_chars: int = research_digest_chars
+) -> tuple[list[BaseMessage], list[str]]:
+    """Replace research findings the supervisor has already seen with digests.
+
+    Findings delivered after the supervisor's latest turn are kept in full so
+    it can assess them; older findings become digests. Each finding also
+    yields a line of coverage metadata (topic, source count, size).
+
+    Args:
+        messages: Supervisor message history
+        max_chars: Maximum length of each digest
+
+    Returns:
+        Tuple of (compacted messages, coverage lines)
+    """
+    last_turn = max((i for i, message in enumerate(messages) if isinstance(message, AIMessage)), default=-1)
+    topics = {
+        tool_call["id"]: tool_call["args"].get("research_topic", "")
+        for message in messages if isinstance(message, AIMessage)
+        for tool_call in message.tool_calls
+    }
+
+    compacted, coverage = [], []
+    for i, message in enumerate(messages):
+        if isinstance(message, ToolMessage) and message.name == "ConductResearch" and not (message.artifact or {}).get("pending"):
+            topic, findings, prefix = topics.get(message.tool_call_id, ""), message.content, ""
+            failed = message.status == "error"
+        elif isinstance(message, HumanMessage) and message.name in (RESEARCH_RESULT_NAME, RESEARCH_FAILED_NAME):
+            prefix, _, findings = message.content.partition("\n\n")
+            topic, prefix = prefix.removeprefix("Research topic: "), prefix + "\n\n"
+            failed = message.name == RESEARCH_FAILED_NAME
+        else:
+            compacted.append(message)
+            continue
+
+        label = " ".join(topic.split())[:150]
+        if failed:
+            coverage.append(f"- {label}: failed, no findings")
+        else:
+            # Duplicate topics answered from earlier research are already covered
+            if not (getattr(message, "artifact", None) or {}).get("duplicate_of"):
+                sources = len(set(URL_PATTERN.findall(findings)))
+                coverage.append(f"- {label}: {sources} sources, {len(findings)} characters of findings")
+            if i < last_turn and len(findings) > max_chars:
+                digest = digest_research(findings, max_chars)
+                message = message.model_copy(update={
+                    "content": f"{prefix}Digest of findings (full text kept in the research notes):\n{digest}"
+                })
+        compacted.append(message)
+
+    return compacted, coverage
+
 # ===== SUPERVISOR NODES =====
 
-async def supervisor(state: SupervisorState) -> Command[Literal["supervisor_tools"]]:
+async def supervisor(state: SupervisorState, config: RunnableConfig) -> Command[Literal["supervisor_tools"]]:
     """Coordinate research activities.
 
     Analyzes the research brief and current progress to decide:
@@ -92,22 +762,47 @@ async def supervisor(state: SupervisorState) -> Command[Literal["supervisor_tool
 
     Args:
         state: Current supervisor state with messages and research progress
+        config: Run configuration; set configurable.compact_supervisor_messages
+            to False to show the supervisor every finding in full, and
+            configurable.research_plans to True to offer ConductResearchPlan
 
     Returns:
         Command to proceed to supervisor_tools node with updated state
     """
     supervisor_messages = state.get("supervisor_messages", [])
 
+    # A new supervision must not reuse the results a previous run of the thread journaled
+    if not state.get("research_iterations", 0):
+        await asyncio.to_thread(reset_research_journal, config)
+
     # Prepare system message with current date and constraints
     system_message = lead_researcher_prompt.format(
         date=get_today_str(), 
-        max_concurrent_research_units=max_concurrent_researchers,
+        max_concurrent_research_units=max(1, get_researchers_per_turn(config)),
         max_researcher_iterations=max_researcher_iterations
     )
+    model = supervisor_model_with_tools
+    if config.get("configurable", {}).get("research_plans", research_plans):
+        system_message += "\n\n" + research_plan_prompt.format(max_plan_tasks=max_plan_tasks)
+        model = supervisor_model_with_plan_tools
+
+    # Show earlier findings as digests so the prompt does not grow with every iteration
+    if config.get("configurable", {}).get("compact_supervisor_messages", compact_supervisor_messages_enabled):
+        supervisor_messages, coverage = compact_supervisor_messages(supervisor_messages)
+        if coverage:
+            system_message += "\n\n" + research_coverage_prompt.format(coverage="\n".join(coverage))
+
     messages = [SystemMessage(content=system_message)] + supervisor_messages
 
     # Make decision about next research steps
-    response = await supervisor_model_with_tools.ainvoke(messages)
+    try:
+        async with atask_slot("model", config):
+            response = await model.ainvoke(messages)
+    except BaseException:
+        # The run is failing, cancelled or interrupted: stop its background researchers
+        # (a resumed run relaunches them from pending_research)
+        release_inflight_research(state.get("supervision_id"))
+        raise
 
     return Command(
         goto="supervisor_tools",
@@ -117,7 +812,7 @@ async def supervisor(state: SupervisorState) -> Command[Literal["supervisor_tool
         }
     )
 
-async def supervisor_tools(state: SupervisorState) -> Command[Literal["supervisor", "__end__"]]:
+async def supervisor_tools(state: SupervisorState, config: RunnableConfig) -> Command[Literal["supervisor", "__end__"]]:
     """Execute supervisor decisions - either conduct research or end the process.
 
     Handles:
@@ -128,17 +823,48 @@ async def supervisor_tools(state: SupervisorState) -> Command[Literal["superviso
 
     Args:
         state: Current supervisor state with messages and iteration count
+        config: Run configuration; set configurable.use_research_cache to False
+            to bypass cross-run research memoization,
+            configurable.research_executor to pick where researchers run,
+            configurable.max_concurrent_researchers to bound parallel researchers,
+            configurable.researcher_timeout_seconds /
+            configurable.max_researcher_retries to control fault isolation,
+            configurable.supervision_mode to choose "barrier" or "as_completed",
+            and configurable.run_budget to limit the run's spend (see budget.py)
 
     Returns:
         Command to continue supervision, end process, or handle errors
     """
+    supervision_id = state.get("supervision_id") or str(uuid.uuid4())
+    try:
+        return await _run_supervisor_tools(state, config, supervision_id)
+    except BaseException:
+        # Cancelled or interrupted: stop background researchers instead of leaking them
+        release_inflight_research(supervision_id)
+        raise
+
+async def _run_supervisor_tools(state: SupervisorState, config: RunnableConfig, supervision_id: str) -> Command:
     supervisor_messages = state.get("supervisor_messages", [])
     research_iterations = state.get("research_iterations", 0)
+    as_completed = config.get("configurable", {}).get("supervision_mode", supervision_mode) == "as_completed"
     most_recent_message = supervisor_messages[-1]
 
     # Initialize variables for single return pattern
     tool_messages = []
     all_raw_notes = []
+    new_notes_by_topic = {}
+    deduplicated_topics = []
+    delivered = []  # Findings delivered as messages after this turn's tool messages
+    plan_runs = []
+    started = []  # Research started in this turn, stopped if the turn fails
+    dedup_threshold = config.get("configurable", {}).get("topic_dedup_threshold", topic_dedup_threshold)
+    scheduler = get_research_scheduler(config)
+    inflight = _inflight_research.get(supervision_id)
+    if as_completed and inflight is None and state.get("pending_research"):
+        # Resumed from a checkpoint: the background researchers died with the old process
+        inflight = _inflight_research[supervision_id] = InflightResearch(scheduler)
+        for tool_call in state["pending_research"]:
+            inflight.launch(tool_call, config)
     next_step = "supervisor"  # Default next step
     should_end = False
 
@@ -149,11 +875,26 @@ async def supervisor_tools(state: SupervisorState) -> Command[Literal["superviso
         tool_call["name"] == "ResearchComplete" 
         for tool_call in most_recent_message.tool_calls
     )
+    # Finish early when the run's budget is spent, leaving the rest for the report
+    budget = get_run_budget(config)
+    budget_exhausted = budget is not None and budget.level() == "exhausted"
 
-    if exceeded_iterations or no_tool_calls or research_complete:
+    if exceeded_iterations or no_tool_calls or research_complete or budget_exhausted:
         should_end = True
         next_step = END
 
+        # In as-completed mode, stop background researchers if the supervisor declared
+        # completion or the budget is spent; otherwise (iteration limit) wait for the
+        # work already paid for
+        if inflight is not None:
+            if research_complete or budget_exhausted:
+                inflight.cancel()
+            else:
+                delivered, all_raw_notes, new_notes_by_topic = await inflight.collect(wait_for_all=True)
+                tool_messages.extend(delivered)
+            scheduler = inflight.scheduler
+            release_inflight_research(supervision_id)
+
     else:
         # Execute ALL tool calls before deciding next step
         try:
@@ -168,6 +909,70 @@ async def supervisor_tools(state: SupervisorState) -> Command[Literal["superviso
                 if tool_call["name"] == "ConductResearch"
             ]
 
+            # Research plan tasks count as research calls for deduplication and budget limits
+            plans, plan_task_ids = [], {}
+            for tool_call in most_recent_message.tool_calls:
+                if tool_call["name"] != "ConductResearchPlan":
+                    continue
+                try:
+                    plans.append((tool_call, prepare_research_plan(tool_call)))
+                except ValueError as e:
+                    tool_messages.append(ToolMessage(
+                        content=f"Invalid research plan, nothing was researched: {e}",
+                        name=tool_call["name"],
+                        tool_call_id=tool_call["id"],
+                        status="error"
+                    ))
+            plan_task_calls = []
+            for tool_call, tasks in plans:
+                for task in tasks:
+                    plan_task_calls.append(plan_task_call(tool_call, task))
+                    plan_task_ids[plan_task_calls[-1]["id"]] = task.id
+
+            # Answer topics already researched (or being researched) in this run from that research
+            researched_notes = state.get("notes_by_topic", {})
+            running_topics = [
+                topic_key(tool_call["args"]["research_topic"])
+                for tool_call, _ in (inflight.tasks.values() if inflight is not None else [])
+            ]
+            research_calls, duplicate_calls = deduplicate_research_calls(
+                conduct_research_calls + plan_task_calls, list(researched_notes) + running_topics, dedup_threshold
+            )
+            deduplicated_topics = [
+                DeduplicatedTopic(
+                    research_topic=tool_call["args"]["research_topic"],
+                    duplicate_of=duplicate_of,
+                    similarity=similarity
+                )
+                for tool_call, duplicate_of, similarity in duplicate_calls
+            ]
+
+            # Launch fewer researchers as the run's budget runs low (plan tasks come last,
+            # in dependency order, so the tasks kept never depend on a task dropped)
+            if budget is not None:
+                allowed = get_researchers_per_turn(config)
+                for tool_call in research_calls[allowed:]:
+                    if tool_call["id"] not in plan_task_ids:
+                        tool_messages.append(ToolMessage(
+                            content=BUDGET_LIMITED_MESSAGE,
+                            name=tool_call["name"],
+                            tool_call_id=tool_call["id"],
+                            status="error"
+                        ))
+                research_calls = research_calls[:allowed]
+            conduct_research_calls = [tool_call for tool_call in research_calls if tool_call["id"] not in plan_task_ids]
+            kept_plan_tasks = {tool_call["id"] for tool_call in research_calls if tool_call["id"] in plan_task_ids}
+            plan_duplicates = {tool_call["id"]: duplicate_of for tool_call, duplicate_of, _ in duplicate_calls if tool_call["id"] in plan_task_ids}
+            for tool_call, duplicate_of, similarity in duplicate_calls:
+                if tool_call["id"] in plan_task_ids:
+                    emit_progress(ResearchDeduplicated(
+                        event="research_deduplicated",
+                        research_topic=tool_call["args"]["research_topic"],
+                        duplicate_of=duplicate_of,
+                        similarity=similarity
+                    ))
+            duplicate_calls = [duplicate for duplicate in duplicate_calls if duplicate[0]["id"] not in plan_task_ids]
+
             # Handle think_tool calls (synchronous)
             for tool_call in think_tool_calls:
                 observation = think_tool.invoke(tool_call["args"])
@@ -179,54 +984,144 @@ async def supervisor_tools(state: SupervisorState) -> Command[Literal["superviso
                     )
                 )
 
-            # Handle ConductResearch calls (asynchronous)
-            if conduct_research_calls:
-                # Launch parallel research agents
-                coros = [
-                    researcher_agent.ainvoke({
-                        "researcher_messages": [
-                            HumanMessage(content=tool_call["args"]["research_topic"])
-                        ],
-                        "research_topic": tool_call["args"]["research_topic"]
-                    }) 
+            # In as-completed mode all research shares the loop's scheduler across turns
+            if as_completed:
+                if inflight is None:
+                    inflight = _inflight_research[supervision_id] = InflightResearch(scheduler)
+                scheduler = inflight.scheduler
+
+            # Start ConductResearch calls; the scheduler queues any beyond the concurrency limit
+            if as_completed:
+                for tool_call in conduct_research_calls:
+                    inflight.launch(tool_call, config)
+                    tool_messages.append(ToolMessage(
+                        content=PENDING_RESEARCH_MESSAGE,
+                        name=tool_call["name"],
+                        tool_call_id=tool_call["id"],
+                        artifact={"pending": True}
+                    ))
+                research_tasks = {}
+            else:
+                research_tasks = {
+                    tool_call["id"]: asyncio.create_task(scheduler.run(
+                        lambda topic=tool_call["args"]["research_topic"]: conduct_research(topic, config),
+                        label=tool_call["args"]["research_topic"]
+                    ))
                     for tool_call in conduct_research_calls
-                ]
+                }
+                started.extend(research_tasks.values())
 
-                # Wait for all research to complete
-                tool_results = await asyncio.gather(*coros)
+            # Start research plans alongside; tasks repeating other research wait for it instead
+            research_sources: dict[str, str | asyncio.Task] = {**researched_notes}
+            for tool_call, task in (inflight.tasks.values() if inflight is not None else []):
+                research_sources[topic_key(tool_call["args"]["research_topic"])] = task
+            for tool_call in conduct_research_calls:
+                if tool_call["id"] in research_tasks:
+                    research_sources[topic_key(tool_call["args"]["research_topic"])] = research_tasks[tool_call["id"]]
+            for tool_call, tasks in plans:
+                calls = {task.id: plan_task_call(tool_call, task)["id"] for task in tasks}
+                skipped = [task for task in tasks if calls[task.id] not in kept_plan_tasks and calls[task.id] not in plan_duplicates]
+                running = start_research_plan(
+                    [task for task in tasks if task not in skipped], scheduler, config, research_sources,
+                    {task.id: plan_duplicates[calls[task.id]] for task in tasks if calls[task.id] in plan_duplicates}
+                )
+                started.extend(running.values())
+                if as_completed:
+                    for task in tasks:
+                        if task.id in running:
+                            inflight.track(plan_task_call(tool_call, task), running[task.id])
+                    tool_messages.append(ToolMessage(
+                        content=PENDING_PLAN_MESSAGE.format(launched=len(running)) + (
+                            f" {len(skipped)} tasks were not researched because the research budget is running low." if skipped else ""
+                        ),
+                        name=tool_call["name"],
+                        tool_call_id=tool_call["id"],
+                        artifact={"pending": True}
+                    ))
+                else:
+                    plan_run = asyncio.create_task(execute_research_plan(tool_call, tasks, running, skipped))
+                    plan_runs.append(plan_run)
+                    started.append(plan_run)
+
+            # In as-completed mode, wait for the first researcher to finish
+            if as_completed:
+                for tool_call, duplicate_of, similarity in duplicate_calls:
+                    tool_messages.append(answer_duplicate_research(
+                        tool_call, duplicate_of, similarity, researched_notes, pending=True
+                    ))
+                delivered, all_raw_notes, new_notes_by_topic = await inflight.collect()
+
+            # Handle ConductResearch calls (asynchronous)
+            elif conduct_research_calls:
+                # Wait for all research to complete; a failing researcher returns its
+                # exception instead of discarding the other researchers' results
+                outcomes = await asyncio.gather(*research_tasks.values(), return_exceptions=True)
 
                 # Format research results as tool messages
                 # Each sub-agent returns compressed research findings in result["compressed_research"]
-                # We write this compressed research as the content of a ToolMessage, which allows
-                # the supervisor to later retrieve these findings via get_notes_from_tool_calls()
-                research_tool_messages = [
-                    ToolMessage(
-                        content=result.get("compressed_research", "Error synthesizing research report"),
+                # We write this compressed research as the content of a ToolMessage for the supervisor
+                # and record it in notes_by_topic, so the final notes are ready when research ends
+                # Failed topics become error ToolMessages so the supervisor can retry or move on
+                tool_results = []
+                for outcome, tool_call in zip(outcomes, conduct_research_calls):
+                    content, failed = format_research_outcome(outcome, tool_call)
+                    if not failed:
+                        tool_results.append(outcome)
+                        new_notes_by_topic[topic_key(tool_call["args"]["research_topic"])] = content
+                    tool_messages.append(ToolMessage(
+                        content=content,
                         name=tool_call["name"],
-                        tool_call_id=tool_call["id"]
-                    ) for result, tool_call in zip(tool_results, conduct_research_calls)
-                ]
-
-                tool_messages.extend(research_tool_messages)
+                        tool_call_id=tool_call["id"],
+                        status="error" if failed else "success"
+                    ))
 
-                # Aggregate raw notes from all research
+                # Aggregate raw note references from all research (the text stays in the blob store)
                 all_raw_notes = [
-                    "\n".join(result.get("raw_notes", [])) 
+                    raw_note
                     for result in tool_results
+                    for raw_note in result.get("raw_notes", [])
                 ]
 
+            # Duplicates of topics in this batch are answered once their research is done
+            if not as_completed:
+                for tool_call, duplicate_of, similarity in duplicate_calls:
+                    tool_messages.append(answer_duplicate_research(
+                        tool_call, duplicate_of, similarity, {**researched_notes, **new_notes_by_topic}
+                    ))
+
+            # Research plans finish with one tool message each; their findings follow all tool messages
+            for plan_run in plan_runs:
+                plan_message, plan_results, plan_raw_notes, plan_notes = await plan_run
+                tool_messages.append(plan_message)
+                delivered = delivered + plan_results
+                all_raw_notes = all_raw_notes + plan_raw_notes
+                new_notes_by_topic = {**new_notes_by_topic, **plan_notes}
+            tool_messages.extend(delivered)
+
         except Exception as e:
             print(f"Error in supervisor tools: {e}")
             should_end = True
             next_step = END
+            for task in started:
+                task.cancel()
+            release_inflight_research(supervision_id)
+        except BaseException:
+            for task in started:
+                task.cancel()
+            raise
 
     # Single return point with appropriate state updates
     if should_end:
+        notes_by_topic = {**state.get("notes_by_topic", {}), **new_notes_by_topic}
         return Command(
             goto=next_step,
             update={
-                "notes": get_notes_from_tool_calls(supervisor_messages),
-                "research_brief": state.get("research_brief", "")
+                "notes": list(notes_by_topic.values()),
+                "research_brief": state.get("research_brief", ""),
+                "raw_notes": all_raw_notes,
+                # A shared as-completed scheduler reports its metrics once, when supervision ends
+                "scheduler_metrics": scheduler.metrics() if as_completed else None,
+                "pending_research": []
             }
         )
     else:
@@ -234,7 +1129,12 @@ async def supervisor_tools(state: SupervisorState) -> Command[Literal["superviso
             goto=next_step,
             update={
                 "supervisor_messages": tool_messages,
-                "raw_notes": all_raw_notes
+                "raw_notes": all_raw_notes,
+                "notes_by_topic": new_notes_by_topic,
+                "deduplicated_topics": deduplicated_topics,
+                "scheduler_metrics": None if as_completed else scheduler.metrics(),
+                "supervision_id": supervision_id,
+                "pending_research": inflight.pending_calls() if inflight is not None else []
             }
         )
 
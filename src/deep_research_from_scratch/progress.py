@@ -0,0 +1,115 @@
+"""Live Progress Events for Research Runs.
+
+This module defines typed progress events emitted by the supervisor, the
+researchers and the search pipeline while a run is in progress. Events are
+delivered two ways:
+- As custom stream chunks: graph.astream(..., stream_mode="custom")
+- As custom events: graph.astream_events(..., version="v2") yields them
+  with event == "on_custom_event" and name == PROGRESS_EVENT_NAME
+
+When nobody is listening, emitting an event is a couple of no-op calls.
+"""
+
+import time
+from typing_extensions import List, Literal, NotRequired, TypedDict
+
+from langchain_core.callbacks.manager import dispatch_custom_event
+from langgraph.config import get_config, get_stream_writer
+
+# Name used for progress events in astream_events
+PROGRESS_EVENT_NAME = "research_progress"
+
+# ===== EVENT SCHEMAS =====
+
+class ProgressEvent(TypedDict):
+    """Base fields shared by every progress event."""
+    event: str
+    timestamp: NotRequired[float]
+
+class ResearcherStarted(ProgressEvent):
+    """A researcher was launched for a topic."""
+    event: Literal["researcher_started"]
+    research_topic: str
+
+class SearchIssued(ProgressEvent):
+    """One or more web search queries were sent."""
+    event: Literal["search_issued"]
+    queries: List[str]
+
+class SourceSummarized(ProgressEvent):
+    """A search result page was processed into a summary."""
+    event: Literal["source_summarized"]
+    url: str
+    title: str
+
+class ResearchScheduled(ProgressEvent):
+    """A research task got a concurrency slot after waiting in the queue."""
+    event: Literal["research_scheduled"]
+    research_topic: str
+    queue_depth: int
+    wait_seconds: float
+
+class SlotQueued(ProgressEvent):
+    """A model, search or researcher task got a slot of the shared scheduler after waiting."""
+    event: Literal["slot_queued"]
+    kind: str
+    tenant: str
+    queue_seconds: float
+
+class ResearchDeduplicated(ProgressEvent):
+    """A research topic was answered from a near-identical topic instead of being researched again."""
+    event: Literal["research_deduplicated"]
+    research_topic: str
+    duplicate_of: str
+    similarity: float
+
+class ResearchIteration(ProgressEvent):
+    """A researcher finished a tool-calling iteration."""
+    event: Literal["research_iteration"]
+    research_topic: str
+    iteration: int
+    tool_names: List[str]
+
+class ResearchCompressed(ProgressEvent):
+    """A researcher compressed its findings."""
+    event: Literal["research_compressed"]
+    research_topic: str
+    compressed_chars: int
+
+class ResearcherDone(ProgressEvent):
+    """A researcher finished, either by researching or from cached results."""
+    event: Literal["researcher_done"]
+    research_topic: str
+    cached: bool
+
+class ResearcherFailed(ProgressEvent):
+    """A researcher failed or timed out on every attempt."""
+    event: Literal["researcher_failed"]
+    research_topic: str
+    error: str
+
+# ===== EMISSION =====
+
+def emit_progress(event: ProgressEvent) -> None:
+    """Publish a progress event to any listeners of the current graph run.
+
+    Safe to call anywhere: outside a graph run, or when no stream mode or
+    callback handler is listening, the event is dropped.
+
+    Args:
+        event: Progress event to publish
+    """
+    try:
+        config = get_config()
+    except RuntimeError:
+        return  # Not inside a graph run, so nobody can be listening
+
+    event.setdefault("timestamp", time.time())
+
+    # No-op unless the run is streamed with stream_mode="custom"
+    get_stream_writer()(event)
+
+    # Only dispatch through callbacks when a handler (e.g. astream_events) is attached
+    callbacks = config.get("callbacks")
+    if callbacks and getattr(callbacks, "handlers", callbacks):
+        dispatch_custom_event(PROGRESS_EVENT_NAME, event, config=config)
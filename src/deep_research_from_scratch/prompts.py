@@ -95,11 +95,13 @@ You can use any of the tools provided to you to find resources that can help ans
 </Task>
 
 <Available Tools>
-You have access to two main tools:
-1. **tavily_search**: For conducting web searches to gather information
-2. **think_tool**: For reflection and strategic planning during research
+You have access to three main tools:
+1. **tavily_search**: For conducting a single web search to gather information
+2. **tavily_search_batch**: For conducting several web searches at once - pass a list of distinct queries and get one merged, deduplicated result
+3. **think_tool**: For reflection and strategic planning during research
 
 **CRITICAL: Use think_tool after each search to reflect on results and plan next steps**
+**BATCH SEARCHES**: When you want to explore several angles of the topic (e.g. during the initial broad searches), use a single tavily_search_batch call with all the queries instead of several tavily_search calls.
 </Available Tools>
 
 <Instructions>
@@ -117,6 +119,7 @@ Think like a human researcher with limited time. Follow these steps:
 - **Simple queries**: Use 2-3 search tool calls maximum
 - **Complex queries**: Use up to 5 search tool calls maximum
 - **Always stop**: After 5 search tool calls if you cannot find the right sources
+- A tavily_search_batch call counts as one search tool call per query it contains
 
 **Stop Immediately When**:
 - You can answer the user's question comprehensively
@@ -302,6 +305,41 @@ After each ConductResearch tool call, use think_tool to analyze the results:
 - Do NOT use acronyms or abbreviations in your research questions, be very clear and specific
 </Scaling Rules>"""
 
+research_coverage_prompt = """<Research Coverage>
+Findings from earlier research iterations are shown to you as short digests. Their full text is kept in the research notes and will be given to the report writer, so you do not need to research a topic again just to see more of it.
+
+Topics researched so far:
+{coverage}
+</Research Coverage>"""
+
+research_plan_prompt = """<Research Plans>
+Besides ConductResearch you can call **ConductResearchPlan** to delegate several topics at once when some of them build on the findings of others, for example surveying X and surveying Y before comparing X and Y.
+- Give each task a short id, and list in depends_on the ids of the tasks whose findings it needs
+- Tasks start as soon as their prerequisites finish, in parallel wherever possible, and each dependent researcher receives digests of its prerequisites' findings
+- Only add a dependency when a task truly needs another task's findings; independent topics should have none
+- Use at most {max_plan_tasks} tasks in a plan
+</Research Plans>"""
+
+prerequisite_research_prompt = """{research_topic}
+
+<Prerequisite Research>
+This task builds on research that has already been completed. Digests of its findings:
+
+{prerequisite_findings}
+</Prerequisite Research>
+
+Use these findings as your starting point and focus your searches on what this task adds beyond them."""
+
+prior_research_prompt = """{research_topic}
+
+<Prior Research>
+Research on a closely related topic was already conducted on {date}. Here are its findings:
+
+{prior_findings}
+</Prior Research>
+
+Build on these prior findings rather than repeating them. Focus your searches on information that is missing, specific to the topic above, or likely to have changed since then. Carry over any prior findings and sources that remain relevant. The prior topic may concern a different entity, place or product than the topic above; never present its findings as findings about this topic."""
+
 compress_research_system_prompt = """You are a research assistant that has conducted research on a topic by calling several tools and web searches. Your job is now to clean up the findings, but preserve all of the relevant statements and information that the researcher has gathered. For context, today's date is {date}.
 
 <Task>
@@ -325,25 +363,23 @@ The think_tool calls contain strategic reflections and decision-making notes tha
 1. Your output findings should be fully comprehensive and include ALL of the information and sources that the researcher has gathered from tool calls and web searches. It is expected that you repeat key information verbatim.
 2. This report can be as long as necessary to return ALL of the information that the researcher has gathered.
 3. In your report, you should return inline citations for each source that the researcher found.
-4. You should include a "Sources" section at the end of the report that lists all of the sources the researcher found with corresponding citations, cited against statements in the report.
-5. Make sure to include ALL of the sources that the researcher gathered in the report, and how they were used to answer the question!
-6. It's really important not to lose any sources. A later LLM will be used to merge this report with others, so having all of the sources is critical.
+4. Make sure to cite ALL of the sources that the researcher gathered in the report, against the statements they support.
+5. It's really important not to lose any sources. A later LLM will be used to merge this report with others, so having all of the sources is critical.
 </Guidelines>
 
 <Output Format>
 The report should be structured like this:
 **List of Queries and Tool Calls Made**
 **Fully Comprehensive Findings**
-**List of All Relevant Sources (with citations in the report)**
 </Output Format>
 
 <Citation Rules>
-- Assign each unique URL a single citation number in your text
-- End with ### Sources that lists each source with corresponding numbers
-- IMPORTANT: Number sources sequentially without gaps (1,2,3,4...) in the final list regardless of which sources you choose
-- Example format:
-  [1] Source Title: URL
-  [2] Source Title: URL
+- Search results label each source with an ID in square brackets, e.g. --- SOURCE [S3f9a2c81d07e]: Title ---
+- Cite a source by writing its ID in square brackets right after the statement it supports, e.g. [S3f9a2c81d07e]; cite several sources as [S3f9a2c81d07e][S81b0e4a92c5f]
+- Always use the IDs exactly as given; never renumber them
+- Do not write a list of sources with IDs at the end: an index of the cited sources is attached automatically
+- Only for sources that have no ID (e.g. local files), end with ### Sources that lists each such source:
+  [1] Source Title: location
 </Citation Rules>
 
 Critical Reminder: It is extremely important that any information that is even remotely relevant to the user's research topic is preserved verbatim (e.g. don't rewrite it, don't summarize it, don't paraphrase it).
@@ -365,6 +401,131 @@ CRITICAL REQUIREMENTS:
 
 The cleaned findings will be used for final report generation, so comprehensiveness is critical."""
 
+section_draft_prompt = """You are drafting one part of a larger research report. Another writer will merge your draft with drafts covering the rest of the findings. For context, today's date is {date}.
+
+<Research Brief>
+{research_brief}
+</Research Brief>
+
+Here is the part of the research findings you are responsible for:
+<Findings>
+{findings}
+</Findings>
+
+Write a detailed draft that covers everything these findings contribute to the research brief:
+- Start with a ## heading that names the theme of these findings, and use ### for subsections
+- Keep every relevant fact, figure, name and date; do not add information that is not in the findings
+- Keep the citations: cite sources with the source IDs used in the findings, e.g. [S3f9a2c81d07e], exactly as given
+- Do not write a Sources list
+- Do not write an introduction or conclusion for the whole report, and do not comment on what you are doing
+
+Write the draft in the same language as the research brief."""
+
+report_outline_prompt = """You are planning the structure of a research report before its sections are written. For context, today's date is {date}.
+
+<Research Brief>
+{research_brief}
+</Research Brief>
+
+Here are the research notes, numbered, each shortened to its opening lines:
+<Notes>
+{notes}
+</Notes>
+
+Plan the report:
+- Give the report a title
+- Plan at most {max_sections} sections, in the order they should appear, that together answer the research brief without overlapping
+- For each section, give its title, one or two sentences on what it should cover, and the numbers of the notes it draws on
+- Every note should be used by at least one section; a note may be used by more than one
+- Only plan an introduction or conclusion section if the brief calls for one
+
+Write the titles in the same language as the research brief."""
+
+report_section_prompt = """You are writing one section of a research report. Other writers are writing the other sections at the same time. For context, today's date is {date}.
+
+<Research Brief>
+{research_brief}
+</Research Brief>
+
+<Report Outline>
+{outline}
+</Report Outline>
+
+You are writing the section "{section_title}": {section_description}
+
+Here are the research findings for your section:
+<Findings>
+{findings}
+</Findings>
+
+Write the body of this section:
+- Do not repeat the section title; start directly with the content, and use ### for subsections
+- Keep every relevant fact, figure, name and date; do not add information that is not in the findings
+- Stay within the scope of your section; the other sections of the outline are covered by other writers
+- Cite sources with the source IDs used in the findings, in square brackets right after the statement they support, e.g. [S3f9a2c81d07e], exactly as given
+- Do not write a Sources list (one is added automatically), and do not comment on what you are doing
+- Use simple, clear language, in paragraph form by default, with bullet points where appropriate
+
+Write the section in the same language as the research brief."""
+
+research_gap_prompt = """You are updating an existing research report after the user refined their request. Research is expensive, so only what the earlier research does not already cover should be researched again. For context, today's date is {date}.
+
+<Previous Research Brief>
+{previous_research_brief}
+</Previous Research Brief>
+
+<Updated Research Brief>
+{research_brief}
+</Updated Research Brief>
+
+Requirements that are new or changed in the updated brief:
+<Changed Requirements>
+{changed_requirements}
+</Changed Requirements>
+
+The earlier research produced these notes, each shortened to its opening lines:
+<Existing Research>
+{existing_research}
+</Existing Research>
+
+List the research topics needed to cover the changed requirements:
+- Only list a topic if the existing research does not already answer it; return no topics if it does
+- Give each topic a short section title for the report, and a detailed, standalone research topic for a researcher who cannot see the existing research
+- Do not use acronyms or abbreviations in research topics
+- List at most {max_topics} topics
+
+Write in the same language as the research brief."""
+
+report_section_update_prompt = """You are updating one section of an existing research report, because the research brief was refined and new findings came in. For context, today's date is {date}.
+
+<Research Brief>
+{research_brief}
+</Research Brief>
+
+<Report Outline>
+{outline}
+</Report Outline>
+
+The current text of the section "{section_title}":
+<Current Section>
+{current_section}
+</Current Section>
+
+New research findings relevant to this section:
+<New Findings>
+{findings}
+</New Findings>
+
+Rewrite the body of this section for the updated brief:
+- Keep the current content that is still relevant, with its citations; drop content the updated brief no longer asks for
+- Work in the new findings where they belong; do not add information that is in neither the current section nor the new findings
+- Do not repeat the section title; start directly with the content, and use ### for subsections
+- Stay within the scope of your section; the other sections of the outline are kept as they are
+- Cite sources with the source IDs used in the text and findings, in square brackets right after the statement they support, e.g. [S3f9a2c81d07e], exactly as given
+- Do not write a Sources list (one is added automatically), and do not comment on what you are doing
+
+Write the section in the same language as the research brief."""
+
 final_report_generation_prompt = """Based on all the research conducted, create a comprehensive, well-structured answer to the overall research brief:
 <Research Brief>
 {research_brief}
@@ -384,9 +545,8 @@ Here are the findings from the research that you conducted:
 Please create a detailed answer to the overall research brief that:
 1. Is well-organized with proper headings (# for title, ## for sections, ### for subsections)
 2. Includes specific facts and insights from the research
-3. References relevant sources using [Title](URL) format
+3. Cites relevant sources by their source IDs (see the Citation Rules below)
 4. Provides a balanced, thorough analysis. Be as comprehensive as possible, and include all information that is relevant to the overall research question. People are using you for deep research and will expect detailed, comprehensive answers.
-5. Includes a "Sources" section at the end with all referenced links
 
 You can structure your report in a number of different ways. Here are some examples:
 
@@ -432,13 +592,10 @@ Make sure the final answer report is in the SAME language as the human messages
 Format the report in clear markdown with proper structure and include source references where appropriate.
 
 <Citation Rules>
-- Assign each unique URL a single citation number in your text
-- End with ### Sources that lists each source with corresponding numbers
-- IMPORTANT: Number sources sequentially without gaps (1,2,3,4...) in the final list regardless of which sources you choose
-- Each source should be a separate line item in a list, so that in markdown it is rendered as a list.
-- Example format:
-  [1] Source Title: URL
-  [2] Source Title: URL
+- The findings cite sources by ID, e.g. [S3f9a2c81d07e], and the Source Catalog at the end of the findings lists the title of every ID
+- Cite a source by writing its ID in square brackets right after the statement it supports, e.g. [S3f9a2c81d07e]; cite several sources as [S3f9a2c81d07e][S81b0e4a92c5f]
+- Always use the IDs exactly as given; never renumber them or invent new ones
+- Do NOT write a Sources section: the IDs are replaced with sequential numbers and the numbered source list is added automatically
 - Citations are extremely important. Make sure to include these, and pay a lot of attention to getting these right. Users will often use these citations to look into more information.
 </Citation Rules>
 """
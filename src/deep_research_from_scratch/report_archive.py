@@ -0,0 +1,358 @@
+"""Compressed Archive and Retention for Saved Reports.
+
+Reports that have not been saved again for a while are cold: they are
+compressed into files/.archive and their catalog entry is pointed at the
+compressed copy. Compression uses zstd when the optional `zstandard` package
+is installed and zlib otherwise. Both codecs are primed with a shared
+dictionary of the markdown structure every report repeats (headings, lists,
+citations, source links), which matters most for short reports.
+
+Reports are read through read_report / iter_report_text, which handle plain
+and compressed reports alike and decompress in a streaming way, one chunk at
+a time. Archived reports leave the files directory that the filesystem
+researcher and the notebooks browse, so retention is not applied on save by
+default; schedule it (e.g. with cron) with:
+
+    python -m deep_research_from_scratch.report_archive --archive-after-days 7 --delete-after-days 90
+"""
+
+import argparse
+import codecs
+import json
+import os
+import statistics
+import threading
+import time
+import uuid
+import zlib
+from collections import deque
+from pathlib import Path
+from typing_extensions import Iterator, Optional, TypedDict
+
+from deep_research_from_scratch.report_catalog import ReportCatalog, report_catalog
+from deep_research_from_scratch.report_store import metadata_path
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+# ===== CONFIGURATION =====
+
+# Directory, next to the reports, holding compressed reports
+archive_dir_name = ".archive"
+
+# Reports not saved again for this many days are compressed
+archive_after_days = 7.0
+
+# Reports not saved again for this many days are deleted (None keeps them forever)
+delete_after_days: Optional[float] = None
+
+# Most reports to keep; the oldest beyond this are deleted (None for no limit)
+max_stored_reports: Optional[int] = None
+
+# Apply the retention policy every time a report is saved (off by default, since
+# archiving moves reports out of the files directory; schedule the CLI instead)
+retention_on_save = False
+
+# Compression levels of the two codecs
+zstd_level = 19
+zlib_level = 9
+
+# Compressed bytes read per chunk while streaming a report
+read_chunk_bytes = 64 * 1024
+
+# Number of recent report loads kept for latency stats
+load_latency_samples = 1000
+
+# Shared dictionaries by version. Archived files name the version they were
+# compressed with, so a dictionary must never be edited once used: add a new
+# version and point report_dictionary_version at it instead.
+_REPORT_DICTIONARIES = {
+    1: (
+        "# Research Report\n\n## Introduction\n\n## Overview\n\n## Background\n\n"
+        "## Key Findings\n\n## Analysis\n\n## Comparison\n\n| Feature | Description |\n|---|---|\n"
+        "## Recommendations\n\n## Conclusion\n\n## Summary\n\n### Sources\n\n"
+        "- **Key insight**: \n- **Note**: \n1. \n2. \n3. \n"
+        "According to [1], research shows that the results of the study indicate "
+        "that there is a significant difference between the two approaches. "
+        "However, it is important to note that these findings are based on "
+        "available data and may change over time. In addition, the report "
+        "provides an overview of the main factors, including the benefits and "
+        "limitations, as well as the most relevant information for each of the "
+        "following areas: cost, performance, reliability and user experience.\n\n"
+        "[1] https://www.\n[2] https://en.wikipedia.org/wiki/\n[3] https://www.\n"
+        "[4] https://\n[5] https://\n.com/\n.org/\n.html\n"
+    ).encode("utf-8"),
+}
+report_dictionary_version = 1
+
+# ===== SCHEMAS =====
+
+class RetentionResult(TypedDict):
+    """What a retention pass did."""
+    archived: list[str]
+    deleted: list[str]
+    bytes_freed: int
+
+class ArchiveStats(TypedDict):
+    """Space saved by the archive and latency of recent report loads."""
+    reports: int
+    archived_reports: int
+    original_bytes: int
+    stored_bytes: int
+    bytes_saved: int
+    compression_ratio: float
+    loads: int
+    mean_load_ms: Optional[float]
+    p95_load_ms: Optional[float]
+
+# ===== CODECS =====
+
+def _codec_suffix(codec: str, version: int) -> str:
+    return f".d{version}.{codec}"
+
+def _parse_suffix(path: Path) -> Optional[tuple[str, int]]:
+    """Get the (codec, dictionary version) of an archived report, or None for plain markdown."""
+    parts = path.name.split(".")
+    if len(parts) >= 3 and parts[-1] in ("zst", "zz") and parts[-2].startswith("d"):
+        return parts[-1], int(parts[-2][1:])
+    return None
+
+def default_codec() -> str:
+    """Get the codec new archives are written with."""
+    return "zst" if zstandard is not None else "zz"
+
+def _compress_file(source: Path, target: Path, codec: str, version: int) -> None:
+    """Stream-compress a file to target through a temporary file and a rename."""
+    dictionary = _REPORT_DICTIONARIES[version]
+    tmp_path = target.with_name(f".{target.name}.{uuid.uuid4().hex}.part")
+    try:
+        with open(source, "rb") as src, open(tmp_path, "wb") as dst:
+            if codec == "zst":
+                compressor = zstandard.ZstdCompressor(
+                    level=zstd_level,
+                    dict_data=zstandard.ZstdCompressionDict(dictionary, dict_type=zstandard.DICT_TYPE_RAWCONTENT)
+                )
+                with compressor.stream_writer(dst, closefd=False) as writer:
+                    while chunk := src.read(read_chunk_bytes):
+                        writer.write(chunk)
+            else:
+                compressor = zlib.compressobj(zlib_level, zdict=dictionary)
+                while chunk := src.read(read_chunk_bytes):
+                    dst.write(compressor.compress(chunk))
+                dst.write(compressor.flush())
+            dst.flush()
+            os.fsync(dst.fileno())
+        os.replace(tmp_path, target)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+def _iter_decompressed(path: Path, codec: str, version: int) -> Iterator[bytes]:
+    """Stream the decompressed bytes of an archived report."""
+    dictionary = _REPORT_DICTIONARIES[version]
+    with open(path, "rb") as f:
+        if codec == "zst":
+            if zstandard is None:
+                raise RuntimeError(f"Reading {path.name} needs the zstandard package")
+            decompressor = zstandard.ZstdDecompressor(
+                dict_data=zstandard.ZstdCompressionDict(dictionary, dict_type=zstandard.DICT_TYPE_RAWCONTENT)
+            )
+            with decompressor.stream_reader(f) as reader:
+                while chunk := reader.read(read_chunk_bytes):
+                    yield chunk
+        else:
+            decompressor = zlib.decompressobj(zdict=dictionary)
+            while chunk := f.read(read_chunk_bytes):
+                yield decompressor.decompress(chunk)
+            yield decompressor.flush()
+
+# ===== READING =====
+
+_load_latencies: deque[float] = deque(maxlen=load_latency_samples)
+_load_latencies_lock = threading.Lock()
+
+def iter_report_text(path: str | Path) -> Iterator[str]:
+    """Stream the text of a saved report, decompressing it lazily if archived.
+
+    Args:
+        path: Path of the report, plain or archived (as recorded in the catalog)
+
+    Yields:
+        Decoded text chunks
+    """
+    path = Path(path)
+    started = time.perf_counter()
+    archived = _parse_suffix(path)
+    if archived is None:
+        def chunks() -> Iterator[bytes]:
+            with open(path, "rb") as f:
+                while chunk := f.read(read_chunk_bytes):
+                    yield chunk
+        byte_chunks = chunks()
+    else:
+        byte_chunks = _iter_decompressed(path, *archived)
+
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    for chunk in byte_chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+    with _load_latencies_lock:
+        _load_latencies.append(time.perf_counter() - started)
+
+def read_report(path: str | Path) -> str:
+    """Read the full text of a saved report, plain or archived."""
+    return "".join(iter_report_text(path))
+
+# ===== ARCHIVING AND RETENTION =====
+
+def archive_report(report_id: str, catalog: ReportCatalog = report_catalog) -> Optional[Path]:
+    """Compress a catalogued report and point its catalog entry at the archive.
+
+    The compressed copy goes to the archive directory next to the report;
+    the metadata sidecar stays where it is.
+
+    Args:
+        report_id: Report to archive
+        catalog: Catalog the report is recorded in
+
+    Returns:
+        Path of the compressed report, or None if the report is unknown,
+        missing or already archived
+    """
+    entry = catalog.get(report_id)
+    if entry is None:
+        return None
+    source = Path(entry["path"])
+    if _parse_suffix(source) is not None or not source.exists():
+        return None
+
+    directory = source.parent / archive_dir_name
+    directory.mkdir(parents=True, exist_ok=True)
+    codec = default_codec()
+    target = directory / (source.stem + _codec_suffix(codec, report_dictionary_version))
+    _compress_file(source, target, codec, report_dictionary_version)
+    catalog.set_path(report_id, target, archived=True)
+    source.unlink()
+    return target
+
+def delete_report(report_id: str, catalog: ReportCatalog = report_catalog) -> bool:
+    """Delete a report, its metadata sidecar and its catalog entry.
+
+    Returns:
+        Whether the report was in the catalog
+    """
+    entry = catalog.get(report_id)
+    if entry is None:
+        return False
+    path = Path(entry["path"])
+    path.unlink(missing_ok=True)
+    reports_directory = path.parent.parent if _parse_suffix(path) else path.parent
+    metadata_path(report_id, reports_directory).unlink(missing_ok=True)
+    catalog.remove(report_id)
+    return True
+
+def _stored_bytes(path: str | Path) -> int:
+    try:
+        return Path(path).stat().st_size
+    except FileNotFoundError:
+        return 0
+
+def apply_retention(
+    archive_after: Optional[float] = None,
+    delete_after: Optional[float] = None,
+    max_reports: Optional[int] = None,
+    catalog: ReportCatalog = report_catalog,
+    now: Optional[float] = None,
+) -> RetentionResult:
+    """Archive cold reports and delete expired ones.
+
+    Arguments left as None fall back to archive_after_days, delete_after_days
+    and max_stored_reports.
+
+    Args:
+        archive_after: Days without a save after which a report is compressed
+        delete_after: Days without a save after which a report is deleted
+        max_reports: Most reports to keep, deleting the oldest beyond it
+        catalog: Catalog of the reports to manage
+        now: Current time (for testing)
+
+    Returns:
+        Reports archived and deleted, and the stored size before and after
+    """
+    archive_after = archive_after_days if archive_after is None else archive_after
+    delete_after = delete_after_days if delete_after is None else delete_after
+    max_reports = max_stored_reports if max_reports is None else max_reports
+    now = time.time() if now is None else now
+
+    # Only the reports the policy applies to are read from the catalog
+    expired = catalog.saved_before(now - delete_after * 86400) if delete_after is not None else []
+    if max_reports is not None:
+        expired += catalog.saved_before(float("inf"), limit=max(0, catalog.count() - max_reports))
+
+    deleted, bytes_freed = [], 0
+    for entry in expired:
+        size = _stored_bytes(entry["path"])
+        if delete_report(entry["report_id"], catalog):
+            deleted.append(entry["report_id"])
+            bytes_freed += size
+
+    # Reports already archived are not listed again, so a pass only touches cold plain reports
+    archived = []
+    for entry in catalog.saved_before(now - archive_after * 86400, archived=False):
+        size = _stored_bytes(entry["path"])
+        target = archive_report(entry["report_id"], catalog)
+        if target is not None:
+            archived.append(entry["report_id"])
+            bytes_freed += size - _stored_bytes(target)
+
+    return RetentionResult(archived=archived, deleted=deleted, bytes_freed=bytes_freed)
+
+# ===== STATS =====
+
+def archive_stats(catalog: ReportCatalog = report_catalog) -> ArchiveStats:
+    """Get the space saved by compression and the latency of recent report loads."""
+    entries = catalog.saved_before(float("inf"))
+    archived = [entry for entry in entries if _parse_suffix(Path(entry["path"])) is not None]
+    original_bytes = sum(entry["bytes"] for entry in entries)
+    stored_bytes = sum(_stored_bytes(entry["path"]) for entry in entries)
+
+    with _load_latencies_lock:
+        latencies_ms = sorted(seconds * 1000 for seconds in _load_latencies)
+
+    return ArchiveStats(
+        reports=len(entries),
+        archived_reports=len(archived),
+        original_bytes=original_bytes,
+        stored_bytes=stored_bytes,
+        bytes_saved=original_bytes - stored_bytes,
+        compression_ratio=round(original_bytes / stored_bytes, 3) if stored_bytes else 1.0,
+        loads=len(latencies_ms),
+        mean_load_ms=round(statistics.fmean(latencies_ms), 3) if latencies_ms else None,
+        p95_load_ms=round(latencies_ms[int(0.95 * (len(latencies_ms) - 1))], 3) if latencies_ms else None,
+    )
+
+# ===== CLI =====
+
+def main() -> None:
+    """Apply the retention policy to the report catalog and print the result and archive stats."""
+    parser = argparse.ArgumentParser(description="Archive cold research reports and delete expired ones.")
+    parser.add_argument("--archive-after-days", type=float, default=None, help="Compress reports not saved for this many days")
+    parser.add_argument("--delete-after-days", type=float, default=None, help="Delete reports not saved for this many days")
+    parser.add_argument("--max-reports", type=int, default=None, help="Keep at most this many reports")
+    parser.add_argument("--stats", action="store_true", help="Only print archive stats")
+    args = parser.parse_args()
+
+    if not args.stats:
+        result = apply_retention(args.archive_after_days, args.delete_after_days, args.max_reports)
+        print(json.dumps(result, indent=2))  # noqa: T201
+    print(json.dumps(archive_stats(), indent=2))  # noqa: T201
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""Catalog of Saved Research Reports.
+
+A SQLite index over the reports in the files directory, updated whenever a
+report is saved. It answers the lookups that would otherwise mean listing
+and stat-ing every report:
+- the latest report (an index seek, however many reports are stored)
+- a report by id, by research brief or by tag
+- full-text search over briefs and report text (SQLite FTS5)
+
+Reports saved before the catalog existed, or written by a process that
+bypasses save_report, are picked up by rebuild(), which lists every report
+and so is never run on the lookup path (load_report only runs it once, while
+the catalog is still empty). Run it explicitly after such writes:
+
+    python -m deep_research_from_scratch.report_catalog rebuild
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing_extensions import Iterable, Iterator, List, Optional, TypedDict
+
+from deep_research_from_scratch.report_store import ReportMetadata, reports_dir
+
+# ===== CONFIGURATION =====
+
+# SQLite database holding the catalog
+report_catalog_path = reports_dir / ".report_catalog.sqlite"
+
+# Default number of results returned by search()
+default_search_limit = 10
+
+# ===== SCHEMAS =====
+
+class CatalogEntry(TypedDict):
+    """A report as recorded in the catalog."""
+    report_id: str
+    path: str
+    research_brief: str
+    created_at: float
+    last_saved_at: float
+    save_count: int
+    chars: int
+    bytes: int
+    input_tokens: Optional[int]
+    output_tokens: Optional[int]
+    tags: List[str]
+
+class SearchResult(TypedDict):
+    """A report matching a full-text search, with the matching passage."""
+    entry: CatalogEntry
+    snippet: str
+
+# ===== CATALOG =====
+
+_ENTRY_COLUMNS = "report_id, path, research_brief, created_at, last_saved_at, save_count, chars, bytes, input_tokens, output_tokens"
+
+class ReportCatalog:
+    """SQLite index of saved reports."""
+
+    def __init__(self, path: Path = report_catalog_path):
+        self.path = Path(path)
+        self._schema_ready = False
+
+    @contextmanager
+    def connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection to the catalog, creating the schema if needed."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            if not self._schema_ready:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(
+                    """CREATE TABLE IF NOT EXISTS reports (
+                        report_id TEXT PRIMARY KEY,
+                        path TEXT NOT NULL,
+                        research_brief TEXT NOT NULL,
+                        created_at REAL NOT NULL,
+                        last_saved_at REAL NOT NULL,
+                        save_count INTEGER NOT NULL,
+                        chars INTEGER NOT NULL,
+                        bytes INTEGER NOT NULL,
+                        input_tokens INTEGER,
+                        output_tokens INTEGER,
+                        archived INTEGER NOT NULL DEFAULT 0
+                    );
+                    CREATE INDEX IF NOT EXISTS reports_last_saved ON reports (last_saved_at);
+                    CREATE INDEX IF NOT EXISTS reports_brief ON reports (research_brief);
+                    CREATE TABLE IF NOT EXISTS report_tags (
+                        tag TEXT NOT NULL,
+                        report_id TEXT NOT NULL,
+                        PRIMARY KEY (tag, report_id)
+                    );
+                    CREATE VIRTUAL TABLE IF NOT EXISTS reports_fts USING fts5(
+                        report_id UNINDEXED, research_brief, content
+                    );"""
+                )
+                if "archived" not in {row[1] for row in conn.execute("PRAGMA table_info(reports)")}:
+                    # Catalogs created before archiving: archived reports are the compressed files
+                    conn.execute("ALTER TABLE reports ADD COLUMN archived INTEGER NOT NULL DEFAULT 0")
+                    conn.execute("UPDATE reports SET archived = 1 WHERE path LIKE '%.zst' OR path LIKE '%.zz'")
+                conn.execute("CREATE INDEX IF NOT EXISTS reports_archived_last_saved ON reports (archived, last_saved_at)")
+                self._schema_ready = True
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # ----- Updating -----
+
+    def record(self, metadata: ReportMetadata, report: str, path: Path, tags: Iterable[str] = ()) -> Optional[str]:
+        """Add a saved report to the catalog, or refresh its entry if it is already there.
+
+        Args:
+            metadata: Metadata written by save_report
+            report: Text of the report, for full-text search
+            path: Where the report is stored
+            tags: Tags to attach to the report (added to any it already has)
+
+        Returns:
+            The path the report was previously catalogued under, if it was a
+            different file (e.g. an archived copy the new save supersedes)
+        """
+        usage = metadata.get("usage") or {}
+        with self.connect() as conn:
+            previous = conn.execute("SELECT path FROM reports WHERE report_id = ?", (metadata["report_id"],)).fetchone()
+            conn.execute(
+                f"""INSERT INTO reports ({_ENTRY_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (report_id) DO UPDATE SET
+                    path = excluded.path,
+                    archived = 0,
+                    research_brief = excluded.research_brief,
+                    last_saved_at = excluded.last_saved_at,
+                    save_count = excluded.save_count,
+                    input_tokens = excluded.input_tokens,
+                    output_tokens = excluded.output_tokens""",
+                (
+                    metadata["report_id"], str(path), metadata["research_brief"],
+                    metadata["created_at"], metadata["last_saved_at"], metadata["save_count"],
+                    metadata["chars"], metadata["bytes"],
+                    usage.get("input_tokens"), usage.get("output_tokens"),
+                )
+            )
+            conn.execute("DELETE FROM reports_fts WHERE report_id = ?", (metadata["report_id"],))
+            conn.execute(
+                "INSERT INTO reports_fts (report_id, research_brief, content) VALUES (?, ?, ?)",
+                (metadata["report_id"], metadata["research_brief"], report)
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO report_tags (tag, report_id) VALUES (?, ?)",
+                [(tag, metadata["report_id"]) for tag in tags]
+            )
+        return previous[0] if previous and previous[0] != str(path) else None
+
+    def remove(self, report_id: str) -> None:
+        """Drop a report from the catalog (the report file itself is left alone)."""
+        with self.connect() as conn:
+            conn.execute("DELETE FROM reports WHERE report_id = ?", (report_id,))
+            conn.execute("DELETE FROM report_tags WHERE report_id = ?", (report_id,))
+            conn.execute("DELETE FROM reports_fts WHERE report_id = ?", (report_id,))
+
+    def set_path(self, report_id: str, path: Path, archived: bool = False) -> None:
+        """Record that a report's file has moved (e.g. to its compressed copy when archived)."""
+        with self.connect() as conn:
+            conn.execute("UPDATE reports SET path = ?, archived = ? WHERE report_id = ?", (str(path), int(archived), report_id))
+
+    def rebuild(self, directory: Path = reports_dir) -> int:
+        """Catalog every report in a directory that is not catalogued yet.
+
+        Reports with a metadata sidecar are recorded from it; older reports
+        without one are recorded under their file name, dated by their mtime.
+
+        Returns:
+            Number of reports added
+        """
+        directory = Path(directory)
+        if not directory.exists():
+            return 0
+        with self.connect() as conn:
+            known = {row[0] for row in conn.execute("SELECT path FROM reports")}
+
+        added = 0
+        for path in directory.glob("*.md"):
+            if str(path) in known:
+                continue
+            report = path.read_text(encoding="utf-8")
+            try:
+                metadata = json.loads(path.with_suffix(".meta.json").read_text(encoding="utf-8"))
+            except (FileNotFoundError, json.JSONDecodeError):
+                mtime = path.stat().st_mtime
+                data = report.encode("utf-8")
+                metadata = ReportMetadata(
+                    report_id=path.stem,
+                    filename=path.name,
+                    sha256=hashlib.sha256(data).hexdigest(),
+                    research_brief="",
+                    created_at=mtime,
+                    last_saved_at=mtime,
+                    save_count=1,
+                    chars=len(report),
+                    bytes=len(data),
+                    usage=None,
+                )
+            self.record(metadata, report, path)
+            added += 1
+        return added
+
+    # ----- Lookups -----
+
+    def _entries(self, conn: sqlite3.Connection, rows: list[tuple]) -> List[CatalogEntry]:
+        entries = []
+        for row in rows:
+            entry = CatalogEntry(**dict(zip(_ENTRY_COLUMNS.split(", "), row)), tags=[])
+            entry["tags"] = [tag for (tag,) in conn.execute(
+                "SELECT tag FROM report_tags WHERE report_id = ? ORDER BY tag", (entry["report_id"],)
+            )]
+            entries.append(entry)
+        return entries
+
+    def get(self, report_id: str) -> Optional[CatalogEntry]:
+        """Get a report's entry by id."""
+        with self.connect() as conn:
+            rows = conn.execute(f"SELECT {_ENTRY_COLUMNS} FROM reports WHERE report_id = ?", (report_id,)).fetchall()
+            entries = self._entries(conn, rows)
+        return entries[0] if entries else None
+
+    def latest(self) -> Optional[CatalogEntry]:
+        """Get the most recently saved report whose file still exists.
+
+        Entries whose file has been deleted outside the catalog are dropped
+        on the way.
+        """
+        while True:
+            with self.connect() as conn:
+                rows = conn.execute(
+                    f"SELECT {_ENTRY_COLUMNS} FROM reports ORDER BY last_saved_at DESC LIMIT 1"
+                ).fetchall()
+                entries = self._entries(conn, rows)
+            if not entries:
+                return None
+            if Path(entries[0]["path"]).exists():
+                return entries[0]
+            self.remove(entries[0]["report_id"])
+
+    def saved_before(
+        self,
+        timestamp: float,
+        limit: Optional[int] = None,
+        archived: Optional[bool] = None
+    ) -> List[CatalogEntry]:
+        """Get the reports last saved before a time, oldest first (at most limit of them).
+
+        Args:
+            timestamp: Reports last saved at or after this time are left out
+            limit: Maximum number of reports
+            archived: Only archived reports if True, only plain ones if False
+        """
+        archived_filter = "" if archived is None else f"AND archived = {int(archived)}"
+        with self.connect() as conn:
+            rows = conn.execute(
+                f"SELECT {_ENTRY_COLUMNS} FROM reports WHERE last_saved_at < ? {archived_filter} ORDER BY last_saved_at LIMIT ?",
+                (timestamp, -1 if limit is None else limit)
+            ).fetchall()
+            return self._entries(conn, rows)
+
+    def count(self) -> int:
+        """Get the number of catalogued reports."""
+        with self.connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+
+    def find_by_brief(self, research_brief: str) -> List[CatalogEntry]:
+        """Get the reports written for a research brief, newest first."""
+        with self.connect() as conn:
+            rows = conn.execute(
+                f"SELECT {_ENTRY_COLUMNS} FROM reports WHERE research_brief = ? ORDER BY last_saved_at DESC",
+                (research_brief,)
+            ).fetchall()
+            return self._entries(conn, rows)
+
+    def find_by_tag(self, tag: str) -> List[CatalogEntry]:
+        """Get the reports carrying a tag, newest first."""
+        with self.connect() as conn:
+            rows = conn.execute(
+                f"""SELECT {', '.join('r.' + column for column in _ENTRY_COLUMNS.split(', '))}
+                FROM report_tags t JOIN reports r ON r.report_id = t.report_id
+                WHERE t.tag = ? ORDER BY r.last_saved_at DESC""",
+                (tag,)
+            ).fetchall()
+            return self._entries(conn, rows)
+
+    def search(self, query: str, limit: int = default_search_limit) -> List[SearchResult]:
+        """Full-text search over report briefs and contents, best matches first.
+
+        Args:
+            query: Words to search for; every word must appear in the report
+            limit: Maximum number of results
+
+        Returns:
+            Matching reports with a snippet of the matching text
+        """
+        # Quote each word so user input is never parsed as FTS5 query syntax
+        match = " ".join('"' + word.replace('"', '""') + '"' for word in query.split())
+        if not match:
+            return []
+        with self.connect() as conn:
+            matches = conn.execute(
+                """SELECT report_id, snippet(reports_fts, 2, '[', ']', '...', 16)
+                FROM reports_fts WHERE reports_fts MATCH ? ORDER BY rank LIMIT ?""",
+                (match, limit)
+            ).fetchall()
+            results = []
+            for report_id, snippet in matches:
+                rows = conn.execute(f"SELECT {_ENTRY_COLUMNS} FROM reports WHERE report_id = ?", (report_id,)).fetchall()
+                for entry in self._entries(conn, rows):
+                    results.append(SearchResult(entry=entry, snippet=snippet))
+        return results
+
+# Catalog of the package's files directory
+report_catalog = ReportCatalog()
+
+# ===== CLI =====
+
+def main() -> None:
+    """Catalog reports written without save_report and print how many were added."""
+    parser = argparse.ArgumentParser(description="Maintain the catalog of saved research reports.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    rebuild_parser = subparsers.add_parser("rebuild", help="catalog every report not catalogued yet")
+    rebuild_parser.add_argument("--directory", type=Path, default=reports_dir, help="Directory holding the reports")
+    args = parser.parse_args()
+
+    added = report_catalog.rebuild(args.directory)
+    print(f"Added {added} reports; {report_catalog.count()} catalogued")  # noqa: T201
+
+if __name__ == "__main__":
+    main()
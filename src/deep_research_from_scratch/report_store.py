@@ -0,0 +1,234 @@
+"""Storage of Generated Research Reports.
+
+Reports are written to the package's files directory. While the final
+report is being generated, its tokens are appended to a draft file so that
+partial output is on disk within seconds; once the report is complete the
+draft is atomically renamed to its final name, so readers never see a
+half-written report.
+
+Saved reports are content-addressed: a report is stored as
+report_<hash>.md, named by the SHA-256 of its text, so saving the same
+report twice keeps a single copy. Next to each report a
+report_<hash>.meta.json sidecar records the research brief, when the report
+was first and last saved, its size and the tokens spent writing it. All
+file I/O runs off the event loop.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+from typing_extensions import Optional, TypedDict
+
+# ===== CONFIGURATION =====
+
+# Directory holding generated reports
+reports_dir = Path(__file__).resolve().parent / "files"
+
+# Buffered draft text is written to disk once it reaches this many characters
+draft_flush_chars = 2048
+
+# Number of hex digits of the content hash used in report file names
+report_id_chars = 16
+
+# ===== SCHEMAS =====
+
+class ReportUsage(TypedDict):
+    """Tokens spent generating a report (estimated when the model reports no usage)."""
+    input_tokens: int
+    output_tokens: int
+    estimated: bool
+
+class ReportMetadata(TypedDict):
+    """Contents of a saved report's metadata sidecar."""
+    report_id: str
+    filename: str
+    sha256: str
+    research_brief: str
+    created_at: float
+    last_saved_at: float
+    save_count: int
+    chars: int
+    bytes: int
+    usage: Optional[ReportUsage]
+
+# ===== DRAFTS =====
+
+class ReportDraft:
+    """A report being written incrementally to a temporary file.
+
+    Writes happen off the event loop. The draft lives next to the final
+    reports so that commit() is an atomic rename on the same filesystem.
+    """
+
+    def __init__(self, path: Path, flush_chars: int = draft_flush_chars):
+        self.path = Path(path)
+        self.flush_chars = flush_chars
+        self._pending: list[str] = []
+        self._pending_chars = 0
+
+    @classmethod
+    async def create(cls, directory: Path = reports_dir) -> "ReportDraft":
+        """Create an empty draft file in the reports directory."""
+        directory = Path(directory)
+        path = directory / f".report_{uuid.uuid4()}.md.part"
+
+        def create_file() -> None:
+            directory.mkdir(parents=True, exist_ok=True)
+            path.touch()
+
+        await asyncio.to_thread(create_file)
+        return cls(path)
+
+    async def append(self, text: str) -> None:
+        """Add text to the draft, writing it out once enough has accumulated."""
+        if not text:
+            return
+        self._pending.append(text)
+        self._pending_chars += len(text)
+        if self._pending_chars >= self.flush_chars:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Write all buffered text to the draft file."""
+        if not self._pending:
+            return
+        text = "".join(self._pending)
+        self._pending, self._pending_chars = [], 0
+
+        def write() -> None:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(text)
+
+        await asyncio.to_thread(write)
+
+    async def discard(self) -> None:
+        """Delete the draft file."""
+        self._pending, self._pending_chars = [], 0
+        await asyncio.to_thread(self.path.unlink, True)
+
+async def commit_report_draft(draft_path: str | Path, final_path: str | Path) -> Optional[Path]:
+    """Atomically move a finished draft to its final location.
+
+    Args:
+        draft_path: Path of a draft written by ReportDraft
+        final_path: Where the finished report should live
+
+    Returns:
+        The final path, or None if the draft no longer exists
+    """
+    draft_path, final_path = Path(draft_path), Path(final_path)
+
+    def commit() -> Optional[Path]:
+        if not draft_path.exists():
+            return None
+        with open(draft_path, "rb+") as f:
+            os.fsync(f.fileno())
+        os.replace(draft_path, final_path)
+        return final_path
+
+    return await asyncio.to_thread(commit)
+
+# ===== SAVED REPORTS =====
+
+def report_id_for(report: str) -> str:
+    """Get the content-addressed id of a report's text."""
+    return hashlib.sha256(report.encode("utf-8")).hexdigest()[:report_id_chars]
+
+def report_path(report_id: str, directory: Path = reports_dir) -> Path:
+    """Get the path of the saved report with the given id."""
+    return Path(directory) / f"report_{report_id}.md"
+
+def metadata_path(report_id: str, directory: Path = reports_dir) -> Path:
+    """Get the path of the metadata sidecar of the saved report with the given id."""
+    return Path(directory) / f"report_{report_id}.meta.json"
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Write a file through a temporary file and a rename, so it is never seen half-written."""
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.part")
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+def read_report_metadata(report_id: str, directory: Path = reports_dir) -> Optional[ReportMetadata]:
+    """Read a saved report's metadata sidecar, or None if it has none."""
+    try:
+        return json.loads(metadata_path(report_id, directory).read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+async def save_report(
+    report: str,
+    research_brief: str = "",
+    draft_path: Optional[str | Path] = None,
+    usage: Optional[ReportUsage] = None,
+    directory: Path = reports_dir,
+) -> ReportMetadata:
+    """Save a finished report under its content hash, with a metadata sidecar.
+
+    When a report with the same text is already stored, the new copy is
+    dropped and only the existing report's last-saved time and save count
+    are updated (its mtime is touched so it still counts as the latest).
+
+    Args:
+        report: Text of the report
+        research_brief: Brief the report answers
+        draft_path: Draft the report was streamed to; it is renamed into
+            place (or discarded if the report is already stored)
+        usage: Tokens spent generating the report
+        directory: Directory holding saved reports
+
+    Returns:
+        Metadata of the saved report
+    """
+    directory = Path(directory)
+    data = report.encode("utf-8")
+    report_id = report_id_for(report)
+    final_path = report_path(report_id, directory)
+
+    def save() -> ReportMetadata:
+        directory.mkdir(parents=True, exist_ok=True)
+        now = time.time()
+        draft = Path(draft_path) if draft_path else None
+
+        if final_path.exists():
+            # Already stored: keep the existing copy
+            if draft is not None:
+                draft.unlink(missing_ok=True)
+            os.utime(final_path)
+        elif draft is not None and draft.exists() and draft.stat().st_size == len(data):
+            with open(draft, "rb+") as f:
+                os.fsync(f.fileno())
+            os.replace(draft, final_path)
+        else:
+            write_atomic(final_path, data)
+            if draft is not None:
+                draft.unlink(missing_ok=True)
+
+        previous = read_report_metadata(report_id, directory)
+        metadata = ReportMetadata(
+            report_id=report_id,
+            filename=final_path.name,
+            sha256=hashlib.sha256(data).hexdigest(),
+            research_brief=research_brief or (previous or {}).get("research_brief", ""),
+            created_at=previous["created_at"] if previous else now,
+            last_saved_at=now,
+            save_count=previous["save_count"] + 1 if previous else 1,
+            chars=len(report),
+            bytes=len(data),
+            usage=usage if usage is not None else (previous or {}).get("usage"),
+        )
+        write_atomic(metadata_path(report_id, directory), json.dumps(metadata, indent=2).encode("utf-8"))
+        return metadata
+
+    return await asyncio.to_thread(save)
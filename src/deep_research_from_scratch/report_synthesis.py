@@ -0,0 +1,177 @@
+"""Hierarchical Map-Reduce Synthesis of Research Findings.
+
+Joining every research note into one report prompt works for small runs,
+but large runs exceed the writer's context window or take very long. Above
+a findings size threshold, notes are instead:
+1. Clustered by topic, with each cluster kept under a token budget
+2. Drafted into report sections in parallel, with bounded concurrency
+3. Merged by the final report pass, which sees only the section drafts
+
+If the section drafts are themselves still too large, they are clustered
+and drafted again, so the final prompt stays bounded.
+"""
+
+import asyncio
+
+import numpy as np
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.constants import TAG_NOSTREAM
+
+from deep_research_from_scratch.fair_scheduler import atask_slot
+from deep_research_from_scratch.prompts import section_draft_prompt
+from deep_research_from_scratch.similarity import cosine_similarities, embed_text
+from deep_research_from_scratch.utils import get_today_str
+
+# ===== CONFIGURATION =====
+
+# Findings larger than this (in estimated tokens) are synthesized with map-reduce
+# (override per run with configurable.map_reduce_threshold_tokens)
+map_reduce_threshold_tokens = 60_000
+
+# Maximum estimated tokens of findings in a single section draft prompt
+max_section_tokens = 20_000
+
+# Maximum section drafts written at the same time
+max_section_writers = 4
+
+# Minimum cosine similarity for a note to join an existing topic cluster
+cluster_similarity_threshold = 0.3
+
+# Maximum rounds of drafting before the final pass
+max_synthesis_rounds = 3
+
+# Rough characters per token used to estimate prompt sizes
+chars_per_token = 4
+
+# ===== CLUSTERING =====
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in a text."""
+    return len(text) // chars_per_token + 1
+
+def cluster_notes(notes: list[str], max_tokens: int = max_section_tokens) -> list[list[str]]:
+    """Group notes by topic into clusters that each fit a token budget.
+
+    Each note joins the most similar cluster that still has room for it, or
+    starts a new cluster when no cluster is similar enough. Notes larger than
+    the budget on their own are truncated.
+
+    Args:
+        notes: Research notes in the order they were gathered
+        max_tokens: Maximum estimated tokens per cluster
+
+    Returns:
+        Clusters of notes, in order of each cluster's first note
+    """
+    max_chars = max_tokens * chars_per_token
+    clusters: list[list[str]] = []
+    sizes: list[int] = []
+    centroids: list[np.ndarray] = []
+
+    for note in notes:
+        if len(note) > max_chars:
+            note = note[:max_chars] + "\n\n[Truncated]"
+        tokens = estimate_tokens(note)
+        embedding = embed_text(note)
+
+        best = None
+        if centroids:
+            scores = cosine_similarities(embedding, np.stack(centroids))
+            for idx in np.argsort(-scores):
+                if scores[idx] < cluster_similarity_threshold:
+                    break
+                if sizes[idx] + tokens <= max_tokens:
+                    best = int(idx)
+                    break
+
+        if best is None:
+            clusters.append([note])
+            sizes.append(tokens)
+            centroids.append(embedding)
+        else:
+            clusters[best].append(note)
+            sizes[best] += tokens
+            centroid = centroids[best] * (len(clusters[best]) - 1) + embedding
+            norm = np.linalg.norm(centroid)
+            centroids[best] = centroid / norm if norm > 0 else centroid
+
+    return clusters
+
+# ===== SYNTHESIS =====
+
+async def draft_sections(
+    clusters: list[list[str]],
+    research_brief: str,
+    model: BaseChatModel,
+    config: RunnableConfig,
+    max_concurrency: int = max_section_writers
+) -> list[str]:
+    """Write a report section draft for each cluster of notes, in parallel.
+
+    Args:
+        clusters: Clusters of research notes
+        research_brief: Research brief the report answers
+        model: Model that writes the drafts
+        config: Run configuration
+        max_concurrency: Maximum drafts written at the same time
+
+    Returns:
+        One draft per cluster, in cluster order
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def draft(notes: list[str]) -> str:
+        prompt = section_draft_prompt.format(
+            research_brief=research_brief,
+            findings="\n".join(notes),
+            date=get_today_str()
+        )
+        # Tagged nostream so parallel drafts stay out of stream_mode="messages"
+        async with semaphore, atask_slot("model", config):
+            response = await model.with_config(tags=[TAG_NOSTREAM]).ainvoke([HumanMessage(content=prompt)])
+        return response.text
+
+    return list(await asyncio.gather(*(draft(notes) for notes in clusters)))
+
+def get_map_reduce_threshold(config: RunnableConfig) -> int:
+    """Get the findings size above which a run uses map-reduce synthesis."""
+    return int(config.get("configurable", {}).get("map_reduce_threshold_tokens", map_reduce_threshold_tokens))
+
+async def synthesize_findings(
+    notes: list[str],
+    research_brief: str,
+    model: BaseChatModel,
+    config: RunnableConfig
+) -> str:
+    """Prepare research notes as findings for the final report prompt.
+
+    Small note sets are joined as-is. Above the map-reduce threshold, notes
+    are clustered and drafted into sections, round after round, until the
+    drafts fit under the threshold. Findings still too large after
+    max_synthesis_rounds are truncated to the threshold.
+
+    Args:
+        notes: Research notes gathered by the supervisor
+        research_brief: Research brief the report answers
+        model: Model that writes the section drafts
+        config: Run configuration; configurable.map_reduce_threshold_tokens
+            overrides the threshold
+
+    Returns:
+        Findings text for the final report prompt
+    """
+    threshold = get_map_reduce_threshold(config)
+    findings = "\n".join(notes)
+
+    for _ in range(max_synthesis_rounds):
+        if estimate_tokens(findings) <= threshold:
+            return findings
+        clusters = cluster_notes(notes, min(max_section_tokens, threshold))
+        notes = await draft_sections(clusters, research_brief, model, config)
+        findings = "\n\n".join(notes)
+
+    if estimate_tokens(findings) > threshold:
+        findings = findings[:threshold * chars_per_token] + "\n\n[Truncated]"
+    return findings
@@ -0,0 +1,326 @@
+"""Final Report Writing.
+
+Short reports are written in a single streamed model call. Long reports are
+written outline-first, so their latency no longer grows with their length:
+1. A quick outline call plans the title and sections, and picks the notes
+   each section draws on
+2. Every section is written concurrently, from its own notes only
+3. The sections are assembled in outline order
+
+Either way the writer cites sources by their stable IDs from the citation
+index merged from the notes, and the final report gets numbered citations
+and a Sources section rendered from that index, so the model never
+deduplicates or numbers sources itself. The generated text (still citing by
+ID) is handed to an optional callback in reading order, so it can be
+streamed to a draft file.
+"""
+
+import asyncio
+import re
+
+import numpy as np
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.constants import TAG_NOSTREAM
+from typing_extensions import Awaitable, Callable, Optional
+
+from deep_research_from_scratch.citation_index import format_source_catalog, prepare_findings
+from deep_research_from_scratch.fair_scheduler import atask_slot
+from deep_research_from_scratch.prompts import final_report_generation_prompt, report_outline_prompt, report_section_prompt
+from deep_research_from_scratch.report_store import ReportUsage
+from deep_research_from_scratch.report_synthesis import (
+    chars_per_token,
+    estimate_tokens,
+    max_section_tokens,
+    max_section_writers,
+    synthesize_findings,
+)
+from deep_research_from_scratch.similarity import cosine_similarities, embed_text
+from deep_research_from_scratch.state_scope import ReportOutline
+from deep_research_from_scratch.utils import get_today_str
+
+# ===== CONFIGURATION =====
+
+# Findings larger than this (in estimated tokens) are written outline-first,
+# with sections in parallel (override per run with configurable.outline_writer_threshold_tokens)
+outline_writer_threshold_tokens = 8_000
+
+# Maximum number of sections in an outline
+max_outline_sections = 8
+
+# Characters of each note shown to the outline call
+outline_note_digest_chars = 400
+
+# Notes given to a section the outline assigned no notes to, chosen by similarity
+fallback_notes_per_section = 3
+
+TextCallback = Callable[[str], Awaitable[None]]
+
+_SOURCES_LIST_RE = re.compile(r"(?:\A|\n)[ \t]*(?:#{1,6}[ \t]*)?\**Sources:?\**[ \t]*\n.*\Z", re.DOTALL | re.IGNORECASE)
+
+# ===== USAGE =====
+
+def usage_of(messages: list[Optional[AIMessage]], prompts: list[str]) -> ReportUsage:
+    """Add up the token usage of model responses, estimating it if any response reports none."""
+    usages = [getattr(message, "usage_metadata", None) for message in messages]
+    if all(usages):
+        return ReportUsage(
+            input_tokens=sum(usage.get("input_tokens", 0) for usage in usages),
+            output_tokens=sum(usage.get("output_tokens", 0) for usage in usages),
+            estimated=False
+        )
+    return ReportUsage(
+        input_tokens=sum(estimate_tokens(prompt) for prompt in prompts),
+        output_tokens=sum(estimate_tokens(message.text) for message in messages if message is not None),
+        estimated=True
+    )
+
+# ===== SINGLE-PASS WRITING =====
+
+async def write_report_single_pass(
+    notes: list[str],
+    research_brief: str,
+    model: BaseChatModel,
+    config: RunnableConfig,
+    source_catalog: str = "",
+    on_text: Optional[TextCallback] = None
+) -> tuple[str, ReportUsage]:
+    """Write the report in one streamed model call.
+
+    Large note sets are first drafted into sections (map-reduce) to keep the
+    prompt bounded. Tokens are streamed, so callers see them with
+    stream_mode="messages".
+
+    Args:
+        notes: Research notes gathered by the supervisor, without their source index blocks
+        research_brief: Research brief the report answers
+        model: Model that writes the report
+        config: Run configuration
+        source_catalog: IDs and titles of the sources the report may cite
+        on_text: Called with each piece of report text as it is generated
+
+    Returns:
+        The report, citing sources by ID, and the tokens spent writing it
+    """
+    findings = await synthesize_findings(notes, research_brief, model, config)
+    prompt = final_report_generation_prompt.format(
+        research_brief=research_brief,
+        findings=findings + source_catalog,
+        date=get_today_str()
+    )
+
+    report = None
+    async with atask_slot("model", config):
+        async for chunk in model.astream([HumanMessage(content=prompt)]):
+            report = chunk if report is None else report + chunk
+            if on_text is not None:
+                await on_text(chunk.text)
+    return (report.text if report is not None else ""), usage_of([report], [prompt])
+
+# ===== OUTLINE-FIRST WRITING =====
+
+async def write_outline(
+    notes: list[str],
+    research_brief: str,
+    model: BaseChatModel,
+    config: RunnableConfig
+) -> tuple[Optional[ReportOutline], Optional[AIMessage], str]:
+    """Plan the report's sections from short digests of the notes.
+
+    Returns:
+        The outline (None if the model did not produce a usable one), the
+        raw model response and the prompt
+    """
+    digests = "\n\n".join(
+        f"[{number}] {note[:outline_note_digest_chars]}" for number, note in enumerate(notes, 1)
+    )
+    prompt = report_outline_prompt.format(
+        research_brief=research_brief,
+        notes=digests,
+        max_sections=max_outline_sections,
+        date=get_today_str()
+    )
+    outline_model = model.with_structured_output(ReportOutline, include_raw=True).with_config(tags=[TAG_NOSTREAM])
+    async with atask_slot("model", config):
+        response = await outline_model.ainvoke([HumanMessage(content=prompt)])
+
+    outline = response.get("parsed")
+    if outline is not None:
+        outline.sections = [section for section in outline.sections if section.title.strip()][:max_outline_sections]
+        if not outline.sections:
+            outline = None
+    return outline, response.get("raw"), prompt
+
+def assign_notes(outline: ReportOutline, notes: list[str]) -> list[list[str]]:
+    """Get the notes each section of an outline is written from.
+
+    Sections use the notes the outline picked for them; a section with no
+    valid picks gets the notes most similar to its description. Notes no
+    section picked are given to the most similar section, so no findings
+    are lost. Each section's notes are kept under max_section_tokens.
+
+    Returns:
+        The notes of each section, in outline order
+    """
+    section_embeddings = np.stack([
+        embed_text(f"{section.title}\n{section.description}") for section in outline.sections
+    ])
+    note_embeddings = np.stack([embed_text(note) for note in notes])
+
+    assigned: list[list[int]] = []
+    for index, section in enumerate(outline.sections):
+        picks = list(dict.fromkeys(number - 1 for number in section.note_ids if 1 <= number <= len(notes)))
+        if not picks:
+            scores = cosine_similarities(section_embeddings[index], note_embeddings)
+            picks = [int(i) for i in np.argsort(-scores)[:fallback_notes_per_section]]
+        assigned.append(picks)
+
+    used = {i for picks in assigned for i in picks}
+    for i in range(len(notes)):
+        if i not in used:
+            scores = cosine_similarities(note_embeddings[i], section_embeddings)
+            assigned[int(np.argmax(scores))].append(i)
+
+    max_chars = max_section_tokens * chars_per_token
+    section_notes = []
+    for picks in assigned:
+        findings, size = [], 0
+        for i in sorted(picks):
+            note = notes[i][:max(0, max_chars - size)]
+            if note:
+                findings.append(note)
+                size += len(note)
+        section_notes.append(findings)
+    return section_notes
+
+def _title_text(outline: ReportOutline) -> str:
+    return f"# {outline.title.strip()}\n\n"
+
+def _section_text(title: str, text: str) -> str:
+    return f"## {title.strip()}\n\n{text.strip()}\n\n"
+
+def strip_sources_list(section: str) -> str:
+    """Drop a trailing Sources list that a section writer added despite instructions."""
+    return _SOURCES_LIST_RE.sub("", section)
+
+def assemble_report(outline: ReportOutline, sections: list[str]) -> str:
+    """Join written sections in outline order."""
+    return _title_text(outline) + "".join(
+        _section_text(section.title, text) for section, text in zip(outline.sections, sections)
+    )
+
+async def write_report_outline_first(
+    notes: list[str],
+    research_brief: str,
+    model: BaseChatModel,
+    config: RunnableConfig,
+    on_text: Optional[TextCallback] = None
+) -> Optional[tuple[str, ReportUsage]]:
+    """Write the report from an outline, with all sections written concurrently.
+
+    Sections are handed to on_text in outline order as soon as they and all
+    sections before them are written.
+
+    Args:
+        notes: Research notes gathered by the supervisor, without their source index blocks
+        research_brief: Research brief the report answers
+        model: Model that writes the outline and the sections
+        config: Run configuration
+        on_text: Called with each piece of report text once it is final
+
+    Returns:
+        The report, citing sources by ID, and the tokens spent writing it,
+        or None if no usable outline was produced
+    """
+    if not notes:
+        return None
+    outline, outline_response, outline_prompt = await write_outline(notes, research_brief, model, config)
+    if outline is None:
+        return None
+
+    section_notes = assign_notes(outline, notes)
+    outline_text = "\n".join(f"{number}. {section.title}: {section.description}" for number, section in enumerate(outline.sections, 1))
+    prompts = [
+        report_section_prompt.format(
+            research_brief=research_brief,
+            outline=outline_text,
+            section_title=section.title,
+            section_description=section.description,
+            findings="\n\n".join(findings),
+            date=get_today_str()
+        )
+        for section, findings in zip(outline.sections, section_notes)
+    ]
+
+    semaphore = asyncio.Semaphore(max_section_writers)
+
+    # Sections are written concurrently, so their tokens are kept out of
+    # stream_mode="messages"; the text reaches on_text in reading order instead
+    section_model = model.with_config(tags=[TAG_NOSTREAM])
+
+    async def write_section(prompt: str) -> AIMessage:
+        async with semaphore, atask_slot("model", config):
+            return await section_model.ainvoke([HumanMessage(content=prompt)])
+
+    if on_text is not None:
+        await on_text(_title_text(outline))
+
+    tasks = [asyncio.create_task(write_section(prompt)) for prompt in prompts]
+    try:
+        # Hand sections over in reading order while later ones are still being written
+        responses = []
+        for section, task in zip(outline.sections, tasks):
+            response = await task
+            responses.append(response)
+            if on_text is not None:
+                await on_text(_section_text(section.title, strip_sources_list(response.text)))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+    sections = [strip_sources_list(response.text) for response in responses]
+    usage = usage_of([outline_response, *responses], [outline_prompt, *prompts])
+    return assemble_report(outline, sections), usage
+
+# ===== DISPATCH =====
+
+def get_outline_writer_threshold(config: RunnableConfig) -> int:
+    """Get the findings size above which a run writes its report outline-first."""
+    return int(config.get("configurable", {}).get("outline_writer_threshold_tokens", outline_writer_threshold_tokens))
+
+async def write_report(
+    notes: list[str],
+    research_brief: str,
+    model: BaseChatModel,
+    config: RunnableConfig,
+    on_text: Optional[TextCallback] = None
+) -> tuple[str, ReportUsage]:
+    """Write the final report, outline-first when the findings are large.
+
+    Args:
+        notes: Research notes gathered by the supervisor
+        research_brief: Research brief the report answers
+        model: Model that writes the report
+        config: Run configuration; configurable.outline_writer_threshold_tokens
+            overrides the threshold
+        on_text: Called with each piece of generated text (citing sources by ID), in order
+
+    Returns:
+        The report, with numbered citations and a Sources section, and the
+        tokens spent writing it
+    """
+    # Merge the notes' source indexes; the writer only sees source IDs and titles
+    notes, citation_index = prepare_findings(notes)
+
+    written = None
+    if estimate_tokens("\n".join(notes)) > get_outline_writer_threshold(config):
+        written = await write_report_outline_first(notes, research_brief, model, config, on_text)
+    if written is None:
+        written = await write_report_single_pass(
+            notes, research_brief, model, config, format_source_catalog(citation_index), on_text
+        )
+
+    report, usage = written
+    return citation_index.render_report(report), usage
@@ -11,15 +11,22 @@ from typing_extensions import Literal
 from langgraph.graph import StateGraph, START, END
 from langchain_core.messages import SystemMessage, HumanMessage, ToolMessage, filter_messages
 from langchain.chat_models import init_chat_model
+from langchain_core.runnables import RunnableConfig
 
 from deep_research_from_scratch.state_research import ResearcherState, ResearcherOutputState
-from deep_research_from_scratch.utils import tavily_search, get_today_str, think_tool
+from deep_research_from_scratch.utils import tavily_search, tavily_search_batch, get_today_str, think_tool
+from deep_research_from_scratch.blob_store import put_blob, get_run_id
+from deep_research_from_scratch.budget import get_run_budget
+from deep_research_from_scratch.citation_index import CitationIndex, cited_source_ids
+from deep_research_from_scratch.fair_scheduler import task_slot
+from deep_research_from_scratch.progress import emit_progress, ResearchIteration, ResearchCompressed
+from deep_research_from_scratch.similarity import shingle_all, novelty_score, has_stalled
 from deep_research_from_scratch.prompts import research_agent_prompt, compress_research_system_prompt, compress_research_human_message
 
 # ===== CONFIGURATION =====
 
 # Set up tools and model binding
-tools = [tavily_search, think_tool]
+tools = [tavily_search, tavily_search_batch, think_tool]
 tools_by_name = {tool.name: tool for tool in tools}
 
 # Initialize models
@@ -28,6 +35,19 @@ model_with_tools = model.bind_tools(tools)
 summarization_model = init_chat_model("google_genai:models/gemini-flash-latest")
 compress_model = init_chat_model("google_genai:models/gemini-flash-latest") # model="anthropic:claude-sonnet-4-20250514", max_tokens=64000
 
+# Tools whose outputs are scored for novelty against previously gathered results
+search_tool_names = {tavily_search.name, tavily_search_batch.name}
+
+# Novelty-based early stopping: a search turn whose results are mostly already
+# known scores below novelty_threshold; after novelty_patience such turns in a
+# row the researcher stops searching and compresses what it has
+novelty_threshold = 0.2
+novelty_patience = 2
+
+# Maximum search turns per researcher once the run's budget runs low
+# (by budget level; "exhausted" stops research immediately)
+budget_research_turns = {"reduced": 4, "minimal": 2, "exhausted": 0}
+
 # ===== AGENT NODES =====
 
 def llm_call(state: ResearcherState):
@@ -39,18 +59,17 @@ def llm_call(state: ResearcherState):
 
     Returns updated state with the model's response.
     """
-    return {
-        "researcher_messages": [
-            model_with_tools.invoke(
-                [SystemMessage(content=research_agent_prompt)] + state["researcher_messages"]
-            )
-        ]
-    }
+    with task_slot("model"):
+        response = model_with_tools.invoke(
+            [SystemMessage(content=research_agent_prompt)] + state["researcher_messages"]
+        )
+    return {"researcher_messages": [response]}
 
 def tool_node(state: ResearcherState):
     """Execute all tool calls from the previous LLM response.
 
-    Executes all tool calls from the previous LLM responses.
+    Executes all tool calls from the previous LLM responses and scores how
+    much new information the search results add over earlier searches.
     Returns updated state with tool execution results.
     """
     tool_calls = state["researcher_messages"][-1].tool_calls
@@ -70,30 +89,77 @@ def tool_node(state: ResearcherState):
         ) for observation, tool_call in zip(observations, tool_calls)
     ]
 
-    return {"researcher_messages": tool_outputs}
+    emit_progress(ResearchIteration(
+        event="research_iteration",
+        research_topic=state.get("research_topic", ""),
+        iteration=len(filter_messages(state["researcher_messages"], include_types="ai")),
+        tool_names=[tool_call["name"] for tool_call in tool_calls]
+    ))
+
+    # Score novelty of this turn's search results against earlier search results
+    new_search_output = "\n".join(
+        observation for observation, tool_call in zip(observations, tool_calls)
+        if tool_call["name"] in search_tool_names
+    )
+    if not new_search_output:
+        return {"researcher_messages": tool_outputs}
+
+    seen_shingles = shingle_all(
+        str(m.content) for m in filter_messages(state["researcher_messages"], include_types="tool")
+        if m.name in search_tool_names
+    )
+
+    return {
+        "researcher_messages": tool_outputs,
+        "novelty_scores": [novelty_score(new_search_output, seen_shingles)]
+    }
 
-def compress_research(state: ResearcherState) -> dict:
+def compress_research(state: ResearcherState, config: RunnableConfig) -> dict:
     """Compress research findings into a concise summary.
 
     Takes all the research messages and tool outputs and creates
     a compressed summary suitable for the supervisor's decision-making.
     """
 
+    researcher_messages = list(state.get("researcher_messages", []))
+
+    # Drop tool calls left unanswered when research was stopped early
+    if researcher_messages and researcher_messages[-1].tool_calls:
+        researcher_messages = researcher_messages[:-1]
+
     system_message = compress_research_system_prompt.format(date=get_today_str())
-    messages = [SystemMessage(content=system_message)] + state.get("researcher_messages", []) + [HumanMessage(content=compress_research_human_message)]
-    response = compress_model.invoke(messages)
+    messages = [SystemMessage(content=system_message)] + researcher_messages + [HumanMessage(content=compress_research_human_message)]
+    with task_slot("model", config):
+        response = compress_model.invoke(messages)
 
     # Extract raw notes from tool and AI messages
     raw_notes = [
         str(m.content) for m in filter_messages(
-            state["researcher_messages"], 
+            researcher_messages, 
             include_types=["tool", "ai"]
         )
     ]
 
+    emit_progress(ResearchCompressed(
+        event="research_compressed",
+        research_topic=state.get("research_topic", ""),
+        compressed_chars=len(str(response.content))
+    ))
+
+    # Attach the index of cited sources, built from the search results the researcher saw
+    compressed_research = str(response.content)
+    citation_index = CitationIndex.from_texts(str(m.content) for m in filter_messages(researcher_messages, include_types=["tool"]))
+    cited = [sid for sid in cited_source_ids(compressed_research) if sid in citation_index]
+    index_block = citation_index.render_index_block(cited)
+    if index_block:
+        compressed_research = f"{compressed_research.rstrip()}\n\n{index_block}"
+
+    # Spill raw notes to the blob store and keep only a reference in state
+    raw_notes_ref = put_blob("\n".join(raw_notes), run_id=get_run_id(config))
+
     return {
-        "compressed_research": str(response.content),
-        "raw_notes": ["\n".join(raw_notes)]
+        "compressed_research": compressed_research,
+        "raw_notes": [raw_notes_ref]
     }
 
 # ===== ROUTING LOGIC =====
@@ -102,7 +168,9 @@ def should_continue(state: ResearcherState) -> Literal["tool_node", "compress_re
     """Determine whether to continue research or provide final answer.
 
     Determines whether the agent should continue the research loop or provide
-    a final answer based on whether the LLM made tool calls.
+    a final answer based on whether the LLM made tool calls. Research also stops
+    early once recent searches have stopped turning up new information, or
+    once the researcher has used the search turns the run's budget allows.
 
     Returns:
         "tool_node": Continue to tool execution
@@ -111,6 +179,15 @@ def should_continue(state: ResearcherState) -> Literal["tool_node", "compress_re
     messages = state["researcher_messages"]
     last_message = messages[-1]
 
+    # Stop early if the last few searches added little new information
+    if has_stalled(state.get("novelty_scores", []), novelty_threshold, novelty_patience):
+        return "compress_research"
+    # Shorten the research loop when the run's budget is running low
+    budget = get_run_budget()
+    if budget is not None:
+        max_turns = budget_research_turns.get(budget.level())
+        if max_turns is not None and len(filter_messages(messages, include_types="ai")) > max_turns:
+            return "compress_research"
     # If the LLM makes a tool call, continue to tool execution
     if last_message.tool_calls:
         return "tool_node"
@@ -12,11 +12,12 @@ The system orchestrates the complete research workflow from initial user
 input through final report delivery.
 """
 
-from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, START, END
 
-from deep_research_from_scratch.utils import get_today_str
-from deep_research_from_scratch.prompts import final_report_generation_prompt
+from deep_research_from_scratch.budget import get_run_budget
+from deep_research_from_scratch.fair_scheduler import fair_scheduler, release_on_finish
+from deep_research_from_scratch.report_writer import write_report
 from deep_research_from_scratch.state_scope import AgentState, AgentInputState
 from deep_research_from_scratch.research_agent_scope import clarify_with_user, write_research_brief
 from deep_research_from_scratch.multi_agent_supervisor import supervisor_agent
@@ -30,28 +31,29 @@ writer_model = init_chat_model("google_genai:models/gemini-flash-latest") # mode
 
 from deep_research_from_scratch.state_scope import AgentState
 
-async def final_report_generation(state: AgentState):
+async def final_report_generation(state: AgentState, config: RunnableConfig):
     """
     Final report generation node.
 
-    Synthesizes all research findings into a comprehensive final report
+    Synthesizes all research findings into a comprehensive final report.
+    Long reports are written outline-first with their sections in parallel;
+    shorter ones in one call streamed token by token (visible to callers with
+    stream_mode="messages"). Attaches the budget report when the run was
+    given a budget, and the queue-time metrics of the run's scheduler tenant
     """
 
     notes = state.get("notes", [])
 
-    findings = "\n".join(notes)
+    final_report_text, report_usage = await write_report(notes, state.get("research_brief", ""), writer_model, config)
 
-    final_report_prompt = final_report_generation_prompt.format(
-        research_brief=state.get("research_brief", ""),
-        findings=findings,
-        date=get_today_str()
-    )
-
-    final_report = await writer_model.ainvoke([HumanMessage(content=final_report_prompt)])
+    budget = get_run_budget(config)
 
     return {
-        "final_report": final_report.content, 
-        "messages": ["Here is the final report: " + final_report.content],
+        "final_report": final_report_text, 
+        "messages": ["Here is the final report: " + final_report_text],
+        "budget_report": budget.report() if budget is not None else None,
+        "scheduler_report": fair_scheduler.tenant_metrics(config),
+        "report_usage": report_usage,
     }
 
 # ===== GRAPH CONSTRUCTION =====
@@ -70,5 +72,5 @@ deep_researcher_builder.add_edge("write_research_brief", "supervisor_subgraph")
 deep_researcher_builder.add_edge("supervisor_subgraph", "final_report_generation")
 deep_researcher_builder.add_edge("final_report_generation", END)
 
-# Compile the full workflow
-agent = deep_researcher_builder.compile()
+# Compile the full workflow (uncheckpointed; see checkpointing.compile_with_checkpointer)
+agent = release_on_finish(deep_researcher_builder.compile())
@@ -19,6 +19,7 @@ import os
 from typing_extensions import Literal
 
 from langchain.chat_models import init_chat_model
+from langchain_core.runnables import RunnableConfig
 from langchain_core.messages import SystemMessage, HumanMessage, ToolMessage, filter_messages
 from langchain_mcp_adapters.client import MultiServerMCPClient
 from langgraph.graph import StateGraph, START, END
@@ -26,6 +27,8 @@ from langgraph.graph import StateGraph, START, END
 from deep_research_from_scratch.prompts import research_agent_prompt_with_mcp, compress_research_system_prompt, compress_research_human_message
 from deep_research_from_scratch.state_research import ResearcherState, ResearcherOutputState
 from deep_research_from_scratch.utils import get_today_str, think_tool, get_current_dir
+from deep_research_from_scratch.blob_store import put_blob, get_run_id
+from deep_research_from_scratch.fair_scheduler import atask_slot, task_slot
 
 # ===== CONFIGURATION =====
 
@@ -79,13 +82,11 @@ async def llm_call(state: ResearcherState):
     model_with_tools = model.bind_tools(tools)
 
     # Process user input with system prompt
-    return {
-        "researcher_messages": [
-            model_with_tools.invoke(
-                [SystemMessage(content=research_agent_prompt_with_mcp.format(date=get_today_str()))] + state["researcher_messages"]
-            )
-        ]
-    }
+    async with atask_slot("model"):
+        response = await model_with_tools.ainvoke(
+            [SystemMessage(content=research_agent_prompt_with_mcp.format(date=get_today_str()))] + state["researcher_messages"]
+        )
+    return {"researcher_messages": [response]}
 
 async def tool_node(state: ResearcherState):
     """Execute tool calls using MCP tools.
@@ -136,7 +137,7 @@ async def tool_node(state: ResearcherState):
 
     return {"researcher_messages": messages}
 
-def compress_research(state: ResearcherState) -> dict:
+def compress_research(state: ResearcherState, config: RunnableConfig) -> dict:
     """Compress research findings into a concise summary.
 
     Takes all the research messages and tool outputs and creates
@@ -149,7 +150,8 @@ def compress_research(state: ResearcherState) -> dict:
     system_message = compress_research_system_prompt.format(date=get_today_str())
     messages = [SystemMessage(content=system_message)] + state.get("researcher_messages", []) + [HumanMessage(content=compress_research_human_message)]
 
-    response = compress_model.invoke(messages)
+    with task_slot("model", config):
+        response = compress_model.invoke(messages)
 
     # Extract raw notes from tool and AI messages
     raw_notes = [
@@ -159,9 +161,12 @@ def compress_research(state: ResearcherState) -> dict:
         )
     ]
 
+    # Spill raw notes to the blob store and keep only a reference in state
+    raw_notes_ref = put_blob("\n".join(raw_notes), run_id=get_run_id(config))
+
     return {
         "compressed_research": str(response.content),
-        "raw_notes": ["\n".join(raw_notes)]
+        "raw_notes": [raw_notes_ref]
     }
 
 # ===== ROUTING LOGIC =====
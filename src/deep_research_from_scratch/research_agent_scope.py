@@ -14,9 +14,11 @@ from typing_extensions import Literal
 
 from langchain.chat_models import init_chat_model
 from langchain_core.messages import HumanMessage, AIMessage, get_buffer_string
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, START, END
 from langgraph.types import Command
 
+from deep_research_from_scratch.fair_scheduler import task_slot
 from deep_research_from_scratch.prompts import clarify_with_user_instructions, transform_messages_into_research_topic_prompt
 from deep_research_from_scratch.state_scope import AgentState, ClarifyWithUser, ResearchQuestion, AgentInputState
 
@@ -36,23 +38,29 @@ model = init_chat_model("google_genai:models/gemini-2.5-flash")
 
 # ===== WORKFLOW NODES =====
 
-def clarify_with_user(state: AgentState) -> Command[Literal["write_research_brief", "__end__"]]:
+def clarify_with_user(state: AgentState, config: RunnableConfig) -> Command[Literal["write_research_brief", "__end__"]]:
     """
     Determine if the user's request contains sufficient information to proceed with research.
 
     Uses structured output to make deterministic decisions and avoid hallucination.
     Routes to either research brief generation or ends with a clarification question.
+    Runs with nobody to answer a question (e.g. batch runs) set
+    configurable.allow_clarification to False and go straight to the brief.
     """
+    if not config.get("configurable", {}).get("allow_clarification", True):
+        return Command(goto="write_research_brief")
+
     # Set up structured output model
     structured_output_model = model.with_structured_output(ClarifyWithUser)
 
     # Invoke the model with clarification instructions
-    response = structured_output_model.invoke([
-        HumanMessage(content=clarify_with_user_instructions.format(
-            messages=get_buffer_string(messages=state["messages"]), 
-            date=get_today_str()
-        ))
-    ])
+    with task_slot("model"):
+        response = structured_output_model.invoke([
+            HumanMessage(content=clarify_with_user_instructions.format(
+                messages=get_buffer_string(messages=state["messages"]), 
+                date=get_today_str()
+            ))
+        ])
 
     # Route based on clarification need
     if response.need_clarification:
@@ -77,12 +85,13 @@ def write_research_brief(state: AgentState):
     structured_output_model = model.with_structured_output(ResearchQuestion)
 
     # Generate research brief from conversation history
-    response = structured_output_model.invoke([
-        HumanMessage(content=transform_messages_into_research_topic_prompt.format(
-            messages=get_buffer_string(state.get("messages", [])),
-            date=get_today_str()
-        ))
-    ])
+    with task_slot("model"):
+        response = structured_output_model.invoke([
+            HumanMessage(content=transform_messages_into_research_topic_prompt.format(
+                messages=get_buffer_string(state.get("messages", [])),
+                date=get_today_str()
+            ))
+        ])
 
     # Update state with generated research brief and pass it to the supervisor
     return {
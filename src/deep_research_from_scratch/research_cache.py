@@ -0,0 +1,203 @@
+"""Cross-Run Research Memoization.
+
+This module stores compressed research results from past runs in a small
+SQLite database, indexed by an embedding of the research topic. Before the
+supervisor launches a researcher it looks for a close enough earlier result
+among the most similar fresh entries:
+- Very close matches are reused as-is, skipping the research loop entirely
+- Related matches are handed to the researcher as prior findings to build on
+A topic that names another entity or number is neither reused nor handed on,
+however similar its wording, so a close entry about another entity cannot
+hide a less similar entry about the same one.
+
+Entries expire after a freshness TTL so reused research does not go stale.
+"""
+
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing_extensions import Iterator, Optional, TypedDict
+
+import numpy as np
+
+from deep_research_from_scratch.similarity import EMBEDDING_DIM, cosine_similarities, embed_text, mentions_other_entities
+
+# ===== CONFIGURATION =====
+
+# SQLite database holding cached research (kept next to the generated reports)
+cache_path = Path(__file__).resolve().parent / "files" / ".research_cache.sqlite"
+
+# Cosine similarity at or above which a cached result is reused without research
+reuse_threshold = 0.9
+
+# Cosine similarity at or above which a cached result seeds a new research loop
+augment_threshold = 0.7
+
+# Most similar fresh entries considered when matching a topic
+lookup_candidates = 5
+
+# How long cached research stays fresh
+cache_ttl_seconds = 7 * 24 * 60 * 60
+
+# ===== SCHEMAS =====
+
+class CachedResearch(TypedDict):
+    """A cached research result and how closely it matches the requested topic."""
+    topic: str
+    compressed_research: str
+    created_at: float
+    similarity: float
+
+# ===== CACHE =====
+
+def is_reusable(cached: CachedResearch, topic: str) -> bool:
+    """Check whether a cached result answers a topic as-is.
+
+    Hashed bag-of-words similarity scores entity-swapped topics above 0.9,
+    so a reused result must also not be about another entity.
+    """
+    return cached["similarity"] >= reuse_threshold and not mentions_other_entities(cached["topic"], topic)
+
+def is_related(cached: CachedResearch, topic: str) -> bool:
+    """Check whether a cached result is close enough to seed research on a topic."""
+    return cached["similarity"] >= augment_threshold and not mentions_other_entities(cached["topic"], topic)
+
+def select_cached(candidates: list[CachedResearch], topic: str) -> Optional[CachedResearch]:
+    """Pick the most similar reusable candidate, else the most similar related one."""
+    for predicate in (is_reusable, is_related):
+        for cached in candidates:
+            if predicate(cached, topic):
+                return cached
+    return None
+
+class ResearchCache:
+    """Persistent store of compressed research results searchable by topic similarity.
+
+    Topic embeddings are kept in memory as a NumPy matrix and refreshed
+    whenever another process or run has added rows to the database.
+    """
+
+    def __init__(self, path: Path = cache_path, ttl_seconds: float = cache_ttl_seconds):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._matrix = np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+        self._max_id = 0
+        self._initialized = False
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection, committing on success and always closing it."""
+        if not self._initialized:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            if not self._initialized:
+                conn.execute(
+                    """CREATE TABLE IF NOT EXISTS research (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        topic TEXT NOT NULL,
+                        embedding BLOB NOT NULL,
+                        compressed_research TEXT NOT NULL,
+                        created_at REAL NOT NULL
+                    )"""
+                )
+                self._initialized = True
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _refresh_index(self, conn: sqlite3.Connection) -> None:
+        """Load embeddings of rows added since the last refresh."""
+        rows = conn.execute(
+            "SELECT id, embedding FROM research WHERE id > ? ORDER BY id", (self._max_id,)
+        ).fetchall()
+        if not rows:
+            return
+        ids = np.array([row[0] for row in rows], dtype=np.int64)
+        vectors = np.stack([np.frombuffer(row[1], dtype=np.float32) for row in rows])
+        self._ids = np.concatenate([self._ids, ids])
+        self._matrix = np.concatenate([self._matrix, vectors])
+        self._max_id = int(ids[-1])
+
+    def lookup(
+        self,
+        topic: str,
+        min_similarity: float = augment_threshold,
+        limit: int = lookup_candidates
+    ) -> list[CachedResearch]:
+        """Find the closest fresh cached results for a research topic.
+
+        Args:
+            topic: Research topic about to be delegated
+            min_similarity: Minimum cosine similarity for a match
+            limit: Maximum number of matches returned
+
+        Returns:
+            Up to limit fresh matches, most similar first
+        """
+        query = embed_text(topic)
+        cutoff = time.time() - self.ttl_seconds
+
+        matches = []
+        with self._lock, self._connect() as conn:
+            self._refresh_index(conn)
+            scores = cosine_similarities(query, self._matrix)
+
+            # Walk candidates from most to least similar, skipping stale ones
+            for idx in np.argsort(-scores):
+                if scores[idx] < min_similarity or len(matches) >= limit:
+                    break
+                row = conn.execute(
+                    "SELECT topic, compressed_research, created_at FROM research WHERE id = ?",
+                    (int(self._ids[idx]),)
+                ).fetchone()
+                if row and row[2] >= cutoff:
+                    matches.append(CachedResearch(
+                        topic=row[0],
+                        compressed_research=row[1],
+                        created_at=row[2],
+                        similarity=float(scores[idx]),
+                    ))
+
+        return matches
+
+    def match(self, topic: str) -> Optional[CachedResearch]:
+        """Find the cached result to reuse or build on for a topic, if any (see select_cached)."""
+        return select_cached(self.lookup(topic), topic)
+
+    def store(self, topic: str, compressed_research: str) -> None:
+        """Add a research result to the cache.
+
+        Args:
+            topic: Research topic the result answers
+            compressed_research: Compressed findings returned by the researcher
+        """
+        embedding = embed_text(topic).astype(np.float32).tobytes()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT INTO research (topic, embedding, compressed_research, created_at) VALUES (?, ?, ?, ?)",
+                (topic, embedding, compressed_research, time.time())
+            )
+
+    def prune(self) -> int:
+        """Delete expired entries from the cache.
+
+        Returns:
+            Number of entries deleted
+        """
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock, self._connect() as conn:
+            deleted = conn.execute("DELETE FROM research WHERE created_at < ?", (cutoff,)).rowcount
+            # Rebuild the in-memory index from scratch on the next lookup
+            self._ids = np.zeros(0, dtype=np.int64)
+            self._matrix = np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+            self._max_id = 0
+        return deleted
+
+# Shared cache used by the supervisor
+research_cache = ResearchCache()
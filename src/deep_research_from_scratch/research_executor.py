@@ -0,0 +1,368 @@
+"""Pluggable Execution Backends for Researcher Tasks.
+
+The supervisor hands each ConductResearch task to a research executor, which
+decides where the researcher actually runs:
+- "in_process": as a coroutine on the supervisor's event loop (default)
+- "process_pool": in a local pool of worker processes, so CPU-bound work such
+  as parsing, deduplication and formatting is spread across cores
+- "sqlite_queue": through a SQLite task queue that any number of worker
+  processes, on this or other machines sharing the database file, consume
+
+Queue workers are started with:
+
+    python -m deep_research_from_scratch.research_executor --concurrency 2
+
+A claimed task is leased to its worker, which renews the lease while the
+researcher runs. If the worker dies, the lease expires and another worker
+reclaims the task, up to max_task_attempts claims in total.
+
+Researchers running outside the supervisor's process cannot stream progress
+events back, and their raw note blobs land in their own blob store, so
+multi-machine setups should share the files directory.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing_extensions import Iterator, Optional, Protocol
+
+from langchain_core.messages import HumanMessage
+
+# ===== CONFIGURATION =====
+
+# Executor used when the run configuration does not name one
+# (override per run with configurable.research_executor)
+default_research_executor = "in_process"
+
+# Number of worker processes in the process pool
+process_pool_workers = max(1, (os.cpu_count() or 2) - 1)
+
+# SQLite database used as the distributed task queue
+research_queue_path = Path(__file__).resolve().parent / "files" / ".research_queue.sqlite"
+
+# How often submitters and workers poll the task queue
+queue_poll_seconds = 0.5
+
+# How long a claimed task stays leased to its worker without a renewal
+# (workers renew it every third of this while the researcher runs)
+queue_lease_seconds = 60.0
+
+# Claims of a task (its first and any after a worker died) before it is failed
+max_task_attempts = 3
+
+# ===== RESEARCHER ENTRY POINTS =====
+
+async def run_researcher(research_topic: str, researcher_input: str, run_id: Optional[str] = None) -> dict:
+    """Run a researcher and keep only the fields the supervisor needs.
+
+    Args:
+        research_topic: Topic being researched
+        researcher_input: First message for the researcher (the topic, possibly with prior findings)
+        run_id: Run the researcher's raw note blobs are attributed to
+
+    Returns:
+        Dictionary with compressed_research and raw_notes
+    """
+    # Imported here so queue workers only load models when they start researching
+    from deep_research_from_scratch.research_agent import researcher_agent
+
+    config = {"configurable": {"thread_id": run_id}} if run_id else None
+    result = await researcher_agent.ainvoke(
+        {
+            "researcher_messages": [HumanMessage(content=researcher_input)],
+            "research_topic": research_topic
+        },
+        config=config
+    )
+    return {
+        "compressed_research": result.get("compressed_research", ""),
+        "raw_notes": list(result.get("raw_notes", [])),
+    }
+
+def _run_researcher_blocking(research_topic: str, researcher_input: str, run_id: Optional[str]) -> dict:
+    """Run a researcher on a fresh event loop (entry point for worker processes)."""
+    return asyncio.run(run_researcher(research_topic, researcher_input, run_id))
+
+# ===== EXECUTORS =====
+
+class ResearchTaskError(RuntimeError):
+    """Raised when a researcher running outside this process fails."""
+
+class ResearchExecutor(Protocol):
+    """Backend that runs a single researcher and returns its output."""
+
+    async def submit(self, research_topic: str, researcher_input: str, run_id: Optional[str] = None) -> dict:
+        """Run a researcher and wait for its compressed_research and raw_notes."""
+        ...
+
+class InProcessExecutor:
+    """Run researchers as coroutines on the current event loop."""
+
+    async def submit(self, research_topic: str, researcher_input: str, run_id: Optional[str] = None) -> dict:
+        """Run a researcher on the current event loop.
+
+        The researcher inherits the calling graph's config (callbacks, stream
+        writer and thread id), so run_id is not needed here.
+        """
+        return await run_researcher(research_topic, researcher_input)
+
+class ProcessPoolResearchExecutor:
+    """Run researchers in a pool of local worker processes."""
+
+    def __init__(self, max_workers: int = process_pool_workers):
+        self.max_workers = max_workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Spawn rather than fork: the parent runs an event loop and thread pools
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    async def submit(self, research_topic: str, researcher_input: str, run_id: Optional[str] = None) -> dict:
+        """Run a researcher in a worker process."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_pool(), _run_researcher_blocking, research_topic, researcher_input, run_id
+        )
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+class SqliteQueueExecutor:
+    """Run researchers through a SQLite-backed task queue consumed by worker processes."""
+
+    def __init__(
+        self,
+        path: Path = research_queue_path,
+        poll_seconds: float = queue_poll_seconds,
+        lease_seconds: float = queue_lease_seconds
+    ):
+        self.path = Path(path)
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+
+    @contextmanager
+    def connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection to the queue, creating the schema if needed."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS tasks (
+                    id TEXT PRIMARY KEY,
+                    research_topic TEXT NOT NULL,
+                    researcher_input TEXT NOT NULL,
+                    run_id TEXT,
+                    status TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    worker TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    lease_expires_at REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0
+                )"""
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(tasks)")}
+            if "lease_expires_at" not in columns:
+                # Queues created before tasks were leased
+                conn.execute("ALTER TABLE tasks ADD COLUMN lease_expires_at REAL")
+                conn.execute("ALTER TABLE tasks ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, created_at)")
+            yield conn
+        finally:
+            conn.close()
+
+    def enqueue(self, research_topic: str, researcher_input: str, run_id: Optional[str] = None) -> str:
+        """Add a research task to the queue and return its id."""
+        task_id = str(uuid.uuid4())
+        with self.connect() as conn:
+            conn.execute(
+                "INSERT INTO tasks (id, research_topic, researcher_input, run_id, status, created_at) VALUES (?, ?, ?, ?, 'queued', ?)",
+                (task_id, research_topic, researcher_input, run_id, time.time())
+            )
+        return task_id
+
+    def poll(self, task_id: str) -> tuple[str, Optional[str], Optional[str]]:
+        """Get a task's (status, result, error)."""
+        with self.connect() as conn:
+            row = conn.execute("SELECT status, result, error FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        if row is None:
+            raise ResearchTaskError(f"Research task {task_id} disappeared from the queue")
+        return row
+
+    def cancel(self, task_id: str) -> None:
+        """Withdraw a task that no worker has picked up yet."""
+        with self.connect() as conn:
+            conn.execute("UPDATE tasks SET status = 'cancelled' WHERE id = ? AND status = 'queued'", (task_id,))
+
+    def claim(self, worker: str) -> Optional[tuple[str, str, str, Optional[str]]]:
+        """Atomically claim the oldest queued task, or a running task whose lease expired.
+
+        A task whose worker died max_task_attempts times is failed instead.
+
+        Returns:
+            Tuple of (task id, research topic, researcher input, run id), or None if the queue is empty
+        """
+        with self.connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            conn.execute(
+                """UPDATE tasks SET status = 'failed', error = ?, finished_at = ?
+                WHERE status = 'running' AND lease_expires_at < ? AND attempts >= ?""",
+                (f"Worker lost the task {max_task_attempts} times", now, now, max_task_attempts)
+            )
+            row = conn.execute(
+                """SELECT id, research_topic, researcher_input, run_id FROM tasks
+                WHERE status = 'queued' OR (status = 'running' AND lease_expires_at < ?)
+                ORDER BY created_at LIMIT 1""",
+                (now,)
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    """UPDATE tasks SET status = 'running', worker = ?, started_at = ?, lease_expires_at = ?,
+                    attempts = attempts + 1 WHERE id = ?""",
+                    (worker, now, now + self.lease_seconds, row[0])
+                )
+            conn.execute("COMMIT")
+        return row
+
+    def renew(self, task_id: str, worker: str) -> bool:
+        """Extend a worker's lease on a running task; False if the task is no longer its own."""
+        with self.connect() as conn:
+            renewed = conn.execute(
+                "UPDATE tasks SET lease_expires_at = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                (time.time() + self.lease_seconds, task_id, worker)
+            ).rowcount
+        return renewed > 0
+
+    def complete(self, task_id: str, worker: str, result: Optional[dict] = None, error: Optional[str] = None) -> None:
+        """Record a task's result, or its error if it failed (unless another worker reclaimed it)."""
+        with self.connect() as conn:
+            conn.execute(
+                """UPDATE tasks SET status = ?, result = ?, error = ?, finished_at = ?, lease_expires_at = NULL
+                WHERE id = ? AND worker = ? AND status = 'running'""",
+                (
+                    "failed" if error else "done", json.dumps(result) if result is not None else None, error,
+                    time.time(), task_id, worker
+                )
+            )
+
+    async def submit(self, research_topic: str, researcher_input: str, run_id: Optional[str] = None) -> dict:
+        """Queue a researcher and wait for a worker to finish it."""
+        task_id = await asyncio.to_thread(self.enqueue, research_topic, researcher_input, run_id)
+        try:
+            while True:
+                status, result, error = await asyncio.to_thread(self.poll, task_id)
+                if status == "done":
+                    return json.loads(result)
+                if status == "failed":
+                    raise ResearchTaskError(error or "Research task failed")
+                await asyncio.sleep(self.poll_seconds)
+        except asyncio.CancelledError:
+            # Timed out or cancelled by the supervisor: don't let a worker start it later
+            await asyncio.to_thread(self.cancel, task_id)
+            raise
+
+    async def work(self, concurrency: int = 1, idle_exit_seconds: Optional[float] = None) -> None:
+        """Consume tasks from the queue until idle for idle_exit_seconds (or forever).
+
+        Args:
+            concurrency: Number of researchers this worker runs at the same time
+            idle_exit_seconds: Stop after the queue has been empty this long
+        """
+        worker_name = f"{socket.gethostname()}:{os.getpid()}"
+        last_active = time.monotonic()
+        running: set[asyncio.Task] = set()
+
+        async def keep_lease(task_id: str) -> None:
+            while await asyncio.to_thread(self.renew, task_id, worker_name):
+                await asyncio.sleep(self.lease_seconds / 3)
+
+        async def run_task(task_id: str, research_topic: str, researcher_input: str, run_id: Optional[str]) -> None:
+            heartbeat = asyncio.create_task(keep_lease(task_id))
+            try:
+                result = await run_researcher(research_topic, researcher_input, run_id)
+                await asyncio.to_thread(self.complete, task_id, worker_name, result)
+            except Exception as e:
+                await asyncio.to_thread(self.complete, task_id, worker_name, None, f"{type(e).__name__}: {e}")
+            finally:
+                heartbeat.cancel()
+
+        while True:
+            running = {task for task in running if not task.done()}
+            claimed = None
+            if len(running) < concurrency:
+                claimed = await asyncio.to_thread(self.claim, worker_name)
+            if claimed is not None:
+                running.add(asyncio.create_task(run_task(*claimed)))
+                last_active = time.monotonic()
+                continue
+            if running:
+                last_active = time.monotonic()
+            elif idle_exit_seconds is not None and time.monotonic() - last_active > idle_exit_seconds:
+                return
+            await asyncio.sleep(self.poll_seconds)
+
+# ===== REGISTRY =====
+
+_executors: dict[str, ResearchExecutor] = {}
+
+_executor_factories = {
+    "in_process": InProcessExecutor,
+    "process_pool": ProcessPoolResearchExecutor,
+    "sqlite_queue": SqliteQueueExecutor,
+}
+
+def register_research_executor(name: str, executor: ResearchExecutor) -> None:
+    """Make a custom executor (e.g. backed by another queue) selectable by name."""
+    _executors[name] = executor
+
+def get_research_executor(name: Optional[str] = None) -> ResearchExecutor:
+    """Get the shared executor instance for a backend name.
+
+    Args:
+        name: Backend name; defaults to default_research_executor
+
+    Returns:
+        Executor instance, created on first use
+    """
+    name = name or default_research_executor
+    if name not in _executors:
+        if name not in _executor_factories:
+            raise ValueError(f"Unknown research executor {name!r}; expected one of {sorted(_executor_factories)}")
+        _executors[name] = _executor_factories[name]()
+    return _executors[name]
+
+# ===== WORKER CLI =====
+
+def main() -> None:
+    """Run a queue worker that executes research tasks from the SQLite queue."""
+    parser = argparse.ArgumentParser(description="Run a deep research queue worker.")
+    parser.add_argument("--queue", type=Path, default=research_queue_path, help="Path to the SQLite task queue")
+    parser.add_argument("--concurrency", type=int, default=1, help="Researchers to run at the same time")
+    parser.add_argument("--idle-exit", type=float, default=None, help="Exit after the queue is empty for this many seconds")
+    args = parser.parse_args()
+
+    asyncio.run(SqliteQueueExecutor(args.queue).work(args.concurrency, args.idle_exit))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Bounded Scheduling of Research Tasks.
+
+This module provides the scheduler the supervisor uses to run delegated
+research. At most a fixed number of researchers run at the same time; any
+additional ConductResearch calls wait in a queue until a slot frees up, so a
+supervisor that emits many calls at once cannot exceed provider quotas.
+
+Each task attempt can be bounded by a timeout and retried a limited number
+of times, so one slow or flaky topic cannot stall the whole batch. Queue
+depth, wait times, timeouts, retries and failures are recorded.
+"""
+
+import asyncio
+import time
+from typing_extensions import Awaitable, Callable, Optional, TypedDict, TypeVar
+
+from deep_research_from_scratch.progress import emit_progress, ResearchScheduled
+
+T = TypeVar("T")
+
+# ===== METRICS =====
+
+class SchedulerMetrics(TypedDict):
+    """Queueing metrics for research tasks."""
+    tasks: int
+    max_queue_depth: int
+    total_wait_seconds: float
+    max_wait_seconds: float
+    timeouts: int
+    retries: int
+    failures: int
+
+def empty_scheduler_metrics() -> SchedulerMetrics:
+    """Create metrics for a scheduler that has not run any tasks yet."""
+    return SchedulerMetrics(
+        tasks=0,
+        max_queue_depth=0,
+        total_wait_seconds=0.0,
+        max_wait_seconds=0.0,
+        timeouts=0,
+        retries=0,
+        failures=0,
+    )
+
+def merge_scheduler_metrics(left: SchedulerMetrics | None, right: SchedulerMetrics | None) -> SchedulerMetrics:
+    """Combine metrics from two scheduling rounds (used as a state reducer)."""
+    left = {**empty_scheduler_metrics(), **(left or {})}
+    right = {**empty_scheduler_metrics(), **(right or {})}
+    return SchedulerMetrics(
+        tasks=left["tasks"] + right["tasks"],
+        max_queue_depth=max(left["max_queue_depth"], right["max_queue_depth"]),
+        total_wait_seconds=left["total_wait_seconds"] + right["total_wait_seconds"],
+        max_wait_seconds=max(left["max_wait_seconds"], right["max_wait_seconds"]),
+        timeouts=left["timeouts"] + right["timeouts"],
+        retries=left["retries"] + right["retries"],
+        failures=left["failures"] + right["failures"],
+    )
+
+# ===== SCHEDULER =====
+
+class ResearchScheduler:
+    """Run research tasks with at most max_concurrency of them in flight.
+
+    Excess tasks wait in FIFO order on a semaphore. Each attempt is cancelled
+    after timeout_seconds (if set) and failed attempts are retried up to
+    max_retries times while the task keeps its slot.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        timeout_seconds: Optional[float] = None,
+        max_retries: int = 0,
+        retry_backoff_seconds: float = 1.0,
+    ):
+        if max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency}")
+        self.max_concurrency = max_concurrency
+        self.timeout_seconds = timeout_seconds
+        self.max_retries = max(0, max_retries)
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._queue_depth = 0
+        self._metrics = empty_scheduler_metrics()
+
+    async def run(self, task: Callable[[], Awaitable[T]], label: str = "") -> T:
+        """Run a task once a concurrency slot is free.
+
+        Args:
+            task: Zero-argument callable returning the awaitable to run; it is
+                called again for each retry
+            label: Human-readable label for progress events (e.g. the research topic)
+
+        Returns:
+            The task's result
+
+        Raises:
+            Exception: The last attempt's error (TimeoutError on timeout) once
+                all retries are exhausted
+        """
+        enqueued_at = time.monotonic()
+        self._metrics["tasks"] += 1
+
+        # Only tasks that find every slot taken count towards the queue depth
+        queued = self._semaphore.locked()
+        if queued:
+            self._queue_depth += 1
+            self._metrics["max_queue_depth"] = max(self._metrics["max_queue_depth"], self._queue_depth)
+
+        async with self._semaphore:
+            if queued:
+                self._queue_depth -= 1
+            wait_seconds = time.monotonic() - enqueued_at
+            self._metrics["total_wait_seconds"] += wait_seconds
+            self._metrics["max_wait_seconds"] = max(self._metrics["max_wait_seconds"], wait_seconds)
+            emit_progress(ResearchScheduled(
+                event="research_scheduled",
+                research_topic=label,
+                queue_depth=self._queue_depth,
+                wait_seconds=wait_seconds
+            ))
+            return await self._run_with_retries(task)
+
+    async def _run_with_retries(self, task: Callable[[], Awaitable[T]]) -> T:
+        attempt = 0
+        while True:
+            try:
+                if self.timeout_seconds is None:
+                    return await task()
+                return await asyncio.wait_for(task(), self.timeout_seconds)
+            except Exception as e:
+                if isinstance(e, TimeoutError):
+                    self._metrics["timeouts"] += 1
+                if attempt >= self.max_retries:
+                    self._metrics["failures"] += 1
+                    raise
+                attempt += 1
+                self._metrics["retries"] += 1
+                await asyncio.sleep(self.retry_backoff_seconds * attempt)
+
+    def metrics(self) -> SchedulerMetrics:
+        """Get a snapshot of this scheduler's queueing metrics."""
+        return SchedulerMetrics(**self._metrics)
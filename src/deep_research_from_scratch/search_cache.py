@@ -0,0 +1,210 @@
+"""Shared Cache of Web Searches and Webpage Summaries.
+
+Researchers working on related briefs issue many of the same searches and
+summarize many of the same pages. Search responses (keyed by the query and
+its options) and page summaries (keyed by the SHA-256 of the page content)
+are therefore stored in a small SQLite database shared by every run, so a
+repeated search costs no Tavily request and a page already summarized costs
+no model call. Entries expire after a freshness TTL; values are
+zlib-compressed, since search responses carry raw page content.
+
+The cache is shared across briefs, so it is off by default and batch runs,
+whose briefs overlap, turn it on with configurable.use_search_cache (an
+interactive run wants fresh results). Hits and misses are counted per run.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing_extensions import Iterator, Optional, TypedDict
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.config import get_config
+
+from deep_research_from_scratch.blob_store import get_run_id
+
+# ===== CONFIGURATION =====
+
+# SQLite database holding cached searches and summaries (kept next to the generated reports)
+search_cache_path = Path(__file__).resolve().parent / "files" / ".search_cache.sqlite"
+
+# Whether runs use the cache (batch runs set configurable.use_search_cache)
+use_search_cache = False
+
+# How long cached search responses stay fresh
+search_ttl_seconds = 24 * 60 * 60
+
+# How long cached page summaries stay fresh
+summary_ttl_seconds = 7 * 24 * 60 * 60
+
+# ===== SCHEMAS =====
+
+class SearchCacheStats(TypedDict):
+    """Cache hits and misses of a run (or of every run in this process)."""
+    search_hits: int
+    search_misses: int
+    summary_hits: int
+    summary_misses: int
+
+# ===== CACHE =====
+
+def _search_key(query: str, max_results: int, topic: str, include_raw_content: bool) -> str:
+    normalized = " ".join(query.split()).lower()
+    return hashlib.sha256(json.dumps([normalized, max_results, topic, include_raw_content]).encode("utf-8")).hexdigest()
+
+def _content_key(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+class SearchCache:
+    """Persistent store of search responses and page summaries, shared across runs and processes."""
+
+    def __init__(
+        self,
+        path: Path = search_cache_path,
+        search_ttl: float = search_ttl_seconds,
+        summary_ttl: float = summary_ttl_seconds,
+    ):
+        self.path = Path(path)
+        self.search_ttl = search_ttl
+        self.summary_ttl = summary_ttl
+        self._schema_ready = False
+        self._stats_lock = threading.Lock()
+        self._run_stats: dict[str, Counter] = {}
+        self._totals: Counter = Counter()
+
+    @contextmanager
+    def connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection to the cache, creating the schema if needed."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            if not self._schema_ready:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(
+                    """CREATE TABLE IF NOT EXISTS searches (
+                        key TEXT PRIMARY KEY,
+                        query TEXT NOT NULL,
+                        response BLOB NOT NULL,
+                        created_at REAL NOT NULL
+                    );
+                    CREATE TABLE IF NOT EXISTS summaries (
+                        key TEXT PRIMARY KEY,
+                        summary BLOB NOT NULL,
+                        created_at REAL NOT NULL
+                    );"""
+                )
+                self._schema_ready = True
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _count(self, run_id: Optional[str], field: str) -> None:
+        with self._stats_lock:
+            self._totals[field] += 1
+            if run_id is not None:
+                self._run_stats.setdefault(run_id, Counter())[field] += 1
+
+    def _get(self, table: str, column: str, key: str, ttl: float) -> Optional[bytes]:
+        with self.connect() as conn:
+            row = conn.execute(
+                f"SELECT {column} FROM {table} WHERE key = ? AND created_at >= ?", (key, time.time() - ttl)
+            ).fetchone()
+        return zlib.decompress(row[0]) if row else None
+
+    # ----- Searches -----
+
+    def get_search(
+        self,
+        query: str,
+        max_results: int,
+        topic: str,
+        include_raw_content: bool,
+        run_id: Optional[str] = None
+    ) -> Optional[dict]:
+        """Get a fresh cached search response, or None on a miss."""
+        data = self._get("searches", "response", _search_key(query, max_results, topic, include_raw_content), self.search_ttl)
+        self._count(run_id, "search_hits" if data is not None else "search_misses")
+        return json.loads(data) if data is not None else None
+
+    def put_search(self, query: str, max_results: int, topic: str, include_raw_content: bool, response: dict) -> None:
+        """Store a search response."""
+        with self.connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO searches (key, query, response, created_at) VALUES (?, ?, ?, ?)",
+                (
+                    _search_key(query, max_results, topic, include_raw_content), query,
+                    zlib.compress(json.dumps(response).encode("utf-8")), time.time()
+                )
+            )
+
+    # ----- Summaries -----
+
+    def get_summary(self, content: str, run_id: Optional[str] = None) -> Optional[str]:
+        """Get the fresh cached summary of a page's content, or None on a miss."""
+        data = self._get("summaries", "summary", _content_key(content), self.summary_ttl)
+        self._count(run_id, "summary_hits" if data is not None else "summary_misses")
+        return data.decode("utf-8") if data is not None else None
+
+    def put_summary(self, content: str, summary: str) -> None:
+        """Store the summary of a page's content."""
+        with self.connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO summaries (key, summary, created_at) VALUES (?, ?, ?)",
+                (_content_key(content), zlib.compress(summary.encode("utf-8")), time.time())
+            )
+
+    # ----- Maintenance -----
+
+    def prune(self) -> int:
+        """Delete expired searches and summaries.
+
+        Returns:
+            Number of entries deleted
+        """
+        now = time.time()
+        with self.connect() as conn:
+            deleted = conn.execute("DELETE FROM searches WHERE created_at < ?", (now - self.search_ttl,)).rowcount
+            deleted += conn.execute("DELETE FROM summaries WHERE created_at < ?", (now - self.summary_ttl,)).rowcount
+        return deleted
+
+    def stats(self, run_id: Optional[str] = None) -> SearchCacheStats:
+        """Get the hits and misses of a run, or of every run in this process."""
+        with self._stats_lock:
+            counts = self._totals if run_id is None else self._run_stats.get(run_id, Counter())
+            return SearchCacheStats(**{field: counts[field] for field in SearchCacheStats.__annotations__})
+
+    def pop_run_stats(self, run_id: str) -> SearchCacheStats:
+        """Get the hits and misses of a finished run and stop tracking it."""
+        stats = self.stats(run_id)
+        with self._stats_lock:
+            self._run_stats.pop(run_id, None)
+        return stats
+
+# Cache shared by every run
+search_cache = SearchCache()
+
+def get_search_cache(config: Optional[RunnableConfig] = None) -> tuple[Optional[SearchCache], Optional[str]]:
+    """Get the cache for the current run, and the run id its hits are counted under.
+
+    Args:
+        config: Run configuration; defaults to the configuration of the graph
+            run this is called from
+
+    Returns:
+        The shared cache and the run id, or (None, None) if the run does not use the cache
+    """
+    if config is None:
+        try:
+            config = get_config()
+        except RuntimeError:
+            config = {}
+    if not config.get("configurable", {}).get("use_search_cache", use_search_cache):
+        return None, None
+    return search_cache, get_run_id(config)
@@ -0,0 +1,193 @@
+"""Text Similarity Utilities.
+
+This module provides lightweight, CPU-side text similarity helpers used by the
+research agents, such as shingle-based novelty scoring for search results,
+hashed bag-of-words embeddings for comparing research topics, and
+content-word overlap with a name and number check for telling paraphrased
+topics apart from topics about a different entity.
+"""
+
+import re
+import zlib
+from typing_extensions import Iterable, List, Set
+
+import numpy as np
+
+# ===== TOKENIZATION =====
+
+_TOKEN_RE = re.compile(r"\w+")
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of lowercase word tokens
+    """
+    return _TOKEN_RE.findall(text.lower())
+
+# Function words ignored when comparing the content words of two texts
+STOPWORDS = frozenset("""
+a about all also an and any are as at be been but by can do does for from
+has have how in into is it its of on or that the their them these this those
+to was were what when where which who why will with within
+""".split())
+
+_SENTENCE_SPLIT_RE = re.compile(r"[.!?:;]\s+|\n+")
+
+def _stem(token: str) -> str:
+    """Strip plural endings, so "costs" and "cost" count as the same word."""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+def content_words(text: str) -> frozenset:
+    """Get the set of stemmed non-stopword tokens of a text."""
+    return frozenset(_stem(token) for token in tokenize(text) if token not in STOPWORDS)
+
+def key_terms(text: str) -> frozenset:
+    """Get the names and numbers a text mentions, as stemmed lowercase tokens.
+
+    Names are words capitalized anywhere but at the start of a sentence, or
+    with a capital letter after the first character (e.g. OpenAI); numbers are
+    words containing a digit. Lowercased text has numbers but no names.
+    """
+    terms = set()
+    for sentence in _SENTENCE_SPLIT_RE.split(text):
+        for position, word in enumerate(_TOKEN_RE.findall(sentence)):
+            if any(char.isdigit() for char in word) or any(char.isupper() for char in word[1:]) or (position and word[0].isupper()):
+                terms.add(_stem(word.lower()))
+    return frozenset(terms - STOPWORDS)
+
+def word_overlap(a: str, b: str) -> float:
+    """Compute the Jaccard similarity of the content words of two texts."""
+    words_a, words_b = content_words(a), content_words(b)
+    union = words_a | words_b
+    return len(words_a & words_b) / len(union) if union else 1.0
+
+def mentions_other_entities(a: str, b: str) -> bool:
+    """Check whether either text names an entity or number the other does not mention.
+
+    Embeddings and word overlap score topics that differ in a single entity
+    ("AI safety research at Anthropic" vs "at OpenAI") as near-identical,
+    so callers treating two topics as the same veto such pairs.
+    """
+    return bool(key_terms(a) - content_words(b) or key_terms(b) - content_words(a))
+
+def near_duplicate(a: str, b: str, threshold: float) -> bool:
+    """Check whether two texts paraphrase each other: enough shared content words, and no other entity."""
+    return word_overlap(a, b) >= threshold and not mentions_other_entities(a, b)
+
+# ===== SHINGLING =====
+
+def shingle(text: str, size: int = 3) -> Set[int]:
+    """Build the set of hashed word n-grams (shingles) for a text.
+
+    Args:
+        text: Text to shingle
+        size: Number of consecutive words per shingle
+
+    Returns:
+        Set of shingle hashes
+    """
+    tokens = tokenize(text)
+    if len(tokens) < size:
+        return {hash(tuple(tokens))} if tokens else set()
+    return {hash(tuple(tokens[i:i + size])) for i in range(len(tokens) - size + 1)}
+
+def shingle_all(texts: Iterable[str], size: int = 3) -> Set[int]:
+    """Build the union of shingles across several texts.
+
+    Args:
+        texts: Texts to shingle
+        size: Number of consecutive words per shingle
+
+    Returns:
+        Set of shingle hashes covering all texts
+    """
+    seen = set()
+    for text in texts:
+        seen |= shingle(text, size)
+    return seen
+
+def novelty_score(new_text: str, seen_shingles: Set[int], size: int = 3) -> float:
+    """Score how much new information a text adds over what was already seen.
+
+    The score is the fraction of the text's shingles that do not appear in
+    the previously gathered content: 1.0 means entirely new, 0.0 means
+    everything was seen before.
+
+    Args:
+        new_text: Newly gathered text
+        seen_shingles: Shingles of previously gathered content
+        size: Number of consecutive words per shingle
+
+    Returns:
+        Novelty score between 0.0 and 1.0
+    """
+    new_shingles = shingle(new_text, size)
+    if not new_shingles:
+        return 0.0
+    return len(new_shingles - seen_shingles) / len(new_shingles)
+
+def has_stalled(novelty_scores: List[float], threshold: float, patience: int) -> bool:
+    """Check whether the last `patience` novelty scores all fell below a threshold.
+
+    Args:
+        novelty_scores: Novelty scores in the order they were recorded
+        threshold: Score below which a turn is considered to add little
+        patience: Number of consecutive low-novelty turns required
+
+    Returns:
+        True if research has stopped producing new information
+    """
+    if patience <= 0 or len(novelty_scores) < patience:
+        return False
+    return all(score < threshold for score in novelty_scores[-patience:])
+
+# ===== EMBEDDINGS =====
+
+# Dimension of hashed bag-of-words embeddings
+EMBEDDING_DIM = 1024
+
+def embed_text(text: str, dim: int = EMBEDDING_DIM) -> np.ndarray:
+    """Embed text as an L2-normalized hashed bag of words and word bigrams.
+
+    Uses a stable hash (CRC32) so embeddings can be persisted and compared
+    across processes without fitting a vocabulary or calling a model.
+
+    Args:
+        text: Text to embed
+        dim: Embedding dimension
+
+    Returns:
+        Float32 vector of length dim with unit norm (all zeros for empty text)
+    """
+    tokens = tokenize(text)
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    vector = np.zeros(dim, dtype=np.float32)
+    for feature in features:
+        vector[zlib.crc32(feature.encode("utf-8")) % dim] += 1.0
+
+    # Sublinear term frequency dampens repeated words
+    np.log1p(vector, out=vector)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+def cosine_similarities(query: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """Compute cosine similarities between a unit query vector and unit row vectors.
+
+    Args:
+        query: Unit-norm query vector of shape (dim,)
+        matrix: Unit-norm row vectors of shape (n, dim)
+
+    Returns:
+        Array of n similarities
+    """
+    if matrix.size == 0:
+        return np.zeros(0, dtype=np.float32)
+    return matrix @ query
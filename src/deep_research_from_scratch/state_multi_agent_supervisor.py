@@ -7,6 +7,7 @@ research supervisor workflow, including coordination state and research tools.
 """
 
 import operator
+import re
 from typing_extensions import Annotated, TypedDict, Sequence
 
 from langchain_core.messages import BaseMessage
@@ -14,6 +15,22 @@ from langchain_core.tools import tool
 from langgraph.graph.message import add_messages
 from pydantic import BaseModel, Field
 
+from deep_research_from_scratch.research_scheduler import SchedulerMetrics, merge_scheduler_metrics
+
+class DeduplicatedTopic(TypedDict):
+    """A ConductResearch call answered from an earlier topic instead of being researched again."""
+    research_topic: str
+    duplicate_of: str
+    similarity: float
+
+def topic_key(research_topic: str) -> str:
+    """Normalize a research topic into the key its notes are stored under."""
+    return re.sub(r"\s+", " ", research_topic).strip().lower()
+
+def merge_notes_by_topic(left: dict[str, str] | None, right: dict[str, str] | None) -> dict[str, str]:
+    """Merge research notes keyed by topic; a newer note for a topic replaces the older one."""
+    return {**(left or {}), **(right or {})}
+
 class SupervisorState(TypedDict):
     """
     State for the multi-agent research supervisor.
@@ -28,10 +45,21 @@ class SupervisorState(TypedDict):
     research_brief: str
     # Processed and structured notes ready for final report generation
     notes: Annotated[list[str], operator.add] = []
+    # Compressed research findings accumulated as each result arrives, keyed by topic_key()
+    notes_by_topic: Annotated[dict[str, str], merge_notes_by_topic]
     # Counter tracking the number of research iterations performed
     research_iterations: int = 0
-    # Raw unprocessed research notes collected from sub-agent research
+    # References to raw unprocessed research notes in the blob store, collected from sub-agent research
     raw_notes: Annotated[list[str], operator.add] = []
+    # ConductResearch calls answered from near-identical topics researched earlier in the run
+    deduplicated_topics: Annotated[list[DeduplicatedTopic], operator.add]
+    # Queue depth and wait time of research tasks across all iterations
+    scheduler_metrics: Annotated[SchedulerMetrics, merge_scheduler_metrics]
+    # Identifies this supervision loop's background researchers in as-completed mode
+    supervision_id: str
+    # ConductResearch calls still running in the background in as-completed mode,
+    # relaunched if the run resumes from a checkpoint in another process
+    pending_research: list[dict]
 
 @tool
 class ConductResearch(BaseModel):
@@ -40,6 +68,26 @@ class ConductResearch(BaseModel):
         description="The topic to research. Should be a single topic, and should be described in high detail (at least a paragraph).",
     )
 
+class PlannedResearch(BaseModel):
+    """A research task in a research plan."""
+    id: str = Field(
+        description="Short unique identifier for this task, e.g. 'survey_x'.",
+    )
+    research_topic: str = Field(
+        description="The topic to research. Should be a single topic, and should be described in high detail (at least a paragraph).",
+    )
+    depends_on: list[str] = Field(
+        default_factory=list,
+        description="Ids of the tasks whose findings this task needs. They are researched first and their findings are passed on to this task.",
+    )
+
+@tool
+class ConductResearchPlan(BaseModel):
+    """Tool for delegating a plan of research tasks where some tasks build on the findings of others."""
+    tasks: list[PlannedResearch] = Field(
+        description="The research tasks; tasks without dependencies run in parallel, and each dependent task runs as soon as its prerequisites finish.",
+    )
+
 @tool
 class ResearchComplete(BaseModel):
     """Tool for indicating that the research process is complete."""
@@ -20,20 +20,22 @@ class ResearcherState(TypedDict):
 
     This state tracks the researcher's conversation, iteration count for limiting
     tool calls, the research topic being investigated, compressed findings,
-    and raw research notes for detailed analysis.
+    raw research notes for detailed analysis (stored as blob store references),
+    and the novelty of each search turn used for early stopping.
     """
     researcher_messages: Annotated[Sequence[BaseMessage], add_messages]
     tool_call_iterations: int
     research_topic: str
     compressed_research: str
     raw_notes: Annotated[List[str], operator.add]
+    novelty_scores: Annotated[List[float], operator.add]
 
 class ResearcherOutputState(TypedDict):
     """
     Output state for the research agent containing final research results.
 
     This represents the final output of the research process with compressed
-    research findings and all raw notes from the research process.
+    research findings and references to all raw notes from the research process.
     """
     compressed_research: str
     raw_notes: Annotated[List[str], operator.add]
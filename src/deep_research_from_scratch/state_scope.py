@@ -13,6 +13,10 @@ from langgraph.graph import MessagesState
 from langgraph.graph.message import add_messages
 from pydantic import BaseModel, Field
 
+from deep_research_from_scratch.budget import BudgetReport
+from deep_research_from_scratch.fair_scheduler import TenantMetrics
+from deep_research_from_scratch.report_store import ReportUsage
+
 # ===== STATE DEFINITIONS =====
 
 class AgentInputState(MessagesState):
@@ -32,12 +36,22 @@ class AgentState(MessagesState):
     research_brief: Optional[str]
     # Messages exchanged with the supervisor agent for coordination
     supervisor_messages: Annotated[Sequence[BaseMessage], add_messages]
-    # Raw unprocessed research notes collected during the research phase
+    # References to raw unprocessed research notes in the blob store, collected during the research phase
     raw_notes: Annotated[list[str], operator.add] = []
     # Processed and structured notes ready for report generation
     notes: Annotated[list[str], operator.add] = []
     # Final formatted research report
     final_report: str
+    # Draft file the final report was streamed to, until it is saved under its final name
+    report_draft_path: Optional[str]
+    # Tokens spent generating the final report
+    report_usage: Optional[ReportUsage]
+    # Content-addressed id of the saved report
+    report_id: Optional[str]
+    # Usage of the run's budget, when the run was given one
+    budget_report: Optional[BudgetReport]
+    # Scheduling metrics (queue times) of the run's tenant when the report was written
+    scheduler_report: Optional[TenantMetrics]
 
 # ===== STRUCTURED OUTPUT SCHEMAS =====
 
@@ -54,6 +68,48 @@ class ClarifyWithUser(BaseModel):
         description="Verify message that we will start research after the user has provided the necessary information.",
     )
 
+class OutlineSection(BaseModel):
+    """Schema for one planned section of a report outline."""
+
+    title: str = Field(
+        description="Title of the section.",
+    )
+    description: str = Field(
+        description="What the section should cover, in one or two sentences.",
+    )
+    note_ids: list[int] = Field(
+        description="Numbers of the research notes the section draws on.",
+        default_factory=list,
+    )
+
+class ReportOutline(BaseModel):
+    """Schema for the outline of a report, planned before its sections are written."""
+
+    title: str = Field(
+        description="Title of the report.",
+    )
+    sections: list[OutlineSection] = Field(
+        description="Sections of the report, in order.",
+    )
+
+class GapTopic(BaseModel):
+    """Schema for a topic an updated brief needs that earlier research does not cover."""
+
+    title: str = Field(
+        description="Short title of the report section the topic's findings belong in.",
+    )
+    research_topic: str = Field(
+        description="Detailed, standalone description of the topic to research.",
+    )
+
+class ResearchGaps(BaseModel):
+    """Schema for the topics to research when re-running a refined brief incrementally."""
+
+    topics: list[GapTopic] = Field(
+        description="Topics to research, empty if the existing research already covers the updated brief.",
+        default_factory=list,
+    )
+
 class ResearchQuestion(BaseModel):
     """Schema for structured research brief generation."""
 
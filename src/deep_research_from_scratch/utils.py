@@ -2,21 +2,27 @@
 """Research Utilities and Tools.
 
 This module provides search and content processing utilities for the research agent,
-including web search capabilities and content summarization tools.
+including web search capabilities and content summarization tools. In batch
+runs, search responses and page summaries are shared through the search cache.
 """
 
 from pathlib import Path
 from datetime import datetime
-from typing_extensions import Annotated, List, Literal
+from typing_extensions import Annotated, List, Literal, Optional
 
 from langchain.chat_models import init_chat_model 
 from langchain_core.messages import HumanMessage
-from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import ContextThreadPoolExecutor
 from langchain_core.tools import tool, InjectedToolArg
 from tavily import TavilyClient
 
 from deep_research_from_scratch.state_research import Summary
 from deep_research_from_scratch.prompts import summarize_webpage_prompt
+from deep_research_from_scratch.progress import emit_progress, SearchIssued, SourceSummarized
+from deep_research_from_scratch.budget import get_run_budget
+from deep_research_from_scratch.citation_index import source_id
+from deep_research_from_scratch.fair_scheduler import task_slot
+from deep_research_from_scratch.search_cache import get_search_cache
 
 # ===== UTILITY FUNCTIONS =====
 
@@ -46,6 +52,17 @@ def get_current_dir() -> Path:
 summarization_model = init_chat_model("google_genai:models/gemini-flash-latest")
 tavily_client = TavilyClient()
 
+# Maximum number of search requests or webpage summaries running at the same time
+max_search_workers = 5
+
+# Tool output when the run's search budget is spent
+SEARCH_BUDGET_SPENT_MESSAGE = "The search budget for this research run is spent. Stop searching and work with the information gathered so far."
+
+# Output budget for batched searches: at most max_batch_sources sources are
+# summarized, each summary truncated to max_source_chars characters
+max_batch_sources = 10
+max_source_chars = 4000
+
 # ===== SEARCH FUNCTIONS =====
 
 def tavily_search_multiple(
@@ -63,21 +80,48 @@ def tavily_search_multiple(
         include_raw_content: Whether to include raw webpage content
 
     Returns:
-        List of search result dictionaries
+        List of search result dictionaries; cached responses are reused, and
+        uncached queries beyond the run's remaining search budget are dropped
     """
+    cache, run_id = get_search_cache()
+    cached = {}
+    if cache is not None:
+        for query in search_queries:
+            response = cache.get_search(query, max_results, topic, include_raw_content, run_id=run_id)
+            if response is not None:
+                cached[query] = response
+    uncached = [query for query in search_queries if query not in cached]
+
+    # Only searches actually sent count against the budget
+    budget = get_run_budget()
+    if budget is not None and uncached:
+        uncached = uncached[:budget.reserve_searches(len(uncached))]
+
+    def search(query: str) -> dict:
+        with task_slot("search"):
+            response = tavily_client.search(
+                query,
+                max_results=max_results,
+                include_raw_content=include_raw_content,
+                topic=topic
+            )
+        if cache is not None:
+            cache.put_search(query, max_results, topic, include_raw_content, response)
+        return response
+
+    fresh = {}
+    if uncached:
+        emit_progress(SearchIssued(event="search_issued", queries=list(uncached)))
+
+        # Execute searches concurrently (TavilyClient is blocking, so use a thread pool)
+        if len(uncached) == 1:
+            fresh = {uncached[0]: search(uncached[0])}
+        else:
+            with ContextThreadPoolExecutor(max_workers=max_search_workers) as executor:
+                fresh = dict(zip(uncached, executor.map(search, uncached)))
 
-    # Execute searches sequentially. Note: yon can use AsyncTavilyClient to parallelize this step.
-    search_docs = []
-    for query in search_queries:
-        result = tavily_client.search(
-            query,
-            max_results=max_results,
-            include_raw_content=include_raw_content,
-            topic=topic
-        )
-        search_docs.append(result)
-
-    return search_docs
+    responses = {**cached, **fresh}
+    return [responses[query] for query in search_queries if query in responses]
 
 def summarize_webpage_content(webpage_content: str) -> str:
     """Summarize webpage content using the configured summarization model.
@@ -86,25 +130,35 @@ def summarize_webpage_content(webpage_content: str) -> str:
         webpage_content: Raw webpage content to summarize
 
     Returns:
-        Formatted summary with key excerpts
+        Formatted summary with key excerpts; pages summarized before are
+        answered from the search cache
     """
+    cache, run_id = get_search_cache()
+    if cache is not None:
+        cached_summary = cache.get_summary(webpage_content, run_id=run_id)
+        if cached_summary is not None:
+            return cached_summary
+
     try:
         # Set up structured output model for summarization
         structured_model = summarization_model.with_structured_output(Summary)
 
         # Generate summary
-        summary = structured_model.invoke([
-            HumanMessage(content=summarize_webpage_prompt.format(
-                webpage_content=webpage_content, 
-                date=get_today_str()
-            ))
-        ])
+        with task_slot("model"):
+            summary = structured_model.invoke([
+                HumanMessage(content=summarize_webpage_prompt.format(
+                    webpage_content=webpage_content, 
+                    date=get_today_str()
+                ))
+            ])
 
         # Format summary with clear structure
         formatted_summary = (
             f"<summary>\n{summary.summary}\n</summary>\n\n"
             f"<key_excerpts>\n{summary.key_excerpts}\n</key_excerpts>"
         )
+        if cache is not None:
+            cache.put_summary(webpage_content, formatted_summary)
 
         return formatted_summary
 
@@ -131,31 +185,65 @@ def deduplicate_search_results(search_results: List[dict]) -> dict:
 
     return unique_results
 
-def process_search_results(unique_results: dict) -> dict:
+def _truncate(content: str, max_chars: Optional[int]) -> str:
+    if max_chars is not None and len(content) > max_chars:
+        return content[:max_chars] + "..."
+    return content
+
+def process_search_results(unique_results: dict, max_chars: Optional[int] = None) -> dict:
     """Process search results by summarizing content where available.
 
     Args:
         unique_results: Dictionary of unique search results
+        max_chars: Maximum number of characters kept from each summary (no limit by default)
 
     Returns:
         Dictionary of processed results with summaries
     """
-    summarized_results = {}
-
-    for url, result in unique_results.items():
+    def process(result: dict) -> str:
         # Use existing content if no raw content for summarization
         if not result.get("raw_content"):
             content = result['content']
         else:
             # Summarize raw content for better processing
             content = summarize_webpage_content(result['raw_content'])
+        emit_progress(SourceSummarized(event="source_summarized", url=result['url'], title=result['title']))
+        return content
+
+    # Summarize pages concurrently, keeping results in search order
+    # (the context-propagating pool lets progress events reach the current run)
+    with ContextThreadPoolExecutor(max_workers=max_search_workers) as executor:
+        contents = list(executor.map(process, unique_results.values()))
 
-        summarized_results[url] = {
+    return {
+        url: {
             'title': result['title'],
-            'content': content
+            'content': _truncate(content, max_chars)
         }
+        for (url, result), content in zip(unique_results.items(), contents)
+    }
 
-    return summarized_results
+def budget_search_results(
+    unique_results: dict,
+    max_sources: int = max_batch_sources,
+    max_chars: int = max_source_chars,
+) -> dict:
+    """Limit raw search results to a fixed output budget before they are summarized.
+
+    Only the kept sources are summarized, so dropped results cost nothing.
+
+    Args:
+        unique_results: Dictionary of unique search results
+        max_sources: Maximum number of sources to keep
+        max_chars: Maximum number of characters kept from each result's search snippet
+
+    Returns:
+        Dictionary of at most max_sources results with truncated snippets
+    """
+    return {
+        url: {**result, 'content': _truncate(result['content'], max_chars)}
+        for url, result in list(unique_results.items())[:max_sources]
+    }
 
 def format_search_output(summarized_results: dict) -> str:
     """Format search results into a well-structured string output.
@@ -164,15 +252,16 @@ def format_search_output(summarized_results: dict) -> str:
         summarized_results: Dictionary of processed search results
 
     Returns:
-        Formatted string of search results with clear source separation
+        Formatted string of search results with clear source separation, each
+        source labeled with its stable citation ID
     """
     if not summarized_results:
         return "No valid search results found. Please try different search queries or use a different search API."
 
     formatted_output = "Search results: \n\n"
 
-    for i, (url, result) in enumerate(summarized_results.items(), 1):
-        formatted_output += f"\n\n--- SOURCE {i}: {result['title']} ---\n"
+    for url, result in summarized_results.items():
+        formatted_output += f"\n\n--- SOURCE [{source_id(url)}]: {result['title']} ---\n"
         formatted_output += f"URL: {url}\n\n"
         formatted_output += f"SUMMARY:\n{result['content']}\n\n"
         formatted_output += "-" * 80 + "\n"
@@ -204,6 +293,8 @@ def tavily_search(
         topic=topic,
         include_raw_content=True,
     )
+    if not search_results:
+        return SEARCH_BUDGET_SPENT_MESSAGE
 
     # Deduplicate results by URL to avoid processing duplicate content
     unique_results = deduplicate_search_results(search_results)
@@ -214,6 +305,44 @@ def tavily_search(
     # Format output for consumption
     return format_search_output(summarized_results)
 
+@tool(parse_docstring=True)
+def tavily_search_batch(
+    queries: List[str],
+    max_results: Annotated[int, InjectedToolArg] = 3,
+    topic: Annotated[Literal["general", "news", "finance"], InjectedToolArg] = "general",
+) -> str:
+    """Fetch results for several search queries at once, merged into one deduplicated result.
+
+    Use this instead of several separate tavily_search calls when you want to explore
+    multiple angles of a topic in a single step.
+
+    Args:
+        queries: A list of distinct search queries to execute concurrently
+        max_results: Maximum number of results to return per query
+        topic: Topic to filter results by ('general', 'news', 'finance')
+
+    Returns:
+        Formatted string of merged search results with summaries
+    """
+    # Execute all queries concurrently
+    search_results = tavily_search_multiple(
+        queries,
+        max_results=max_results,
+        topic=topic,
+        include_raw_content=True,
+    )
+    if not search_results:
+        return SEARCH_BUDGET_SPENT_MESSAGE
+
+    # Deduplicate results by URL across all queries
+    unique_results = deduplicate_search_results(search_results)
+
+    # Keep the results within budget, then summarize only the sources kept
+    summarized_results = process_search_results(budget_search_results(unique_results), max_chars=max_source_chars)
+
+    # Format output for consumption
+    return format_search_output(summarized_results)
+
 @tool(parse_docstring=True)
 def think_tool(reflection: str) -> str:
     """Tool for strategic reflection on research progress and decision-making.
@@ -0,0 +1,9 @@
+"""Shared test setup."""
+
+import os
+
+# The agent modules create their model clients at import time
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+os.environ.setdefault("TAVILY_API_KEY", "test")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("ANTHROPIC_API_KEY", "test")
@@ -0,0 +1,62 @@
+"""Tests for archiving cold reports with the retention policy."""
+
+import hashlib
+
+from deep_research_from_scratch.report_archive import apply_retention, read_report
+from deep_research_from_scratch.report_catalog import ReportCatalog
+from deep_research_from_scratch.report_store import ReportMetadata
+
+DAY = 86400.0
+
+
+def catalog_report(catalog: ReportCatalog, directory, report_id: str, text: str, saved_at: float) -> None:
+    path = directory / f"{report_id}.md"
+    path.write_text(text, encoding="utf-8")
+    data = text.encode("utf-8")
+    catalog.record(
+        ReportMetadata(
+            report_id=report_id,
+            filename=path.name,
+            sha256=hashlib.sha256(data).hexdigest(),
+            research_brief=f"Brief {report_id}",
+            created_at=saved_at,
+            last_saved_at=saved_at,
+            save_count=1,
+            chars=len(text),
+            bytes=len(data),
+            usage=None,
+        ),
+        text,
+        path,
+    )
+
+
+def test_second_pass_archives_nothing(tmp_path):
+    catalog = ReportCatalog(tmp_path / ".report_catalog.sqlite")
+    now = 100 * DAY
+    catalog_report(catalog, tmp_path, "cold-1", "# Cold report\n\n## Findings\n\nOld findings.\n", now - 30 * DAY)
+    catalog_report(catalog, tmp_path, "cold-2", "# Another cold report\n\nMore findings.\n", now - 10 * DAY)
+    catalog_report(catalog, tmp_path, "fresh", "# Fresh report\n\nNew findings.\n", now - DAY)
+
+    first = apply_retention(archive_after=7, catalog=catalog, now=now)
+    # The archive pass lists only cold reports that are still plain
+    assert catalog.saved_before(now - 7 * DAY, archived=False) == []
+    second = apply_retention(archive_after=7, catalog=catalog, now=now)
+
+    assert sorted(first["archived"]) == ["cold-1", "cold-2"]
+    assert second["archived"] == []
+    assert second["bytes_freed"] == 0
+    assert catalog.saved_before(now, archived=False)[0]["report_id"] == "fresh"
+    assert read_report(catalog.get("cold-1")["path"]) == "# Cold report\n\n## Findings\n\nOld findings.\n"
+
+
+def test_saving_an_archived_report_again_makes_it_plain(tmp_path):
+    catalog = ReportCatalog(tmp_path / ".report_catalog.sqlite")
+    now = 100 * DAY
+    catalog_report(catalog, tmp_path, "report", "# Report\n\nFindings.\n", now - 30 * DAY)
+    apply_retention(archive_after=7, catalog=catalog, now=now)
+
+    catalog_report(catalog, tmp_path, "report", "# Report\n\nFindings.\n", now - 20 * DAY)
+
+    assert catalog.saved_before(now, archived=True) == []
+    assert apply_retention(archive_after=7, catalog=catalog, now=now)["archived"] == ["report"]
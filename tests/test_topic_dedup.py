@@ -0,0 +1,61 @@
+"""Tests for near-duplicate detection of ConductResearch topics."""
+
+from deep_research_from_scratch.multi_agent_supervisor import deduplicate_research_calls
+from deep_research_from_scratch.state_multi_agent_supervisor import topic_key
+
+
+def research_call(topic: str, call_id: str) -> dict:
+    return {"name": "ConductResearch", "args": {"research_topic": topic}, "id": call_id}
+
+
+def test_paraphrased_topic_is_merged():
+    known = [topic_key("Compare the pricing plans of Notion and Obsidian for small teams")]
+    paraphrase = research_call("Pricing plan comparison of Obsidian and Notion for small teams", "1")
+
+    unique, duplicates = deduplicate_research_calls([paraphrase], known)
+
+    assert unique == []
+    assert [(call["id"], duplicate_of) for call, duplicate_of, _ in duplicates] == [("1", known[0])]
+
+
+def test_paraphrase_within_one_turn_is_merged():
+    calls = [
+        research_call("Research the AI safety policies published by Anthropic in 2024", "1"),
+        research_call("Investigate AI safety policies that Anthropic published in 2024", "2"),
+    ]
+
+    unique, duplicates = deduplicate_research_calls(calls, [])
+
+    assert [call["id"] for call in unique] == ["1"]
+    assert [call["id"] for call, _, _ in duplicates] == ["2"]
+
+
+def test_entity_swapped_topics_are_not_merged():
+    calls = [
+        research_call(f"Research the AI safety policies and red-teaming practices published by {lab} in 2024", str(i))
+        for i, lab in enumerate(["Anthropic", "OpenAI", "Google DeepMind"])
+    ]
+
+    unique, duplicates = deduplicate_research_calls(calls, [])
+
+    assert [call["id"] for call in unique] == ["0", "1", "2"]
+    assert duplicates == []
+
+
+def test_entity_swap_against_known_topic_is_not_merged():
+    known = [topic_key("Research the AI safety policies published by Anthropic in 2024")]
+    swapped = research_call("Research the AI safety policies published by OpenAI in 2024", "1")
+
+    unique, duplicates = deduplicate_research_calls([swapped], known)
+
+    assert [call["id"] for call in unique] == ["1"]
+    assert duplicates == []
+
+
+def test_different_year_is_not_merged():
+    known = [topic_key("Electric vehicle sales in Norway in 2023")]
+    other_year = research_call("Electric vehicle sales in Norway in 2024", "1")
+
+    unique, _ = deduplicate_research_calls([other_year], known)
+
+    assert [call["id"] for call in unique] == ["1"]